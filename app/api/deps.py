@@ -0,0 +1,34 @@
+from fastapi import Request
+
+from app.services.container import ServiceContainer
+from app.services.artifact_cache import ArtifactBlobCache
+from app.services.artifact_service import ArtifactService
+from app.services.job_spec_service import JobSpecService, ExecutionService
+from app.services.execution_events import ExecutionEventBroadcaster
+
+# Các provider dùng với Depends: lấy service từ container được tạo trong lifespan.
+# Khai báo async để FastAPI gọi trực tiếp trên event loop (provider sync bị đưa vào threadpool)
+
+
+async def get_services(request: Request) -> ServiceContainer:
+    return request.app.state.services
+
+
+async def get_artifact_service(request: Request) -> ArtifactService:
+    return request.app.state.services.artifact_service
+
+
+async def get_artifact_cache(request: Request) -> ArtifactBlobCache:
+    return request.app.state.services.artifact_cache
+
+
+async def get_job_spec_service(request: Request) -> JobSpecService:
+    return request.app.state.services.job_spec_service
+
+
+async def get_execution_service(request: Request) -> ExecutionService:
+    return request.app.state.services.execution_service
+
+
+async def get_execution_events(request: Request) -> ExecutionEventBroadcaster:
+    return request.app.state.services.execution_events
@@ -1,16 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Query, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Query, Request, Response, status
 from typing import List, Optional
-import io
+import functools
 import logging
 
-from app.services.artifact_service import artifact_service
+from app.api.deps import get_artifact_cache, get_artifact_service
+from app.services.artifact_service import ArtifactService
+from app.services.artifact_cache import ArtifactBlobCache
 from app.schemas.artifact import (
-    ArtifactCreate, ArtifactResponse, ArtifactListResponse, 
+    ArtifactCreate, ArtifactResponse, ArtifactListResponse, ArtifactSearchResponse,
     ArtifactUploadResponse, ArtifactMetadataResponse
 )
-from app.schemas.common import BaseResponse, ErrorResponse, PaginationParams
+from app.schemas.common import BaseResponse, DataResponse, ErrorResponse, PaginationParams
 from app.core.exceptions import handle_exception
+from app.core.responses import ORJSONResponse, ReleasingFileResponse, ClosingStreamingResponse, data_response, dump_trusted, not_modified
+from app.utils.helpers import (
+    get_stream_size, parse_range_header, if_range_matches, format_http_date, make_etag, if_none_match
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +25,8 @@ router = APIRouter(prefix="/artifacts", tags=["Artifacts"])
 @router.post("/upload", response_model=BaseResponse, summary="Upload Artifact")
 async def upload_artifact(
     metadata: ArtifactCreate = Depends(),
-    file: UploadFile = File(..., description="JAR file của artifact")
+    file: UploadFile = File(..., description="JAR file của artifact"),
+    artifact_service: ArtifactService = Depends(get_artifact_service)
 ):
     """
     Upload artifact JAR file với metadata
@@ -36,14 +42,14 @@ async def upload_artifact(
                 detail="Chỉ chấp nhận file JAR"
             )
         
-        # Đọc file data
-        file_data = await file.read()
-        file_size = len(file_data)
+        # Không đọc toàn bộ file vào memory: file upload đã được spool ra đĩa,
+        # service sẽ stream trực tiếp theo từng chunk
+        file_size = file.size if file.size is not None else get_stream_size(file.file)
         
         # Tạo artifact
         artifact_id = await artifact_service.create_artifact(
             metadata, 
-            io.BytesIO(file_data), 
+            file.file, 
             file_size
         )
         
@@ -51,63 +57,107 @@ async def upload_artifact(
             message="Upload artifact thành công",
             data={"artifact_id": artifact_id}
         )
-        
+    
     except Exception as e:
-        logger.error(f"Lỗi upload artifact: {e}")
+        logger.error("Lỗi upload artifact: %s", e)
         raise handle_exception(e)
 
 
-@router.get("/", response_model=BaseResponse, summary="Lấy danh sách Artifacts")
+@router.get("/", response_model=DataResponse[ArtifactListResponse], response_class=ORJSONResponse,
+            summary="Lấy danh sách Artifacts")
 async def list_artifacts(
+    request: Request,
     page: int = Query(1, ge=1, description="Số trang"),
     size: int = Query(20, ge=1, le=100, description="Kích thước trang"),
-    artifact_name: Optional[str] = Query(None, description="Tìm kiếm theo tên artifact"),
+    artifact_name: Optional[str] = Query(None, description="Lọc theo tiền tố tên artifact (phân biệt hoa thường)"),
     sort_by: str = Query("created_at", description="Trường sắp xếp"),
-    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Thứ tự sắp xếp")
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Thứ tự sắp xếp"),
+    cursor: Optional[str] = Query(None, description="Cursor trang tiếp theo (next_cursor của response trước)"),
+    include_total: bool = Query(True, description="Có trả về tổng số bản ghi hay không"),
+    estimated_total: bool = Query(False, description="Dùng tổng số ước lượng của collection khi không có filter"),
+    artifact_service: ArtifactService = Depends(get_artifact_service)
 ):
     """
     Lấy danh sách artifacts với phân trang và tìm kiếm
+    
+    Response có ETag theo version của collection và query; request có If-None-Match
+    khớp nhận 304 mà không cần query database
     """
     try:
-        artifacts, total = await artifact_service.list_artifacts(
+        etag = make_etag(artifact_service.list_version(), request.url.path, request.url.query)
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        
+        artifacts, total, next_cursor = await artifact_service.list_artifacts(
             page=page,
             size=size,
             artifact_name=artifact_name,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            cursor=cursor,
+            include_total=include_total,
+            estimated_total=estimated_total
         )
         
-        # Convert to response format
-        artifact_responses = []
-        for artifact in artifacts:
-            artifact_responses.append(ArtifactResponse(
-                id=artifact.id,
-                artifact_name=artifact.artifact_name,
-                version=artifact.version,
-                metadata=ArtifactMetadataResponse(**artifact.metadata.dict()),
-                minio_path=artifact.minio_path,
-                created_at=artifact.created_at,
-                updated_at=artifact.updated_at
-            ))
+        return data_response({
+            "artifacts": dump_trusted(artifacts, ArtifactResponse),
+            "total": total,
+            "page": page,
+            "size": size,
+            "next_cursor": next_cursor
+        }, headers={"ETag": etag})
+    
+    except Exception as e:
+        logger.error("Lỗi lấy danh sách artifacts: %s", e)
+        raise handle_exception(e)
+
+
+@router.get("/search/{query}", response_model=DataResponse[ArtifactSearchResponse], response_class=ORJSONResponse,
+            summary="Tìm kiếm Artifacts")
+async def search_artifacts(
+    query: str,
+    request: Request,
+    page: int = Query(1, ge=1, description="Số trang"),
+    size: int = Query(20, ge=1, le=100, description="Kích thước trang"),
+    artifact_service: ArtifactService = Depends(get_artifact_service)
+):
+    """
+    Tìm kiếm artifacts theo từ khóa
+    
+    Khớp theo token (chính xác hoặc prefix) của tên, entry classes và mô tả; mọi từ khóa
+    đều phải khớp. Kết quả sắp xếp theo mức độ liên quan (tên > entry class > mô tả)
+    """
+    try:
+        etag = make_etag(artifact_service.list_version(), request.url.path, request.url.query)
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
         
-        return BaseResponse(
-            data={
-                "artifacts": artifact_responses,
-                "total": total,
-                "page": page,
-                "size": size
-            }
-        )
+        artifacts, total = await artifact_service.search_artifacts(query, page=page, size=size)
         
+        return data_response({
+            "artifacts": dump_trusted(artifacts, ArtifactResponse),
+            "total": total,
+            "query": query,
+            "page": page,
+            "size": size
+        }, headers={"ETag": etag})
+    
     except Exception as e:
-        logger.error(f"Lỗi lấy danh sách artifacts: {e}")
+        logger.error("Lỗi tìm kiếm artifacts: %s", e)
         raise handle_exception(e)
 
 
 @router.get("/{artifact_id}", response_model=BaseResponse, summary="Lấy Artifact theo ID")
-async def get_artifact(artifact_id: str):
+async def get_artifact(
+    artifact_id: str,
+    request: Request,
+    response: Response,
+    artifact_service: ArtifactService = Depends(get_artifact_service)
+):
     """
     Lấy thông tin chi tiết của artifact theo ID
+    
+    Hỗ trợ conditional GET: ETag tính từ ID và updated_at của artifact
     """
     try:
         artifact = await artifact_service.get_artifact(artifact_id)
@@ -117,6 +167,11 @@ async def get_artifact(artifact_id: str):
                 detail=f"Artifact với ID {artifact_id} không tồn tại"
             )
         
+        etag = make_etag(artifact.id, artifact.updated_at.isoformat())
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        
         artifact_response = ArtifactResponse(
             id=artifact.id,
             artifact_name=artifact.artifact_name,
@@ -128,21 +183,25 @@ async def get_artifact(artifact_id: str):
         )
         
         return BaseResponse(data=artifact_response)
-        
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi lấy artifact: {e}")
+        logger.error("Lỗi lấy artifact: %s", e)
         raise handle_exception(e)
 
 
 @router.get("/{artifact_name}/versions", response_model=BaseResponse, summary="Lấy danh sách phiên bản")
-async def get_artifact_versions(artifact_name: str):
+async def get_artifact_versions(
+    artifact_name: str,
+    version_range: Optional[str] = Query(None, alias="range", description="Điều kiện version, ví dụ ^1.4 hoặc >=2.0,<3"),
+    artifact_service: ArtifactService = Depends(get_artifact_service)
+):
     """
-    Lấy danh sách các phiên bản của artifact
+    Lấy danh sách các phiên bản của artifact, mới nhất trước (theo semver)
     """
     try:
-        versions = await artifact_service.get_artifact_versions(artifact_name)
+        versions = await artifact_service.get_artifact_versions(artifact_name, version_range)
         
         return BaseResponse(
             data={
@@ -150,24 +209,26 @@ async def get_artifact_versions(artifact_name: str):
                 "versions": versions
             }
         )
-        
+    
     except Exception as e:
-        logger.error(f"Lỗi lấy phiên bản artifact: {e}")
+        logger.error("Lỗi lấy phiên bản artifact: %s", e)
         raise handle_exception(e)
 
 
-@router.get("/{artifact_name}/{version}", response_model=BaseResponse, summary="Lấy Artifact theo tên và phiên bản")
-async def get_artifact_by_name_version(artifact_name: str, version: str):
+@router.get("/{artifact_name}/latest", response_model=BaseResponse, summary="Lấy phiên bản mới nhất của Artifact")
+async def get_latest_artifact(
+    artifact_name: str,
+    version_range: Optional[str] = Query(None, alias="range", description="Điều kiện version, ví dụ ^1.4 hoặc >=2.0,<3"),
+    artifact_service: ArtifactService = Depends(get_artifact_service)
+):
     """
-    Lấy thông tin artifact theo tên và phiên bản
+    Lấy phiên bản mới nhất (theo semver) của artifact
+    
+    Với `range`, trả về phiên bản cao nhất thỏa điều kiện: `1.4` / `1.4.x`, `^1.4`, `~1.4.2`,
+    `>=2.0,<3`, `*`. Không có phiên bản nào thỏa điều kiện -> 404
     """
     try:
-        artifact = await artifact_service.get_artifact_by_name_version(artifact_name, version)
-        if not artifact:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Artifact {artifact_name} phiên bản {version} không tồn tại"
-            )
+        artifact = await artifact_service.get_latest_artifact(artifact_name, version_range)
         
         artifact_response = ArtifactResponse(
             id=artifact.id,
@@ -180,84 +241,140 @@ async def get_artifact_by_name_version(artifact_name: str, version: str):
         )
         
         return BaseResponse(data=artifact_response)
-        
-    except HTTPException:
-        raise
+    
     except Exception as e:
-        logger.error(f"Lỗi lấy artifact: {e}")
+        logger.error("Lỗi lấy phiên bản mới nhất của artifact: %s", e)
         raise handle_exception(e)
 
 
 @router.get("/{artifact_id}/download", summary="Download Artifact")
-async def download_artifact(artifact_id: str):
+async def download_artifact(
+    artifact_id: str,
+    request: Request,
+    artifact_service: ArtifactService = Depends(get_artifact_service),
+    artifact_cache: ArtifactBlobCache = Depends(get_artifact_cache)
+):
     """
     Download artifact JAR file
+    
+    Dữ liệu được stream từ object storage theo từng chunk. Hỗ trợ header
+    `Range` / `If-Range` để client có thể tải tiếp khi bị gián đoạn.
     """
     try:
-        file_data, filename = await artifact_service.download_artifact(artifact_id)
+        info = await artifact_service.get_download_info(artifact_id)
+        
+        size = info["size"]
+        etag = '"%s"' % info["etag"].strip('"')
+        headers = {
+            "Content-Disposition": f"attachment; filename={info['filename']}",
+            "Accept-Ranges": "bytes",
+            "ETag": etag
+        }
+        if info.get("last_modified"):
+            headers["Last-Modified"] = format_http_date(info["last_modified"])
+        
+        # Blob có trong cache trên đĩa: FileResponse tự xử lý Range/If-Range, pin luôn được nhả khi response kết thúc
+        cached_path = await artifact_cache.acquire(info["hash"], info["minio_path"], info["etag"], size)
+        if cached_path:
+            return ReleasingFileResponse(
+                cached_path,
+                on_close=functools.partial(artifact_cache.release, info["hash"]),
+                media_type="application/java-archive",
+                headers=headers
+            )
+        
+        byte_range = None
+        range_header = request.headers.get("range")
+        if range_header and if_range_matches(request.headers.get("if-range"), etag, info.get("last_modified")):
+            try:
+                byte_range = parse_range_header(range_header, size)
+            except ValueError:
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"}
+                )
+        
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        else:
+            start, length = 0, size
+            status_code = status.HTTP_200_OK
+        headers["Content-Length"] = str(length)
+        
+        stream = await artifact_service.stream_artifact(info["minio_path"], start, length)
         
-        return StreamingResponse(
-            io.BytesIO(file_data),
+        return ClosingStreamingResponse(
+            stream,
+            status_code=status_code,
             media_type="application/java-archive",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            headers=headers
         )
-        
+    
     except Exception as e:
-        logger.error(f"Lỗi download artifact: {e}")
+        logger.error("Lỗi download artifact: %s", e)
         raise handle_exception(e)
 
 
-@router.delete("/{artifact_id}", response_model=BaseResponse, summary="Xóa Artifact")
-async def delete_artifact(artifact_id: str):
+@router.get("/{artifact_name}/{version}", response_model=BaseResponse, summary="Lấy Artifact theo tên và phiên bản")
+async def get_artifact_by_name_version(
+    artifact_name: str,
+    version: str,
+    artifact_service: ArtifactService = Depends(get_artifact_service)
+):
     """
-    Xóa artifact và file JAR tương ứng
+    Lấy thông tin artifact theo tên và phiên bản
     """
     try:
-        success = await artifact_service.delete_artifact(artifact_id)
-        if not success:
+        artifact = await artifact_service.get_artifact_by_name_version(artifact_name, version)
+        if not artifact:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Artifact với ID {artifact_id} không tồn tại"
+                detail=f"Artifact {artifact_name} phiên bản {version} không tồn tại"
             )
         
-        return BaseResponse(message="Xóa artifact thành công")
+        artifact_response = ArtifactResponse(
+            id=artifact.id,
+            artifact_name=artifact.artifact_name,
+            version=artifact.version,
+            metadata=ArtifactMetadataResponse(**artifact.metadata.dict()),
+            minio_path=artifact.minio_path,
+            created_at=artifact.created_at,
+            updated_at=artifact.updated_at
+        )
         
+        return BaseResponse(data=artifact_response)
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi xóa artifact: {e}")
+        logger.error("Lỗi lấy artifact: %s", e)
         raise handle_exception(e)
 
 
-@router.get("/search/{query}", response_model=BaseResponse, summary="Tìm kiếm Artifacts")
-async def search_artifacts(query: str):
+@router.delete("/{artifact_id}", response_model=BaseResponse, summary="Xóa Artifact")
+async def delete_artifact(
+    artifact_id: str,
+    artifact_service: ArtifactService = Depends(get_artifact_service)
+):
     """
-    Tìm kiếm artifacts theo từ khóa
+    Xóa artifact và file JAR tương ứng
     """
     try:
-        artifacts = await artifact_service.search_artifacts(query)
-        
-        artifact_responses = []
-        for artifact in artifacts:
-            artifact_responses.append(ArtifactResponse(
-                id=artifact.id,
-                artifact_name=artifact.artifact_name,
-                version=artifact.version,
-                metadata=ArtifactMetadataResponse(**artifact.metadata.dict()),
-                minio_path=artifact.minio_path,
-                created_at=artifact.created_at,
-                updated_at=artifact.updated_at
-            ))
-        
-        return BaseResponse(
-            data={
-                "artifacts": artifact_responses,
-                "total": len(artifact_responses),
-                "query": query
-            }
-        )
+        success = await artifact_service.delete_artifact(artifact_id)
+        if not success:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Artifact với ID {artifact_id} không tồn tại"
+            )
         
+        return BaseResponse(message="Xóa artifact thành công")
+    
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Lỗi tìm kiếm artifacts: {e}")
+        logger.error("Lỗi xóa artifact: %s", e)
         raise handle_exception(e)
 
@@ -2,40 +2,71 @@ from fastapi import APIRouter, Depends
 from datetime import datetime
 from app.schemas.common import HealthCheckResponse
 from app.config import settings
-import httpx
+from app.core.database import get_database
+from app.core.exceptions import MinIOError
+from app.api.deps import get_services
+from app.services.container import ServiceContainer
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/health", tags=["Health Check"])
 
+# Metric trong health check: tên metric -> (service trong container, hàm lấy thống kê).
+# Chỉ service đã được khởi tạo mới được báo cáo, health check không tạo service mới
+SERVICE_METRICS = {
+    "minio_executor": ("async_minio_service", lambda service: service.get_stats()),
+    "artifact_cache": ("artifact_cache", lambda service: service.get_stats()),
+    "jar_inspector": ("jar_inspector", lambda service: service.get_stats()),
+    "count_cache": ("mongo_service", lambda service: service.count_cache.get_stats()),
+    "artifact_metadata_cache": ("artifact_service", lambda service: service.cache.get_stats()),
+    "job_spec_cache": ("job_spec_service", lambda service: service.cache.get_stats()),
+    "flink_client": ("flink_client", lambda service: service.get_stats()),
+    "flink_jar_cache": ("flink_jar_cache", lambda service: service.get_stats()),
+    "execution_reconciler": ("execution_reconciler", lambda service: service.get_stats()),
+    "execution_events": ("execution_events", lambda service: service.get_stats()),
+}
+
 
 @router.get("/", response_model=HealthCheckResponse, summary="Health Check")
-async def health_check():
+async def health_check(services: ServiceContainer = Depends(get_services)):
     """
     Kiểm tra trạng thái hệ thống và các service dependencies
     """
     services_status = {}
     
-    # Kiểm tra MongoDB (mock mode)
+    # Kiểm tra MongoDB
     try:
-        services_status["mongodb"] = "healthy (mock)"
+        if settings.database_backend == "mongo":
+            await get_database().command("ping")
+            services_status["mongodb"] = "healthy"
+        else:
+            services_status["mongodb"] = "healthy (mock)"
     except Exception as e:
-        logger.error(f"MongoDB health check failed: {e}")
+        logger.error("MongoDB health check failed: %s", e)
         services_status["mongodb"] = "unhealthy"
     
-    # Kiểm tra MinIO (mock mode)
+    # Kiểm tra MinIO
     try:
-        services_status["minio"] = "healthy (mock)"
+        if settings.storage_backend == "minio":
+            if not await services.async_minio_service.ping():
+                raise MinIOError(f"Bucket {settings.minio_bucket} không tồn tại")
+            services_status["minio"] = "healthy"
+        else:
+            services_status["minio"] = "healthy (mock)"
     except Exception as e:
-        logger.error(f"MinIO health check failed: {e}")
+        logger.error("MinIO health check failed: %s", e)
         services_status["minio"] = "unhealthy"
     
-    # Kiểm tra Flink Cluster (mock mode)
+    # Kiểm tra Flink Cluster
     try:
-        services_status["flink_cluster"] = "healthy (mock)"
+        if settings.flink_backend == "rest":
+            await services.flink_client.cluster_overview()
+            services_status["flink_cluster"] = "healthy"
+        else:
+            services_status["flink_cluster"] = "healthy (mock)"
     except Exception as e:
-        logger.error(f"Flink cluster health check failed: {e}")
+        logger.error("Flink cluster health check failed: %s", e)
         services_status["flink_cluster"] = "unhealthy"
     
     # Xác định trạng thái tổng thể
@@ -45,7 +76,12 @@ async def health_check():
         status=overall_status,
         timestamp=datetime.utcnow().isoformat(),
         version=settings.app_version,
-        services=services_status
+        services=services_status,
+        metrics={
+            metric: get_stats(getattr(services, service))
+            for metric, (service, get_stats) in SERVICE_METRICS.items()
+            if services.is_created(service)
+        }
     )
 
 
@@ -55,14 +91,13 @@ async def readiness_check():
     Kiểm tra readiness của ứng dụng
     """
     try:
-        from app.core.database import get_database
-        db = get_database()
-        await db.command("ping")
+        if settings.database_backend == "mongo":
+            await get_database().command("ping")
         
         return {"status": "ready", "timestamp": datetime.utcnow().isoformat()}
-        
+    
     except Exception as e:
-        logger.error(f"Readiness check failed: {e}")
+        logger.error("Readiness check failed: %s", e)
         return {"status": "not_ready", "error": str(e), "timestamp": datetime.utcnow().isoformat()}
 
 
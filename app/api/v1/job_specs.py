@@ -1,15 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Request, Response, status
 from typing import List, Optional
+import asyncio
 
-from app.services.job_spec_service import job_spec_service, execution_service
+from app.api.deps import get_execution_events, get_execution_service, get_job_spec_service
+from app.services.job_spec_service import JobSpecService, ExecutionService
+from app.services.execution_events import ExecutionEventBroadcaster
 from app.schemas.job_config import (
     JobSpecCreate, JobSpecUpdate, JobSpecResponse, JobSpecListResponse,
     ExecutionCreate, ExecutionResponse, ExecutionListResponse,
-    ExecutionStartResponse, ExecutionStopResponse, ExecutionHistoryResponse
+    ExecutionStartResponse, ExecutionStopResponse, ExecutionHistoryResponse, ExecutionHistoryListResponse,
+    BatchExecutionStartRequest, BatchExecutionStopRequest
 )
-from app.schemas.common import BaseResponse, PaginationParams
+from app.schemas.common import BaseResponse, DataResponse, PaginationParams
 from app.core.exceptions import handle_exception
+from app.core.responses import ClosingStreamingResponse, ORJSONResponse, data_response, dump_trusted, not_modified
+from app.utils.helpers import make_etag, if_none_match
 from app.models.job_config import JobStatus
+from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,7 +25,10 @@ router = APIRouter(prefix="/job-specs", tags=["Job Specifications"])
 
 
 @router.post("/", response_model=BaseResponse, summary="Tạo Job Spec")
-async def create_job_spec(job_spec_data: JobSpecCreate):
+async def create_job_spec(
+    job_spec_data: JobSpecCreate,
+    job_spec_service: JobSpecService = Depends(get_job_spec_service)
+):
     """
     Tạo job specification mới
     
@@ -36,56 +46,73 @@ async def create_job_spec(job_spec_data: JobSpecCreate):
             message="Tạo job spec thành công",
             data={"job_spec_id": job_spec_id}
         )
-        
+    
     except Exception as e:
-        logger.error(f"Lỗi tạo job spec: {e}")
+        logger.error("Lỗi tạo job spec: %s", e)
         raise handle_exception(e)
 
 
-@router.get("/", response_model=BaseResponse, summary="Lấy danh sách Job Specs")
+@router.get("/", response_model=DataResponse[JobSpecListResponse], response_class=ORJSONResponse,
+            summary="Lấy danh sách Job Specs")
 async def list_job_specs(
+    request: Request,
     page: int = Query(1, ge=1, description="Số trang"),
     size: int = Query(20, ge=1, le=100, description="Kích thước trang"),
     job_spec_name: Optional[str] = Query(None, description="Lọc theo tên job spec"),
     created_by: Optional[str] = Query(None, description="Lọc theo người tạo"),
     sort_by: str = Query("created_at", description="Trường sắp xếp"),
-    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Thứ tự sắp xếp")
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Thứ tự sắp xếp"),
+    cursor: Optional[str] = Query(None, description="Cursor trang tiếp theo (next_cursor của response trước)"),
+    include_total: bool = Query(True, description="Có trả về tổng số bản ghi hay không"),
+    estimated_total: bool = Query(False, description="Dùng tổng số ước lượng của collection khi không có filter"),
+    job_spec_service: JobSpecService = Depends(get_job_spec_service)
 ):
     """
     Lấy danh sách job specs với phân trang và lọc
+    
+    Response có ETag theo version của collection và query (If-None-Match khớp -> 304)
     """
     try:
-        job_specs, total = await job_spec_service.list_job_specs(
+        etag = make_etag(job_spec_service.list_version(), request.url.path, request.url.query)
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        
+        job_specs, total, next_cursor = await job_spec_service.list_job_specs(
             page=page,
             size=size,
             job_spec_name=job_spec_name,
             created_by=created_by,
             sort_by=sort_by,
-            sort_order=sort_order
-        )
-        
-        job_spec_responses = []
-        for job_spec in job_specs:
-            job_spec_responses.append(JobSpecResponse(**job_spec.dict()))
-        
-        return BaseResponse(
-            data={
-                "job_specs": job_spec_responses,
-                "total": total,
-                "page": page,
-                "size": size
-            }
+            sort_order=sort_order,
+            cursor=cursor,
+            include_total=include_total,
+            estimated_total=estimated_total
         )
         
+        return data_response({
+            "job_specs": dump_trusted(job_specs, JobSpecResponse),
+            "total": total,
+            "page": page,
+            "size": size,
+            "next_cursor": next_cursor
+        }, headers={"ETag": etag})
+    
     except Exception as e:
-        logger.error(f"Lỗi lấy danh sách job specs: {e}")
+        logger.error("Lỗi lấy danh sách job specs: %s", e)
         raise handle_exception(e)
 
 
 @router.get("/{job_spec_id}", response_model=BaseResponse, summary="Lấy Job Spec theo ID")
-async def get_job_spec(job_spec_id: str):
+async def get_job_spec(
+    job_spec_id: str,
+    request: Request,
+    response: Response,
+    job_spec_service: JobSpecService = Depends(get_job_spec_service)
+):
     """
     Lấy thông tin chi tiết của job spec theo ID
+    
+    Hỗ trợ conditional GET: ETag tính từ ID và updated_at của job spec
     """
     try:
         job_spec = await job_spec_service.get_job_spec(job_spec_id)
@@ -95,17 +122,26 @@ async def get_job_spec(job_spec_id: str):
                 detail=f"Job spec với ID {job_spec_id} không tồn tại"
             )
         
-        return BaseResponse(data=JobSpecResponse(**job_spec.dict()))
+        etag = make_etag(job_spec.id, job_spec.updated_at.isoformat())
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         
+        return BaseResponse(data=JobSpecResponse(**job_spec.dict()))
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi lấy job spec: {e}")
+        logger.error("Lỗi lấy job spec: %s", e)
         raise handle_exception(e)
 
 
 @router.put("/{job_spec_id}", response_model=BaseResponse, summary="Cập nhật Job Spec")
-async def update_job_spec(job_spec_id: str, update_data: JobSpecUpdate):
+async def update_job_spec(
+    job_spec_id: str,
+    update_data: JobSpecUpdate,
+    job_spec_service: JobSpecService = Depends(get_job_spec_service)
+):
     """
     Cập nhật job specification
     """
@@ -118,16 +154,19 @@ async def update_job_spec(job_spec_id: str, update_data: JobSpecUpdate):
             )
         
         return BaseResponse(message="Cập nhật job spec thành công")
-        
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi cập nhật job spec: {e}")
+        logger.error("Lỗi cập nhật job spec: %s", e)
         raise handle_exception(e)
 
 
 @router.delete("/{job_spec_id}", response_model=BaseResponse, summary="Xóa Job Spec")
-async def delete_job_spec(job_spec_id: str):
+async def delete_job_spec(
+    job_spec_id: str,
+    job_spec_service: JobSpecService = Depends(get_job_spec_service)
+):
     """
     Xóa job specification
     """
@@ -140,17 +179,21 @@ async def delete_job_spec(job_spec_id: str):
             )
         
         return BaseResponse(message="Xóa job spec thành công")
-        
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi xóa job spec: {e}")
+        logger.error("Lỗi xóa job spec: %s", e)
         raise handle_exception(e)
 
 
 # Execution endpoints
 @router.post("/{job_spec_id}/executions", response_model=BaseResponse, summary="Bắt đầu Execution")
-async def start_execution(job_spec_id: str, execution_data: ExecutionCreate):
+async def start_execution(
+    job_spec_id: str,
+    execution_data: ExecutionCreate,
+    execution_service: ExecutionService = Depends(get_execution_service)
+):
     """
     Bắt đầu execution từ job spec
     
@@ -163,57 +206,164 @@ async def start_execution(job_spec_id: str, execution_data: ExecutionCreate):
             message="Bắt đầu execution thành công",
             data=result
         )
-        
+    
     except Exception as e:
-        logger.error(f"Lỗi bắt đầu execution: {e}")
+        logger.error("Lỗi bắt đầu execution: %s", e)
         raise handle_exception(e)
 
 
-@router.get("/{job_spec_id}/executions", response_model=BaseResponse, summary="Lấy danh sách Executions")
+@router.get("/{job_spec_id}/executions", response_model=DataResponse[ExecutionListResponse],
+            response_class=ORJSONResponse, summary="Lấy danh sách Executions")
 async def list_executions(
     job_spec_id: str,
+    request: Request,
     page: int = Query(1, ge=1, description="Số trang"),
     size: int = Query(20, ge=1, le=100, description="Kích thước trang"),
     status: Optional[JobStatus] = Query(None, description="Lọc theo trạng thái"),
     started_by: Optional[str] = Query(None, description="Lọc theo người bắt đầu"),
     sort_by: str = Query("started_at", description="Trường sắp xếp"),
-    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Thứ tự sắp xếp")
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Thứ tự sắp xếp"),
+    cursor: Optional[str] = Query(None, description="Cursor trang tiếp theo (next_cursor của response trước)"),
+    include_total: bool = Query(True, description="Có trả về tổng số bản ghi hay không"),
+    estimated_total: bool = Query(False, description="Dùng tổng số ước lượng của collection khi không có filter"),
+    execution_service: ExecutionService = Depends(get_execution_service)
 ):
     """
     Lấy danh sách executions của job spec
     """
     try:
-        executions, total = await execution_service.list_executions(
+        etag = make_etag(execution_service.list_version(), request.url.path, request.url.query)
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        
+        executions, total, next_cursor = await execution_service.list_executions(
             page=page,
             size=size,
             job_spec_id=job_spec_id,
             status=status,
             started_by=started_by,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            cursor=cursor,
+            include_total=include_total,
+            estimated_total=estimated_total
         )
         
-        execution_responses = []
-        for execution in executions:
-            execution_responses.append(ExecutionResponse(**execution.dict()))
+        return data_response({
+            "executions": dump_trusted(executions, ExecutionResponse),
+            "total": total,
+            "page": page,
+            "size": size,
+            "next_cursor": next_cursor
+        }, headers={"ETag": etag})
+    
+    except Exception as e:
+        logger.error("Lỗi lấy danh sách executions: %s", e)
+        raise handle_exception(e)
+
+
+# Global execution endpoints
+@router.post("/executions:batchStart", response_model=BaseResponse, summary="Bắt đầu nhiều Execution")
+async def batch_start_executions(
+    request: BatchExecutionStartRequest,
+    execution_service: ExecutionService = Depends(get_execution_service)
+):
+    """
+    Bắt đầu execution cho nhiều job spec
+    
+    - **job_spec_ids**: Danh sách ID job spec
+    - **started_by**: Người bắt đầu execution
+    
+    Các lời gọi Flink chạy song song (giới hạn bởi EXECUTION_BATCH_CONCURRENCY);
+    kết quả trả về cho từng phần tử, phần tử lỗi không làm dừng các phần tử còn lại
+    """
+    try:
+        results = await execution_service.batch_start(request.job_spec_ids, request.started_by)
+        succeeded = sum(1 for result in results if result["success"])
         
         return BaseResponse(
-            data={
-                "executions": execution_responses,
-                "total": total,
-                "page": page,
-                "size": size
-            }
+            message=f"Đã bắt đầu {succeeded}/{len(results)} execution",
+            data={"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+        )
+    
+    except Exception as e:
+        logger.error("Lỗi bắt đầu batch execution: %s", e)
+        raise handle_exception(e)
+
+
+@router.post("/executions:batchStop", response_model=BaseResponse, summary="Dừng nhiều Execution")
+async def batch_stop_executions(
+    request: BatchExecutionStopRequest,
+    execution_service: ExecutionService = Depends(get_execution_service)
+):
+    """
+    Dừng nhiều execution
+    
+    - **execution_ids**: Danh sách ID execution
+    - **savepoint**: Tạo savepoint trước khi dừng
+    - **savepoint_path**: Đường dẫn savepoint
+    """
+    try:
+        results = await execution_service.batch_stop(
+            request.execution_ids,
+            savepoint=request.savepoint,
+            savepoint_path=request.savepoint_path
         )
+        succeeded = sum(1 for result in results if result["success"])
         
+        return BaseResponse(
+            message=f"Đã dừng {succeeded}/{len(results)} execution",
+            data={"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+        )
+    
     except Exception as e:
-        logger.error(f"Lỗi lấy danh sách executions: {e}")
+        logger.error("Lỗi dừng batch execution: %s", e)
         raise handle_exception(e)
 
 
-# Global execution endpoints
+@router.get("/executions/stream", summary="Stream thay đổi trạng thái Executions (SSE)")
+async def stream_executions(
+    job_spec_id: Optional[str] = Query(None, description="Chỉ nhận event của job spec này"),
+    execution_id: Optional[List[str]] = Query(None, description="Chỉ nhận event của các execution này"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID", description="Tiếp tục từ event đã nhận cuối cùng"),
+    execution_events: ExecutionEventBroadcaster = Depends(get_execution_events)
+):
+    """
+    Server-Sent Events: đẩy mỗi ExecutionHistory mới ngay khi được ghi.
+    Kết nối lại với header Last-Event-ID để nhận các event bị lỡ
+    """
+    async def event_stream():
+        # Đăng ký khi body bắt đầu được gửi: nếu client ngắt trước đó (generator chưa chạy,
+        # aclose() không chạy finally) thì không còn subscriber nào bị bỏ lại
+        subscription = execution_events.subscribe(job_spec_id, execution_id, last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            for event in subscription.backlog:
+                yield execution_events.format_event(event)
+            subscription.backlog = []
+            
+            while not subscription.dropped:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.sse_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield execution_events.format_event(event)
+        finally:
+            execution_events.unsubscribe(subscription)
+    
+    return ClosingStreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/executions/{execution_id}", response_model=BaseResponse, summary="Lấy Execution theo ID")
-async def get_execution(execution_id: str):
+async def get_execution(
+    execution_id: str,
+    execution_service: ExecutionService = Depends(get_execution_service)
+):
     """
     Lấy thông tin chi tiết của execution theo ID
     """
@@ -226,16 +376,21 @@ async def get_execution(execution_id: str):
             )
         
         return BaseResponse(data=ExecutionResponse(**execution.dict()))
-        
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi lấy execution: {e}")
+        logger.error("Lỗi lấy execution: %s", e)
         raise handle_exception(e)
 
 
 @router.post("/executions/{execution_id}/stop", response_model=BaseResponse, summary="Dừng Execution")
-async def stop_execution(execution_id: str, savepoint: bool = False, savepoint_path: Optional[str] = None):
+async def stop_execution(
+    execution_id: str,
+    savepoint: bool = False,
+    savepoint_path: Optional[str] = None,
+    execution_service: ExecutionService = Depends(get_execution_service)
+):
     """
     Dừng execution
     
@@ -253,32 +408,35 @@ async def stop_execution(execution_id: str, savepoint: bool = False, savepoint_p
             message="Dừng execution thành công",
             data=result
         )
-        
+    
     except Exception as e:
-        logger.error(f"Lỗi dừng execution: {e}")
+        logger.error("Lỗi dừng execution: %s", e)
         raise handle_exception(e)
 
 
-@router.get("/executions/{execution_id}/history", response_model=BaseResponse, summary="Lấy lịch sử Execution")
-async def get_execution_history(execution_id: str):
+@router.get("/executions/{execution_id}/history", response_model=DataResponse[ExecutionHistoryListResponse],
+            response_class=ORJSONResponse, summary="Lấy lịch sử Execution")
+async def get_execution_history(
+    execution_id: str,
+    request: Request,
+    execution_service: ExecutionService = Depends(get_execution_service)
+):
     """
     Lấy lịch sử thay đổi trạng thái của execution
     """
     try:
-        history = await execution_service.get_execution_history(execution_id)
-        
-        history_responses = []
-        for h in history:
-            history_responses.append(ExecutionHistoryResponse(**h.dict()))
+        etag = make_etag(execution_service.history_version(), request.url.path, request.url.query)
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
         
-        return BaseResponse(
-            data={
-                "execution_id": execution_id,
-                "history": history_responses,
-                "total": len(history_responses)
-            }
-        )
+        history = await execution_service.get_execution_history(execution_id)
         
+        return data_response({
+            "execution_id": execution_id,
+            "history": dump_trusted(history, ExecutionHistoryResponse),
+            "total": len(history)
+        }, headers={"ETag": etag})
+    
     except Exception as e:
-        logger.error(f"Lỗi lấy execution history: {e}")
+        logger.error("Lỗi lấy execution history: %s", e)
         raise handle_exception(e)
@@ -38,7 +38,7 @@ async def create_job_config(job_data: JobConfigCreate):
         )
         
     except Exception as e:
-        logger.error(f"Lỗi tạo job config: {e}")
+        logger.error("Lỗi tạo job config: %s", e)
         raise handle_exception(e)
 
 
@@ -78,7 +78,7 @@ async def list_job_configs(
         )
         
     except Exception as e:
-        logger.error(f"Lỗi lấy danh sách job configs: {e}")
+        logger.error("Lỗi lấy danh sách job configs: %s", e)
         raise handle_exception(e)
 
 
@@ -100,7 +100,7 @@ async def get_job_config(job_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi lấy job config: {e}")
+        logger.error("Lỗi lấy job config: %s", e)
         raise handle_exception(e)
 
 
@@ -122,7 +122,7 @@ async def update_job_config(job_id: str, update_data: JobConfigUpdate):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi cập nhật job config: {e}")
+        logger.error("Lỗi cập nhật job config: %s", e)
         raise handle_exception(e)
 
 
@@ -144,7 +144,7 @@ async def delete_job_config(job_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi xóa job config: {e}")
+        logger.error("Lỗi xóa job config: %s", e)
         raise handle_exception(e)
 
 
@@ -164,7 +164,7 @@ async def deploy_job(job_id: str, deploy_request: JobDeployRequest):
         )
         
     except Exception as e:
-        logger.error(f"Lỗi deploy job: {e}")
+        logger.error("Lỗi deploy job: %s", e)
         raise handle_exception(e)
 
 
@@ -189,7 +189,7 @@ async def stop_job(job_id: str, stop_request: JobStopRequest):
         )
         
     except Exception as e:
-        logger.error(f"Lỗi stop job: {e}")
+        logger.error("Lỗi stop job: %s", e)
         raise handle_exception(e)
 
 
@@ -214,7 +214,7 @@ async def get_deployment_history(job_id: str):
         )
         
     except Exception as e:
-        logger.error(f"Lỗi lấy deployment history: {e}")
+        logger.error("Lỗi lấy deployment history: %s", e)
         raise handle_exception(e)
 
 
@@ -236,6 +236,6 @@ async def get_job_config_by_name(job_name: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Lỗi lấy job config: {e}")
+        logger.error("Lỗi lấy job config: %s", e)
         raise handle_exception(e)
 
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -11,18 +11,95 @@ class Settings(BaseSettings):
     debug: bool = False
     
     # Database Settings
+    database_backend: str = "mock"  # "mock" (in-memory) hoặc "mongo"
     mongodb_url: str = "mongodb://localhost:27017"
     mongodb_database: str = "flink_manager"
     
     # MinIO Settings
+    storage_backend: str = "mock"  # "mock" (in-memory) hoặc "minio"
     minio_endpoint: str = "localhost:9000"
     minio_access_key: str = "minioadmin"
     minio_secret_key: str = "minioadmin"
     minio_bucket: str = "artifacts"
     minio_secure: bool = False
+    minio_part_size: int = 16 * 1024 * 1024  # Kích thước mỗi part khi multipart upload
+    minio_executor_workers: int = 32  # Số thread tối đa cho các lời gọi MinIO SDK
+    minio_max_concurrent_uploads: int = 8
+    minio_max_concurrent_downloads: int = 16
+    minio_max_concurrent_requests: int = 16  # stat/delete/presign
+    
+    # Upload Settings
+    upload_chunk_size: int = 1024 * 1024  # Kích thước chunk khi đọc file upload
+    download_chunk_size: int = 1024 * 1024  # Kích thước chunk khi stream file download
+    upload_hash_chunk_size: int = 8 * 1024 * 1024  # Chunk lớn khi tính SHA256 (hashlib nhả GIL)
+    upload_pipeline_min_bytes: int = 64 * 1024 * 1024  # File từ kích thước này được hash trong lúc upload
+    upload_checksum_algorithm: str = ""  # Checksum bổ sung lưu kèm object: "" / "md5" / "crc32c"
+    
+    # Count Cache Settings (cache tổng số bản ghi của các list endpoint)
+    count_cache_ttl_seconds: float = 5.0
+    count_cache_max_entries: int = 1024
+    
+    # Metadata Cache Settings (artifact / job spec đọc theo ID)
+    metadata_cache_ttl_seconds: float = 30.0
+    metadata_cache_negative_ttl_seconds: float = 5.0  # Thời gian cache kết quả không tìm thấy
+    metadata_cache_max_entries: int = 10000
+    
+    # JAR Inspection Settings (kiểm tra MANIFEST.MF / entry class lúc upload)
+    jar_inspection_enabled: bool = True
+    jar_inspect_workers: int = 2  # Số process parse central directory / class file
+    jar_inspect_max_classes: int = 5000  # Số class ứng viên tối đa được đọc để tìm main
+    
+    # Artifact Search Settings
+    search_min_prefix_length: int = 2  # Token ngắn hơn chỉ khớp chính xác, không khớp prefix
+    search_max_candidates: int = 10000  # Số artifact tối đa được chấm điểm cho một query (MongoDB)
+    
+    # Artifact Cache Settings (cache LRU trên đĩa cho các blob hay được tải)
+    artifact_cache_enabled: bool = False
+    artifact_cache_dir: str = "/tmp/flink-manager/artifact-cache"
+    artifact_cache_max_bytes: int = 10 * 1024 * 1024 * 1024
     
     # Flink Settings
+    flink_backend: str = "mock"  # "mock" hoặc "rest" (Flink REST API thật)
     flink_rest_api_url: str = "http://localhost:8081"
+    flink_max_connections: int = 20  # Số connection tối đa tới JobManager
+    flink_max_keepalive_connections: int = 20
+    flink_keepalive_expiry: float = 30.0
+    flink_connect_timeout: float = 5.0
+    flink_request_timeout: float = 30.0
+    flink_upload_timeout: float = 300.0  # Upload JAR lớn cần timeout dài hơn
+    flink_max_retries: int = 3
+    flink_retry_backoff: float = 0.2  # Backoff cơ sở (giây), tăng gấp đôi mỗi lần retry
+    flink_retry_max_backoff: float = 5.0
+    flink_jar_list_ttl_seconds: float = 10.0  # Thời gian cache danh sách /jars khi kiểm tra jar ID
+    
+    # Execution Reconciler Settings (đồng bộ trạng thái execution với Flink)
+    reconcile_enabled: bool = True
+    reconcile_interval_min: float = 2.0
+    reconcile_interval_max: float = 30.0
+    reconcile_missing_grace_seconds: float = 60.0  # Job không có trên cluster quá lâu -> FAILED
+    
+    # Batch start/stop execution
+    execution_batch_concurrency: int = 16  # Số lời gọi Flink đồng thời tối đa trong một batch
+    execution_batch_max_items: int = 1000  # Số phần tử tối đa trong một request batch
+    
+    # Execution Event Stream Settings (SSE)
+    sse_queue_size: int = 256  # Số event tối đa chờ gửi cho mỗi subscriber trước khi bị ngắt
+    sse_replay_buffer_size: int = 10000  # Số event gần nhất giữ lại cho Last-Event-ID
+    sse_heartbeat_seconds: float = 15.0
+    
+    # Logging Settings
+    log_level: str = "INFO"
+    log_format: str = "json"  # "json" (một object mỗi dòng) hoặc "text"
+    log_rate_limit_per_second: int = 20  # Số log INFO tối đa mỗi giây cho cùng một message template (0 = không giới hạn)
+    
+    # Request Log Settings
+    request_log_enabled: bool = True
+    request_log_sample_rate: float = 1.0  # Tỷ lệ request thành công được log (5xx / request chậm luôn được log)
+    request_log_slow_seconds: float = 1.0
+    request_log_exclude_paths: List[str] = ["/api/v1/health/live", "/api/v1/health/ready", "/metrics"]
+    
+    # Metrics Settings (endpoint /metrics cho Prometheus)
+    metrics_enabled: bool = True
     
     # Security Settings
     secret_key: str = "your-secret-key-here"
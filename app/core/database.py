@@ -1,39 +1,47 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from app.config import settings
+from app.utils.search import artifact_search_tokens
+from app.utils.semver import safe_version_key
+from typing import TYPE_CHECKING, Optional
 import logging
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
 logger = logging.getLogger(__name__)
 
 
 class Database:
-    client: AsyncIOMotorClient = None
-    database: AsyncIOMotorDatabase = None
+    client: Optional["AsyncIOMotorClient"] = None
+    database: Optional["AsyncIOMotorDatabase"] = None
 
 
 db = Database()
 
 
 async def connect_to_mongo():
-    """Kết nối đến MongoDB"""
-    try:
-        # Sử dụng mock mode nếu không có MongoDB
+    """Kết nối đến MongoDB (backend được chọn bằng DATABASE_BACKEND)"""
+    if settings.database_backend != "mongo":
         logger.info("Sử dụng mock database mode")
         return
+    
+    # Driver chỉ được import khi dùng MongoDB thật
+    from motor.motor_asyncio import AsyncIOMotorClient
+    
+    try:
+        db.client = AsyncIOMotorClient(settings.mongodb_url)
+        db.database = db.client[settings.mongodb_database]
         
-        # Code thực tế cho MongoDB (commented out)
-        # db.client = AsyncIOMotorClient(settings.mongodb_url)
-        # db.database = db.client[settings.mongodb_database]
-        # 
-        # # Test connection
-        # await db.client.admin.command('ping')
-        # logger.info("Kết nối MongoDB thành công")
-        # 
-        # # Tạo indexes
-        # await create_indexes()
+        # Test connection
+        await db.client.admin.command('ping')
+        logger.info("Kết nối MongoDB thành công")
         
+        # Tạo indexes
+        await create_indexes()
+        await backfill_artifact_fields()
+    
     except Exception as e:
-        logger.warning(f"Sử dụng mock database: {e}")
-        pass
+        logger.error("Không thể kết nối MongoDB: %s", e)
+        raise
 
 
 async def close_mongo_connection():
@@ -50,24 +58,64 @@ async def create_indexes():
         await db.database.artifacts.create_index("artifact_name")
         await db.database.artifacts.create_index("version")
         await db.database.artifacts.create_index([("artifact_name", 1), ("version", 1)], unique=True)
+        # Multikey index phục vụ tìm kiếm theo token / prefix của token
+        await db.database.artifacts.create_index("search_tokens")
+        # Phiên bản theo thứ tự semver trong từng artifact (latest / range chỉ cần một lần seek)
+        await db.database.artifacts.create_index([("artifact_name", 1), ("version_key", -1)])
         
-        # Index cho job_configs collection
-        await db.database.job_configs.create_index("job_name", unique=True)
-        await db.database.job_configs.create_index("artifact_id")
-        await db.database.job_configs.create_index("status")
-        await db.database.job_configs.create_index("created_by")
+        # Index cho job_specs collection
+        await db.database.job_specs.create_index("job_spec_name", unique=True)
+        await db.database.job_specs.create_index("artifact_id")
+        await db.database.job_specs.create_index([("created_by", 1), ("created_at", -1)])
+        await db.database.job_specs.create_index("created_at")
         
-        # Index cho deployment_history collection
-        await db.database.deployment_history.create_index("job_id")
-        await db.database.deployment_history.create_index("deployed_at")
+        # Index cho executions collection
+        await db.database.executions.create_index([("job_spec_id", 1), ("started_at", -1)])
+        await db.database.executions.create_index([("status", 1), ("started_at", -1)])
+        await db.database.executions.create_index([("started_by", 1), ("started_at", -1)])
+        await db.database.executions.create_index("started_at")
+        await db.database.executions.create_index("flink_job_id")
         
-        logger.info("Đã tạo các index thành công")
+        # Index cho execution_history collection
+        await db.database.execution_history.create_index([("execution_id", 1), ("performed_at", -1)])
         
+        logger.info("Đã tạo các index thành công")
+    
+    except Exception as e:
+        logger.error("Lỗi tạo index: %s", e)
+
+
+async def backfill_artifact_fields(batch_size: int = 1000):
+    """Tính search_tokens / version_key cho các artifact được tạo trước khi có các field này"""
+    from pymongo import UpdateOne
+    
+    try:
+        cursor = db.database.artifacts.find(
+            {"$or": [{"search_tokens": {"$exists": False}}, {"version_key": {"$exists": False}}]},
+            {"artifact_name": 1, "version": 1, "metadata.entry_classes": 1, "metadata.description": 1}
+        )
+        updates = []
+        updated = 0
+        async for doc in cursor:
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+                "search_tokens": artifact_search_tokens(doc),
+                "version_key": safe_version_key(doc.get("version"))
+            }}))
+            if len(updates) >= batch_size:
+                await db.database.artifacts.bulk_write(updates, ordered=False)
+                updated += len(updates)
+                updates = []
+        if updates:
+            await db.database.artifacts.bulk_write(updates, ordered=False)
+            updated += len(updates)
+        if updated:
+            logger.info("Đã cập nhật search_tokens / version_key cho %s artifact", updated)
+    
     except Exception as e:
-        logger.error(f"Lỗi tạo index: {e}")
+        logger.error("Lỗi cập nhật field của artifact: %s", e)
 
 
-def get_database() -> AsyncIOMotorDatabase:
+def get_database() -> Optional["AsyncIOMotorDatabase"]:
     """Lấy database instance"""
     return db.database
 
@@ -34,6 +34,29 @@ class JobConfigNotFoundError(FlinkManagerException):
         )
 
 
+class ExecutionNotFoundError(FlinkManagerException):
+    """Execution không tồn tại"""
+    def __init__(self, execution_id: str):
+        super().__init__(
+            message=f"Execution với ID {execution_id} không tồn tại",
+            error_code="EXECUTION_NOT_FOUND",
+            details={"execution_id": execution_id}
+        )
+
+
+class ExecutionStateConflictError(FlinkManagerException):
+    """Trạng thái execution đã bị thay đổi ở nơi khác (reconciler, request khác)"""
+    def __init__(self, execution_id: str, expected_status: Any, current_status: Any):
+        expected_status = getattr(expected_status, "value", expected_status)
+        current_status = getattr(current_status, "value", current_status)
+        super().__init__(
+            message=f"Execution {execution_id} đã chuyển sang trạng thái {current_status}",
+            error_code="EXECUTION_STATE_CONFLICT",
+            details={"execution_id": execution_id, "expected_status": expected_status,
+                     "current_status": current_status}
+        )
+
+
 class ArtifactVersionExistsError(FlinkManagerException):
     """Phiên bản artifact đã tồn tại"""
     def __init__(self, artifact_name: str, version: str):
@@ -54,6 +77,46 @@ class JobNameExistsError(FlinkManagerException):
         )
 
 
+class InvalidArtifactError(FlinkManagerException):
+    """File upload không phải JAR hợp lệ"""
+    def __init__(self, reason: str):
+        super().__init__(
+            message=f"JAR không hợp lệ: {reason}",
+            error_code="INVALID_ARTIFACT",
+            details={"reason": reason}
+        )
+
+
+class InvalidCursorError(FlinkManagerException):
+    """Cursor phân trang không hợp lệ"""
+    def __init__(self, cursor: str):
+        super().__init__(
+            message="Cursor phân trang không hợp lệ hoặc không khớp với điều kiện sắp xếp",
+            error_code="INVALID_CURSOR",
+            details={"cursor": cursor}
+        )
+
+
+class InvalidVersionRangeError(FlinkManagerException):
+    """Điều kiện version (range) không hợp lệ"""
+    def __init__(self, version_range: str, reason: str):
+        super().__init__(
+            message=reason,
+            error_code="INVALID_VERSION_RANGE",
+            details={"version_range": version_range}
+        )
+
+
+class NoMatchingVersionError(FlinkManagerException):
+    """Không có phiên bản artifact nào thỏa điều kiện version"""
+    def __init__(self, artifact_name: str, version_range: Optional[str] = None):
+        super().__init__(
+            message=f"Artifact {artifact_name} không có phiên bản nào thỏa '{version_range or '*'}'",
+            error_code="NO_MATCHING_VERSION",
+            details={"artifact_name": artifact_name, "version_range": version_range}
+        )
+
+
 class FlinkClusterError(FlinkManagerException):
     """Lỗi từ Flink cluster"""
     def __init__(self, message: str, flink_error: Optional[str] = None):
@@ -80,9 +143,10 @@ def handle_exception(exc: Exception) -> HTTPException:
         status_code = status.HTTP_400_BAD_REQUEST
         
         # Map specific errors to appropriate HTTP status codes
-        if isinstance(exc, (ArtifactNotFoundError, JobConfigNotFoundError)):
+        if isinstance(exc, (ArtifactNotFoundError, JobConfigNotFoundError, ExecutionNotFoundError,
+                            NoMatchingVersionError)):
             status_code = status.HTTP_404_NOT_FOUND
-        elif isinstance(exc, (ArtifactVersionExistsError, JobNameExistsError)):
+        elif isinstance(exc, (ArtifactVersionExistsError, JobNameExistsError, ExecutionStateConflictError)):
             status_code = status.HTTP_409_CONFLICT
         elif isinstance(exc, (FlinkClusterError, MinIOError)):
             status_code = status.HTTP_502_BAD_GATEWAY
@@ -97,7 +161,7 @@ def handle_exception(exc: Exception) -> HTTPException:
         )
     
     # Log unexpected errors
-    logger.error(f"Unexpected error: {exc}", exc_info=True)
+    logger.error("Unexpected error: %s", exc, exc_info=True)
     
     return HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,140 @@
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, Optional, Tuple
+import atexit
+import logging
+import queue
+import sys
+import time
+
+import orjson
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Access log đã có sampling riêng (REQUEST_LOG_SAMPLE_RATE), không bị rate limit theo template
+RATE_LIMIT_EXEMPT_LOGGERS = ("app.access",)
+
+# Request ID của request đang xử lý (được gắn vào mọi log record trong request đó)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Mỗi record là một dòng JSON: ts, level, logger, message, request_id (+ exc, suppressed)"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class RequestIdFilter(logging.Filter):
+    """Gắn request_id từ context của request vào record (chạy trên thread tạo log)"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Giới hạn số record dưới WARNING cho mỗi message template (logger + format string
+    chưa merge args) trong mỗi giây; record bị bỏ được đếm và số lượng được gắn vào
+    record đầu tiên được cho qua ở giây tiếp theo (field suppressed)
+    """
+    
+    def __init__(self, per_second: int, exempt_loggers: Iterable[str] = ()):
+        super().__init__()
+        self.per_second = per_second
+        self.exempt_loggers = frozenset(exempt_loggers)
+        # (logger, template) -> [giây hiện tại, số record đã cho qua, số record bị bỏ]
+        self._windows: Dict[Tuple[str, object], list] = {}
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or record.name in self.exempt_loggers:
+            return True
+        
+        second = int(time.monotonic())
+        key = (record.name, record.msg)
+        window = self._windows.get(key)
+        if window is None:
+            self._windows[key] = [second, 1, 0]
+            return True
+        if window[0] != second:
+            record.suppressed = window[2]
+            window[:] = [second, 1, 0]
+            return True
+        if window[1] < self.per_second:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler không format record trước khi đưa vào queue: việc merge args, format
+    exception và ghi ra stream đều chạy trên thread của QueueListener. Queue chỉ dùng
+    trong process nên record không cần pickle được
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: str = "INFO", log_format: str = "json", rate_limit_per_second: int = 0):
+    """
+    Cấu hình root logger: handler của root chỉ đưa record vào queue, một QueueListener
+    trên thread riêng format và ghi ra stderr để event loop không bị chặn bởi I/O
+    """
+    global _listener
+    stop_logging()
+    
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    if rate_limit_per_second > 0:
+        queue_handler.addFilter(RateLimitFilter(rate_limit_per_second, RATE_LIMIT_EXEMPT_LOGGERS))
+    
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+    
+    # Các field không dùng trong format: bỏ việc dò stack frame (findCaller) và lấy
+    # thông tin thread / process khi tạo mỗi record
+    if log_format == "json":
+        logging._srcfile = None
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+    
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Dừng listener sau khi ghi hết các record còn trong queue"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,248 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import functools
+import inspect
+import threading
+import time
+
+# Bucket mặc định (giây) cho latency của request và lời gọi dependency
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Bucket (byte) cho kích thước response: 100B .. 1GB
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Metric có label: mỗi bộ giá trị label là một child, được tạo lần đầu khi dùng và giữ lại
+    
+    Child được cập nhật dưới một lock chung của metric (các lời gọi MinIO SDK chạy trên
+    thread pool); lock không bị tranh chấp nên chi phí chỉ vài chục ns
+    """
+    
+    kind = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+    
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+    
+    def __init__(self, lock: threading.Lock):
+        self.value = 0.0
+        self._lock = lock
+    
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+    
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def _new_child(self) -> _Value:
+        return _Value(self._lock)
+    
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+    
+    def __init__(self, bounds: Tuple[float, ...], lock: threading.Lock):
+        self.bounds = bounds
+        # counts[i]: số quan sát rơi vào bucket i (không cộng dồn), phần tử cuối là +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = lock
+    
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets, self._lock)
+    
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Tập các metric của process, render theo Prometheus text exposition format"""
+    
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+    
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+# Global instance
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "Số HTTP request đã xử lý", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "Latency của HTTP request theo route template", ("method", "route")
+))
+http_response_size_bytes = registry.register(Histogram(
+    "http_response_size_bytes", "Kích thước body của response", ("method", "route"), buckets=SIZE_BUCKETS
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Số HTTP request đang được xử lý", ("method",)
+))
+dependency_calls_total = registry.register(Counter(
+    "dependency_calls_total", "Số lời gọi tới dependency bên ngoài", ("dependency", "operation", "outcome")
+))
+dependency_call_duration_seconds = registry.register(Histogram(
+    "dependency_call_duration_seconds", "Latency của lời gọi dependency", ("dependency", "operation")
+))
+
+
+def _record_call(dependency: str, operation: str, started: float, outcome: str):
+    dependency_call_duration_seconds.labels(dependency, operation).observe(time.perf_counter() - started)
+    dependency_calls_total.labels(dependency, operation, outcome).inc()
+
+
+def _instrument(func: Callable, dependency: str, operation: str) -> Callable:
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException:
+                _record_call(dependency, operation, started, "error")
+                raise
+            _record_call(dependency, operation, started, "success")
+            return result
+        return async_wrapper
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            _record_call(dependency, operation, started, "error")
+            raise
+        _record_call(dependency, operation, started, "success")
+        return result
+    return wrapper
+
+
+def instrument_dependency(dependency: str, exclude: Iterable[str] = ()) -> Callable[[type], type]:
+    """
+    Class decorator: đếm số lời gọi và đo latency của mọi public method (sync hoặc async)
+    của service gọi ra dependency bên ngoài, operation là tên method.
+    staticmethod / property / async generator và các method trong exclude được bỏ qua
+    """
+    excluded = set(exclude)
+    
+    def decorator(cls: type) -> type:
+        for name, attr in list(vars(cls).items()):
+            if name.startswith("_") or name in excluded:
+                continue
+            if not inspect.isfunction(attr) or inspect.isasyncgenfunction(attr):
+                continue
+            setattr(cls, name, _instrument(attr, dependency, name))
+        return cls
+    return decorator
+
+
+def route_template(scope: dict) -> Optional[str]:
+    """Path template của route đã khớp ("/api/v1/artifacts/{artifact_id}"), None nếu không khớp route nào"""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    regex = getattr(route, "path_regex", None)
+    if template is None or regex is None:
+        return template
+    
+    # Router được include không bị làm phẳng: route chỉ biết path tương đối với router,
+    # prefix là phần đầu của path mà phần còn lại khớp với regex của route
+    path = scope.get("path", "")
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    start = 0
+    while start != -1:
+        if regex.match(path[start:]):
+            return path[:start] + template
+        start = path.find("/", start + 1)
+    return template
@@ -0,0 +1,142 @@
+from typing import Iterable
+import logging
+import random
+import time
+import uuid
+
+from app.core.logging_config import request_id_var
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+    http_response_size_bytes,
+    route_template,
+)
+
+logger = logging.getLogger("app.access")
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Request ID nhận từ client dài hơn giới hạn này bị bỏ qua và sinh ID mới
+MAX_REQUEST_ID_LENGTH = 128
+
+# Label route của request không khớp route nào (404), tránh mỗi path lạ thành một series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware ghi metrics của HTTP request: latency, kích thước response theo
+    route template và số request đang xử lý
+    
+    Chỉ quan sát các message gửi đi (status, độ dài body), không bọc hay buffer
+    body nên không ảnh hưởng tới streaming response
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status = 500
+        size = 0
+        
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+        
+        in_flight = http_requests_in_flight.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            route = route_template(scope) or UNMATCHED_ROUTE
+            http_request_duration_seconds.labels(method, route).observe(elapsed)
+            http_response_size_bytes.labels(method, route).observe(size)
+            http_requests_total.labels(method, route, str(status)).inc()
+
+
+class RequestLoggingMiddleware:
+    """
+    ASGI middleware log mỗi request (method, path, status, thời gian xử lý)
+    
+    - Path trong exclude_paths (health probe, /metrics) không được log và không bị đo
+    - Request thành công chỉ được log theo tỷ lệ sample_rate; request lỗi 5xx hoặc chậm
+      hơn slow_seconds luôn được log
+    - Như MetricsMiddleware, chỉ đọc status từ message http.response.start, không bọc body
+    """
+    
+    def __init__(self, app, sample_rate: float = 1.0, exclude_paths: Iterable[str] = (),
+                 slow_seconds: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.exclude_paths = frozenset(exclude_paths)
+        self.slow_seconds = slow_seconds
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            if status >= 500 or elapsed >= self.slow_seconds or random.random() < self.sample_rate:
+                logger.info("%s %s - Status: %d - Time: %.3fs", scope["method"], scope["path"], status, elapsed)
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware gán request ID cho mỗi request: lấy từ header X-Request-ID của client
+    (hoặc sinh mới), đặt vào context để mọi log trong request có request_id và trả lại
+    trong header X-Request-ID của response
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                if len(value) <= MAX_REQUEST_ID_LENGTH:
+                    request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", ()), (REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,74 @@
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+import functools
+import orjson
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse serialize bằng orjson (datetime, Enum được hỗ trợ trực tiếp)"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ReleasingFileResponse(FileResponse):
+    """
+    FileResponse luôn gọi on_close khi kết thúc, kể cả khi client ngắt kết nối giữa chừng
+    (BackgroundTask của response không chạy nếu việc gửi body bị lỗi)
+    """
+    
+    def __init__(self, path: str, on_close: Callable[[], Any], **kwargs):
+        super().__init__(path, **kwargs)
+        self.on_close = on_close
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse luôn gọi aclose() của body iterator khi kết thúc, kể cả khi client
+    ngắt kết nối trước hoặc giữa lúc gửi body (trả connection tới object storage về pool)
+    """
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+
+
+@functools.lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+@functools.lru_cache(maxsize=None)
+def _response_fields(response_model: Type[BaseModel]) -> Dict[str, set]:
+    return {"__all__": set(response_model.model_fields)}
+
+
+def dump_trusted(items: Sequence[BaseModel], response_model: Type[BaseModel]) -> List[Dict[str, Any]]:
+    """
+    Chuyển danh sách model đọc từ database sang dict theo các field của response_model
+    
+    Các model này đã được validate khi load nên không tạo/validate lại response model
+    cho từng dòng; toàn bộ danh sách được dump một lần bởi pydantic-core
+    """
+    if not items:
+        return []
+    return _list_adapter(type(items[0])).dump_python(list(items), include=_response_fields(response_model))
+
+
+def data_response(data: Any, message: str = "Thành công", headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """Response thành công theo định dạng BaseResponse, serialize bằng orjson"""
+    return ORJSONResponse({"success": True, "message": message, "data": data}, headers=headers)
+
+
+def not_modified(etag: str) -> Response:
+    """Response 304 cho conditional GET (không có body)"""
+    return Response(status_code=304, headers={"ETag": etag})
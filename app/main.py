@@ -1,23 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 import logging
-import time
 
 from app.config import settings
 from app.core.database import connect_to_mongo, close_mongo_connection
 from app.core.exceptions import handle_exception
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry
+from app.core.logging_config import setup_logging
+from app.core.middleware import MetricsMiddleware, RequestIdMiddleware, RequestLoggingMiddleware
+from app.services.container import ServiceContainer
 from app.api.v1 import artifacts, job_specs, health
 
-# Cấu hình logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Cấu hình logging (ghi log qua queue trên thread riêng)
+setup_logging(settings.log_level, settings.log_format, settings.log_rate_limit_per_second)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Khởi tạo service khi ứng dụng start và dọn dẹp khi tắt"""
+    logger.info("Đang khởi động Flink Manager API...")
+    services = ServiceContainer()
+    app.state.services = services
+    
+    try:
+        await connect_to_mongo()
+        services.startup()
+        logger.info("Flink Manager API đã sẵn sàng!")
+    except Exception as e:
+        logger.error("Lỗi khởi động: %s", e)
+        raise
+    
+    try:
+        yield
+    finally:
+        logger.info("Đang tắt Flink Manager API...")
+        await services.shutdown()
+        await close_mongo_connection()
+        logger.info("Flink Manager API đã tắt!")
+
+
 # Tạo FastAPI app
 app = FastAPI(
     title=settings.app_name,
@@ -47,7 +73,8 @@ app = FastAPI(
     """,
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -59,28 +86,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus metrics (latency / kích thước response theo route template)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 
 # Middleware để log requests
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    response = await call_next(request)
-    
-    process_time = time.time() - start_time
-    logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Time: {process_time:.3f}s"
+if settings.request_log_enabled:
+    app.add_middleware(
+        RequestLoggingMiddleware,
+        sample_rate=settings.request_log_sample_rate,
+        exclude_paths=settings.request_log_exclude_paths,
+        slow_seconds=settings.request_log_slow_seconds
     )
-    
-    return response
+
+# Request ID (ngoài cùng để log của mọi middleware / handler đều có request_id)
+app.add_middleware(RequestIdMiddleware)
 
 
 # Exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={
@@ -91,28 +118,6 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
-# Startup và shutdown events
-@app.on_event("startup")
-async def startup_event():
-    """Khởi tạo ứng dụng"""
-    logger.info("Đang khởi động Flink Manager API...")
-    
-    try:
-        await connect_to_mongo()
-        logger.info("Flink Manager API đã sẵn sàng!")
-    except Exception as e:
-        logger.error(f"Lỗi khởi động: {e}")
-        raise
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Dọn dẹp khi tắt ứng dụng"""
-    logger.info("Đang tắt Flink Manager API...")
-    await close_mongo_connection()
-    logger.info("Flink Manager API đã tắt!")
-
-
 # Include routers
 app.include_router(artifacts.router, prefix="/api/v1")
 app.include_router(job_specs.router, prefix="/api/v1")
@@ -134,6 +139,14 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Metrics theo Prometheus text format
+    """
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 # Custom OpenAPI schema
 def custom_openapi():
     if app.openapi_schema:
@@ -14,12 +14,21 @@ class JobStatus(str, Enum):
     SUSPENDED = "suspended"
 
 
+class BlobState(str, Enum):
+    """Trạng thái của blob trong collection blobs"""
+    PENDING = "pending"  # Record đã được tạo, object chưa chắc đã có ở đường dẫn blob
+    COMMITTED = "committed"
+
+
 class ArtifactMetadata(BaseModel):
     """Metadata của artifact"""
     artifact_name: str = Field(..., description="Tên artifact")
     version: str = Field(..., description="Phiên bản")
     hash: str = Field(..., description="Hash của file JAR")
     entry_classes: List[str] = Field(..., description="Danh sách entry classes")
+    main_class: Optional[str] = Field(None, description="Main-Class trong MANIFEST.MF")
+    detected_entry_classes: List[str] = Field(default=[], description="Các class có main tìm thấy trong JAR")
+    class_count: Optional[int] = Field(None, description="Số class trong JAR")
     uploaded_by: str = Field(..., description="Người upload")
     uploaded_at: datetime = Field(default_factory=datetime.utcnow, description="Thời gian upload")
     file_size: int = Field(..., description="Kích thước file (bytes)")
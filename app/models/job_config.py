@@ -19,6 +19,7 @@ class JobSpec(BaseModel):
     id: Optional[str] = Field(None, alias="_id")
     job_spec_name: str = Field(..., description="Tên job spec")
     artifact_id: str = Field(..., description="ID của artifact")
+    version_range: Optional[str] = Field(None, description="Điều kiện version; khi start dùng phiên bản mới nhất thỏa điều kiện")
     entry_class: str = Field(..., description="Entry class để chạy")
     parallelism: int = Field(default=1, description="Mức độ song song")
     program_args: Optional[List[str]] = Field(default=[], description="Tham số chương trình")
@@ -8,7 +8,9 @@ class ArtifactMetadataCreate(BaseModel):
     """Schema để tạo metadata artifact"""
     artifact_name: str = Field(..., description="Tên artifact", min_length=1, max_length=100)
     version: str = Field(..., description="Phiên bản", pattern=r'^\d+\.\d+\.\d+$')
-    entry_classes: List[str] = Field(..., description="Danh sách entry classes", min_items=1)
+    entry_classes: List[str] = Field(
+        default=[], description="Danh sách entry classes (bỏ trống để dùng các entry class tìm thấy trong JAR)"
+    )
     uploaded_by: str = Field(..., description="Người upload", min_length=1)
     description: Optional[str] = Field(None, description="Mô tả artifact", max_length=500)
     
@@ -25,6 +27,9 @@ class ArtifactMetadataResponse(BaseModel):
     version: str
     hash: str
     entry_classes: List[str]
+    main_class: Optional[str] = None
+    detected_entry_classes: List[str] = []
+    class_count: Optional[int] = None
     uploaded_by: str
     uploaded_at: datetime
     file_size: int
@@ -50,7 +55,17 @@ class ArtifactResponse(BaseModel):
 class ArtifactListResponse(BaseModel):
     """Response danh sách artifacts"""
     artifacts: List[ArtifactResponse]
+    total: Optional[int]
+    page: int
+    size: int
+    next_cursor: Optional[str] = None
+
+
+class ArtifactSearchResponse(BaseModel):
+    """Response tìm kiếm artifacts"""
+    artifacts: List[ArtifactResponse]
     total: int
+    query: str
     page: int
     size: int
 
@@ -1,6 +1,8 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Generic, TypeVar
 from pydantic import BaseModel, Field
 
+T = TypeVar("T")
+
 
 class BaseResponse(BaseModel):
     """Response cơ bản"""
@@ -9,6 +11,13 @@ class BaseResponse(BaseModel):
     data: Optional[Any] = None
 
 
+class DataResponse(BaseModel, Generic[T]):
+    """Response cơ bản với kiểu dữ liệu cụ thể cho data"""
+    success: bool = True
+    message: str = "Thành công"
+    data: Optional[T] = None
+
+
 class ErrorResponse(BaseModel):
     """Response lỗi"""
     success: bool = False
@@ -38,4 +47,5 @@ class HealthCheckResponse(BaseModel):
     timestamp: str
     version: str
     services: Dict[str, str]
+    metrics: Optional[Dict[str, Any]] = None
 
@@ -2,12 +2,23 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field, validator
 from app.models.job_config import JobStatus
+from app.config import settings
+from app.utils.semver import parse_version_range
+
+
+def validate_version_range(v: Optional[str]) -> Optional[str]:
+    if v is not None:
+        parse_version_range(v)
+    return v
 
 
 class JobSpecCreate(BaseModel):
     """Schema để tạo job spec"""
     job_spec_name: str = Field(..., description="Tên job spec", min_length=1, max_length=100)
     artifact_id: str = Field(..., description="ID của artifact")
+    version_range: Optional[str] = Field(
+        None, description="Điều kiện version (ví dụ ^1.4); khi start dùng phiên bản mới nhất của artifact thỏa điều kiện"
+    )
     entry_class: str = Field(..., description="Entry class để chạy", min_length=1)
     parallelism: int = Field(default=1, description="Mức độ song song", ge=1, le=100)
     program_args: Optional[List[str]] = Field(default=[], description="Tham số chương trình")
@@ -20,16 +31,21 @@ class JobSpecCreate(BaseModel):
         if not v.replace('_', '').replace('-', '').isalnum():
             raise ValueError('Tên job spec chỉ được chứa chữ cái, số, gạch ngang và gạch dưới')
         return v
+    
+    _validate_version_range = validator('version_range', allow_reuse=True)(validate_version_range)
 
 
 class JobSpecUpdate(BaseModel):
     """Schema để cập nhật job spec"""
     job_spec_name: Optional[str] = Field(None, description="Tên job spec", min_length=1, max_length=100)
+    version_range: Optional[str] = Field(None, description="Điều kiện version của artifact")
     entry_class: Optional[str] = Field(None, description="Entry class để chạy", min_length=1)
     parallelism: Optional[int] = Field(None, description="Mức độ song song", ge=1, le=100)
     program_args: Optional[List[str]] = Field(None, description="Tham số chương trình")
     savepoint_path: Optional[str] = Field(None, description="Đường dẫn savepoint")
     flink_config: Optional[Dict[str, Any]] = Field(None, description="Cấu hình Flink")
+    
+    _validate_version_range = validator('version_range', allow_reuse=True)(validate_version_range)
 
 
 class JobSpecResponse(BaseModel):
@@ -37,6 +53,7 @@ class JobSpecResponse(BaseModel):
     id: str
     job_spec_name: str
     artifact_id: str
+    version_range: Optional[str] = None
     entry_class: str
     parallelism: int
     program_args: List[str]
@@ -50,9 +67,10 @@ class JobSpecResponse(BaseModel):
 class JobSpecListResponse(BaseModel):
     """Response danh sách job specs"""
     job_specs: List[JobSpecResponse]
-    total: int
+    total: Optional[int]
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 
 class ExecutionCreate(BaseModel):
@@ -61,6 +79,38 @@ class ExecutionCreate(BaseModel):
     started_by: str = Field(..., description="Người bắt đầu execution", min_length=1)
 
 
+def validate_batch_size(v: List[str]) -> List[str]:
+    if len(v) > settings.execution_batch_max_items:
+        raise ValueError(f'Mỗi batch tối đa {settings.execution_batch_max_items} phần tử')
+    return v
+
+
+class BatchExecutionStartRequest(BaseModel):
+    """Schema để start nhiều execution"""
+    job_spec_ids: List[str] = Field(..., description="Danh sách ID job spec", min_length=1)
+    started_by: str = Field(..., description="Người bắt đầu execution", min_length=1)
+    
+    _validate_batch_size = validator('job_spec_ids', allow_reuse=True)(validate_batch_size)
+
+
+class BatchExecutionStopRequest(BaseModel):
+    """Schema để stop nhiều execution"""
+    execution_ids: List[str] = Field(..., description="Danh sách ID execution", min_length=1)
+    savepoint: bool = Field(default=False, description="Dừng kèm savepoint")
+    savepoint_path: Optional[str] = Field(None, description="Đường dẫn savepoint")
+    
+    _validate_batch_size = validator('execution_ids', allow_reuse=True)(validate_batch_size)
+
+
+class BatchItemResult(BaseModel):
+    """Kết quả của một phần tử trong batch"""
+    id: str
+    success: bool
+    data: Optional[Dict[str, Any]] = None
+    error_code: Optional[str] = None
+    message: Optional[str] = None
+
+
 class ExecutionResponse(BaseModel):
     """Response execution"""
     id: str
@@ -76,9 +126,10 @@ class ExecutionResponse(BaseModel):
 class ExecutionListResponse(BaseModel):
     """Response danh sách executions"""
     executions: List[ExecutionResponse]
-    total: int
+    total: Optional[int]
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 
 class ExecutionStartResponse(BaseModel):
@@ -108,4 +159,11 @@ class ExecutionHistoryResponse(BaseModel):
     action: str
     old_status: Optional[JobStatus]
     new_status: JobStatus
-    details: Optional[Dict[str, Any]]
\ No newline at end of file
+    details: Optional[Dict[str, Any]]
+
+
+class ExecutionHistoryListResponse(BaseModel):
+    """Response lịch sử của một execution"""
+    execution_id: str
+    history: List[ExecutionHistoryResponse]
+    total: int
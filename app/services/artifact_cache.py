@@ -0,0 +1,151 @@
+from app.services.async_minio_service import AsyncMinIOService
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+import aiofiles
+import asyncio
+import logging
+import os
+import shutil
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactBlobCache:
+    """
+    Cache LRU trên đĩa cho các blob artifact được tải nhiều (keyed theo SHA256)
+    
+    - Giới hạn tổng dung lượng theo byte, entry ít dùng nhất bị evict trước
+    - Entry được revalidate bằng ETag lấy từ object storage ở mỗi request
+    - Single-flight: nhiều request miss cùng lúc cho một blob chỉ tạo một lần tải
+    - Entry đang được phục vụ (pinned) không bị evict cho đến khi response kết thúc
+      (gửi xong hoặc client ngắt kết nối)
+    """
+    
+    def __init__(self, minio_service: AsyncMinIOService, cache_dir: str, max_bytes: int, enabled: bool = True):
+        self.minio_service = minio_service
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._current_bytes = 0
+        self._initialized = False
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "fills": 0, "revalidations": 0, "fill_errors": 0}
+    
+    def _ensure_dir(self):
+        """Tạo thư mục cache, dọn các file còn sót từ lần chạy trước (index nằm trong memory)"""
+        if self._initialized:
+            return
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._initialized = True
+    
+    async def acquire(self, file_hash: str, minio_path: str, etag: str, size: int) -> Optional[str]:
+        """
+        Lấy đường dẫn file cache của blob (tải về nếu chưa có) và pin entry
+        Returns: đường dẫn file, hoặc None nếu blob không thể cache (gọi release() khi dùng xong)
+        """
+        if not self.enabled or size > self.max_bytes:
+            return None
+        
+        entry = self._entries.get(file_hash)
+        if entry and entry["etag"] != etag:
+            # Object đã thay đổi trên storage → bỏ entry cũ
+            self._stats["revalidations"] += 1
+            self._remove(file_hash)
+            entry = None
+        
+        if entry:
+            self._stats["hits"] += 1
+            self._entries.move_to_end(file_hash)
+            entry["pins"] += 1
+            return entry["path"]
+        
+        self._stats["misses"] += 1
+        task = self._inflight.get(file_hash)
+        if task is None:
+            # Fill chạy trong task riêng: request khởi tạo bị hủy (client ngắt kết nối)
+            # không hủy lần tải dùng chung của các request khác đang chờ
+            task = asyncio.create_task(self._fill_or_none(file_hash, minio_path, etag, size))
+            self._inflight[file_hash] = task
+            task.add_done_callback(lambda _: self._inflight.pop(file_hash, None))
+        
+        path = await asyncio.shield(task)
+        entry = self._entries.get(file_hash)
+        if path is None or entry is None:
+            return None
+        entry["pins"] += 1
+        return path
+    
+    def release(self, file_hash: str):
+        """Bỏ pin entry sau khi response đã gửi xong"""
+        entry = self._entries.get(file_hash)
+        if entry:
+            entry["pins"] = max(entry["pins"] - 1, 0)
+        self._evict()
+    
+    async def _fill_or_none(self, file_hash: str, minio_path: str, etag: str, size: int) -> Optional[str]:
+        """Fill blob, lỗi được ghi log và trả về None để request fallback sang stream từ storage"""
+        try:
+            return await self._fill(file_hash, minio_path, etag, size)
+        except Exception as e:
+            self._stats["fill_errors"] += 1
+            logger.warning("Không thể cache blob %s: %s", file_hash, e)
+            return None
+    
+    async def _fill(self, file_hash: str, minio_path: str, etag: str, size: int) -> str:
+        """Tải blob từ storage vào file tạm rồi đổi tên thành file cache"""
+        self._ensure_dir()
+        path = os.path.join(self.cache_dir, file_hash)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        
+        try:
+            stream = await self.minio_service.stream_artifact(minio_path)
+            try:
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    async for chunk in stream:
+                        await f.write(chunk)
+            finally:
+                await stream.aclose()
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        self._entries[file_hash] = {"path": path, "size": size, "etag": etag, "pins": 0}
+        self._current_bytes += size
+        self._stats["fills"] += 1
+        self._evict()
+        return path
+    
+    def _evict(self):
+        """Evict các entry ít dùng nhất (không bị pin) cho đến khi nằm trong budget"""
+        if self._current_bytes <= self.max_bytes:
+            return
+        for file_hash in list(self._entries):
+            if self._current_bytes <= self.max_bytes:
+                break
+            if self._entries[file_hash]["pins"] > 0:
+                continue
+            self._remove(file_hash)
+            self._stats["evictions"] += 1
+    
+    def _remove(self, file_hash: str):
+        entry = self._entries.pop(file_hash)
+        self._current_bytes -= entry["size"]
+        try:
+            os.remove(entry["path"])
+        except FileNotFoundError:
+            pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Thống kê hit/miss/eviction của cache"""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._current_bytes,
+            "max_bytes": self.max_bytes,
+            **self._stats
+        }
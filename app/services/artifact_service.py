@@ -1,8 +1,17 @@
-from app.services.mongo_service import mongo_service
-from app.services.minio_service import minio_service
-from app.models.artifact import Artifact, ArtifactMetadata
+from app.services.mongo_service import MongoService
+from app.services.async_minio_service import AsyncMinIOService, AsyncObjectStream
+from app.services.jar_inspector import JarInspector
+from app.models.artifact import Artifact, ArtifactMetadata, BlobState
 from app.schemas.artifact import ArtifactCreate, ArtifactMetadataCreate
-from app.core.exceptions import ArtifactNotFoundError, ArtifactVersionExistsError, MinIOError
+from app.core.exceptions import (
+    ArtifactNotFoundError, ArtifactVersionExistsError, InvalidArtifactError, InvalidVersionRangeError, MinIOError,
+    NoMatchingVersionError
+)
+from app.utils.helpers import calculate_stream_digest, decode_cursor, split_page
+from app.utils.cache import TTLCache
+from app.utils.semver import VersionRange, parse_version_range
+from app.config import settings
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional, BinaryIO
 import logging
 from datetime import datetime
@@ -13,27 +22,64 @@ logger = logging.getLogger(__name__)
 class ArtifactService:
     """Service để quản lý artifacts"""
     
-    def __init__(self):
+    def __init__(self, mongo_service: MongoService, minio_service: AsyncMinIOService, jar_inspector: JarInspector):
         self.mongo_service = mongo_service
         self.minio_service = minio_service
+        self.jar_inspector = jar_inspector
+        # Cache read-through cho artifact đọc theo ID / tên + phiên bản; các model trả về
+        # từ cache được dùng chung nên không được sửa trực tiếp
+        self.cache = TTLCache(
+            settings.metadata_cache_ttl_seconds,
+            settings.metadata_cache_max_entries,
+            negative_ttl_seconds=settings.metadata_cache_negative_ttl_seconds
+        )
     
     async def create_artifact(self, artifact_data: ArtifactCreate, file_data: BinaryIO, file_size: int) -> str:
-        """Tạo artifact mới"""
+        """
+        Tạo artifact mới
+        
+        Nội dung JAR được lưu content-addressed theo SHA256: nếu blob đã tồn tại
+        (cùng build được tag lại với version khác) thì bỏ qua việc ghi storage,
+        version mới chỉ trỏ tới blob và tăng reference count
+        """
+        artifact_name = artifact_data.metadata.artifact_name
+        version = artifact_data.metadata.version
+        file_hash = None
+        minio_path = None
         try:
-            # Upload file lên MinIO
-            minio_path, file_hash = self.minio_service.upload_artifact(
-                artifact_data.metadata.artifact_name,
-                artifact_data.metadata.version,
-                file_data,
-                file_size
-            )
+            if await self.mongo_service.get_artifact_by_name_version(artifact_name, version):
+                raise ArtifactVersionExistsError(artifact_name, version)
+            
+            # Kiểm tra JAR trước khi ghi storage: manifest, các class được khai báo, entry class
+            entry_classes = artifact_data.metadata.entry_classes
+            inspection = {}
+            if settings.jar_inspection_enabled:
+                inspection = await self.jar_inspector.inspect(file_data, entry_classes)
+                entry_classes = entry_classes or inspection["entry_classes"]
+            if not entry_classes:
+                raise InvalidArtifactError("không khai báo entry_classes và không tìm thấy class nào có main")
+            
+            if file_size >= settings.upload_pipeline_min_bytes:
+                # File lớn: hash trong lúc upload (một lần đọc), blob trùng được phát hiện sau upload
+                file_hash, minio_path = await self._store_blob_pipelined(file_data, file_size)
+            else:
+                # File nhỏ: hash trước (chunk lớn, ngoài event loop) để bỏ qua upload nếu blob đã tồn tại
+                digest = await run_in_threadpool(
+                    calculate_stream_digest, file_data, settings.upload_hash_chunk_size,
+                    settings.upload_checksum_algorithm
+                )
+                file_hash = digest.hexdigest()
+                minio_path = await self._store_blob(file_hash, file_data, file_size, digest.object_metadata())
             
             # Tạo metadata
             metadata = ArtifactMetadata(
-                artifact_name=artifact_data.metadata.artifact_name,
-                version=artifact_data.metadata.version,
+                artifact_name=artifact_name,
+                version=version,
                 hash=file_hash,
-                entry_classes=artifact_data.metadata.entry_classes,
+                entry_classes=entry_classes,
+                main_class=inspection.get("main_class"),
+                detected_entry_classes=inspection.get("entry_classes", []),
+                class_count=inspection.get("class_count"),
                 uploaded_by=artifact_data.metadata.uploaded_by,
                 uploaded_at=datetime.utcnow(),
                 file_size=file_size,
@@ -42,60 +88,163 @@ class ArtifactService:
             
             # Tạo artifact model
             artifact = Artifact(
-                artifact_name=artifact_data.metadata.artifact_name,
-                version=artifact_data.metadata.version,
+                artifact_name=artifact_name,
+                version=version,
                 metadata=metadata,
                 minio_path=minio_path
             )
             
             # Lưu vào MongoDB
             artifact_id = await self.mongo_service.create_artifact(artifact)
+            # Bỏ kết quả "không tìm thấy" đã cache (nếu có) và phiên bản mới nhất đã resolve
+            self.cache.delete(("artifact", artifact_id), ("artifact_version", artifact_name, version))
+            self.cache.invalidate("latest")
             
-            logger.info(f"Đã tạo artifact thành công: {artifact_id}")
+            logger.info("Đã tạo artifact thành công: %s", artifact_id)
             return artifact_id
-            
+        
         except ArtifactVersionExistsError:
-            # Xóa file đã upload nếu có lỗi
+            # Trả lại reference của blob nếu đã giữ
             try:
-                self.minio_service.delete_artifact(minio_path)
+                if minio_path:
+                    await self._release_storage(minio_path, file_hash)
             except:
                 pass
             raise
         except Exception as e:
-            # Xóa file đã upload nếu có lỗi
+            # Trả lại reference của blob nếu đã giữ
             try:
-                self.minio_service.delete_artifact(minio_path)
+                if minio_path:
+                    await self._release_storage(minio_path, file_hash)
             except:
                 pass
-            logger.error(f"Lỗi tạo artifact: {e}")
+            logger.error("Lỗi tạo artifact: %s", e)
             raise
     
+    async def _store_blob(self, file_hash: str, file_data: BinaryIO, file_size: int,
+                          metadata: Optional[dict] = None) -> str:
+        """Đảm bảo blob của nội dung tồn tại và giữ một reference tới nó"""
+        blob = await self.mongo_service.get_blob(file_hash)
+        if blob:
+            minio_path = blob["minio_path"]
+            blob = await self.mongo_service.acquire_blob(file_hash, minio_path, file_size)
+            # Blob vừa được giải phóng bởi request khác trước khi kịp giữ reference, hoặc
+            # upload pipelined khác chưa chuyển xong staging (có thể thất bại): tự đảm bảo object tồn tại
+            if blob["ref_count"] == 1 or self._is_pending(blob):
+                if not await self.minio_service.artifact_exists(minio_path):
+                    await self.minio_service.upload_blob(file_hash, file_data, file_size, metadata)
+                await self._commit_if_pending(file_hash, blob)
+            logger.info("Blob %s đã tồn tại, bỏ qua upload", file_hash)
+            return minio_path
+        
+        minio_path = await self.minio_service.upload_blob(file_hash, file_data, file_size, metadata)
+        blob = await self.mongo_service.acquire_blob(file_hash, minio_path, file_size)
+        await self._commit_if_pending(file_hash, blob)
+        return minio_path
+    
+    @staticmethod
+    def _is_pending(blob: dict) -> bool:
+        return blob.get("state", BlobState.COMMITTED.value) == BlobState.PENDING.value
+    
+    async def _commit_if_pending(self, file_hash: str, blob: dict):
+        """Object đã có ở đường dẫn blob: chuyển record đang pending sang committed"""
+        if self._is_pending(blob):
+            await self.mongo_service.commit_blob(file_hash)
+    
+    async def _store_blob_pipelined(self, file_data: BinaryIO, file_size: int) -> tuple[str, str]:
+        """
+        Upload vào staging và tính hash trong cùng lần đọc, sau đó giữ reference tới blob
+        và chuyển staging sang đường dẫn blob (hoặc bỏ staging nếu blob đã tồn tại)
+        Returns: (SHA256, minio_path của blob)
+        """
+        staging_path, digest = await self.minio_service.upload_staging(file_data, file_size)
+        file_hash = digest.hexdigest()
+        minio_path = self.minio_service.blob_path(file_hash)
+        try:
+            # Reference được giữ trước khi promote để request khác không xóa blob trong lúc đó;
+            # record mới ở trạng thái pending cho đến khi object có ở đường dẫn blob
+            blob = await self.mongo_service.acquire_blob(file_hash, minio_path, file_size, BlobState.PENDING)
+            try:
+                if not await self.minio_service.artifact_exists(minio_path):
+                    await self.minio_service.promote_staging(staging_path, minio_path, digest.object_metadata())
+                    staging_path = None
+                else:
+                    logger.info("Blob %s đã tồn tại, bỏ bản upload staging", file_hash)
+                await self._commit_if_pending(file_hash, blob)
+            except Exception:
+                await self._release_storage(minio_path, file_hash)
+                raise
+            return file_hash, minio_path
+        
+        finally:
+            if staging_path:
+                try:
+                    await self.minio_service.delete_artifact(staging_path)
+                except Exception as e:
+                    logger.warning("Không xóa được object staging %s: %s", staging_path, e)
+    
+    async def _release_storage(self, minio_path: str, file_hash: Optional[str]):
+        """Trả lại reference tới blob, xóa object khi không còn version nào dùng"""
+        if not self.minio_service.is_blob_path(minio_path):
+            # Artifact cũ lưu theo đường dẫn version
+            await self.minio_service.delete_artifact(minio_path)
+            return
+        
+        remaining = await self.mongo_service.release_blob(file_hash)
+        if remaining == 0:
+            await self.minio_service.delete_artifact(minio_path)
+            logger.info("Đã xóa blob không còn được tham chiếu: %s", file_hash)
+    
     async def get_artifact(self, artifact_id: str) -> Optional[Artifact]:
-        """Lấy artifact theo ID"""
-        return await self.mongo_service.get_artifact_by_id(artifact_id)
+        """Lấy artifact theo ID (qua cache)"""
+        return await self.cache.get_or_load(
+            ("artifact", artifact_id),
+            lambda: self.mongo_service.get_artifact_by_id(artifact_id)
+        )
     
     async def get_artifact_by_name_version(self, artifact_name: str, version: str) -> Optional[Artifact]:
-        """Lấy artifact theo tên và phiên bản"""
-        return await self.mongo_service.get_artifact_by_name_version(artifact_name, version)
+        """Lấy artifact theo tên và phiên bản (qua cache)"""
+        return await self.cache.get_or_load(
+            ("artifact_version", artifact_name, version),
+            lambda: self.mongo_service.get_artifact_by_name_version(artifact_name, version)
+        )
+    
+    def list_version(self) -> str:
+        """Version của danh sách artifacts, thay đổi khi có artifact được tạo hoặc xóa"""
+        return self.mongo_service.collection_version("artifacts")
     
     async def list_artifacts(self, page: int = 1, size: int = 20, 
                            artifact_name: Optional[str] = None,
-                           sort_by: str = "created_at", sort_order: str = "desc") -> tuple[List[Artifact], int]:
-        """Lấy danh sách artifacts với phân trang"""
-        skip = (page - 1) * size
+                           sort_by: str = "created_at", sort_order: str = "desc",
+                           cursor: Optional[str] = None, include_total: bool = True,
+                           estimated_total: bool = False) -> tuple[List[Artifact], Optional[int], Optional[str]]:
+        """
+        Lấy danh sách artifacts với phân trang
+        
+        Khi có cursor (next_cursor của trang trước), trang được lấy bằng keyset
+        (sort_value, _id) thay cho skip nên chi phí không phụ thuộc độ sâu trang.
+        include_total=False bỏ qua việc đếm (total là None); estimated_total dùng
+        số lượng ước lượng của collection khi không có filter
+        """
         sort_direction = -1 if sort_order == "desc" else 1
+        after = decode_cursor(cursor, sort_by, sort_direction) if cursor else None
+        skip = 0 if after else (page - 1) * size
         
         artifacts = await self.mongo_service.list_artifacts(
             skip=skip,
-            limit=size,
+            limit=size + 1,
             artifact_name=artifact_name,
             sort_by=sort_by,
-            sort_order=sort_direction
+            sort_order=sort_direction,
+            after=after
         )
+        artifacts, next_cursor = split_page(artifacts, size, sort_by, sort_direction)
         
-        total = await self.mongo_service.count_artifacts(artifact_name)
+        total = None
+        if include_total:
+            total = await self.mongo_service.count_artifacts(artifact_name, estimated=estimated_total)
         
-        return artifacts, total
+        return artifacts, total, next_cursor
     
     async def delete_artifact(self, artifact_id: str) -> bool:
         """Xóa artifact"""
@@ -105,59 +254,89 @@ class ArtifactService:
             if not artifact:
                 raise ArtifactNotFoundError(artifact_id)
             
-            # Xóa file từ MinIO
-            self.minio_service.delete_artifact(artifact.minio_path)
-            
             # Xóa record từ MongoDB
             success = await self.mongo_service.delete_artifact(artifact_id)
+            self.cache.delete(("artifact", artifact_id), ("artifact_version", artifact.artifact_name, artifact.version))
+            self.cache.invalidate("latest")
             
             if success:
-                logger.info(f"Đã xóa artifact thành công: {artifact_id}")
+                # Trả lại reference tới blob (xóa file khi không còn version nào dùng)
+                await self._release_storage(artifact.minio_path, artifact.metadata.hash)
+                logger.info("Đã xóa artifact thành công: %s", artifact_id)
             
             return success
-            
+        
         except ArtifactNotFoundError:
             raise
         except Exception as e:
-            logger.error(f"Lỗi xóa artifact: {e}")
+            logger.error("Lỗi xóa artifact: %s", e)
             raise
     
-    async def download_artifact(self, artifact_id: str) -> tuple[bytes, str]:
-        """Download artifact JAR file"""
+    async def get_download_info(self, artifact_id: str) -> dict:
+        """Lấy thông tin để download artifact (đường dẫn, kích thước, ETag, tên file)"""
         try:
-            artifact = await self.mongo_service.get_artifact_by_id(artifact_id)
+            artifact = await self.get_artifact(artifact_id)
             if not artifact:
                 raise ArtifactNotFoundError(artifact_id)
             
-            file_data = self.minio_service.download_artifact(artifact.minio_path)
-            filename = f"{artifact.artifact_name}-{artifact.version}.jar"
-            
-            return file_data, filename
+            info = await self.minio_service.get_artifact_info(artifact.minio_path)
+            info["minio_path"] = artifact.minio_path
+            info["hash"] = artifact.metadata.hash
+            info["filename"] = f"{artifact.artifact_name}-{artifact.version}.jar"
             
+            return info
+        
         except ArtifactNotFoundError:
             raise
         except Exception as e:
-            logger.error(f"Lỗi download artifact: {e}")
+            logger.error("Lỗi download artifact: %s", e)
             raise
     
-    async def get_artifact_versions(self, artifact_name: str) -> List[str]:
-        """Lấy danh sách phiên bản của artifact"""
-        return await self.mongo_service.get_artifact_versions(artifact_name)
+    async def stream_artifact(self, minio_path: str, offset: int = 0,
+                              length: Optional[int] = None) -> AsyncObjectStream:
+        """Mở stream đọc artifact theo từng chunk (có thể chỉ một đoạn byte), gọi aclose() khi dùng xong"""
+        return await self.minio_service.stream_artifact(minio_path, offset, length)
+    
+    @staticmethod
+    def parse_version_range(version_range: Optional[str]) -> Optional[VersionRange]:
+        """Parse điều kiện version từ request (None nếu không có điều kiện)"""
+        if version_range is None:
+            return None
+        try:
+            return parse_version_range(version_range)
+        except ValueError as e:
+            raise InvalidVersionRangeError(version_range, str(e))
+    
+    async def get_artifact_versions(self, artifact_name: str, version_range: Optional[str] = None) -> List[str]:
+        """Lấy danh sách phiên bản của artifact (mới nhất trước, có thể lọc theo điều kiện version)"""
+        return await self.mongo_service.get_artifact_versions(
+            artifact_name, self.parse_version_range(version_range)
+        )
     
-    async def search_artifacts(self, query: str) -> List[Artifact]:
-        """Tìm kiếm artifacts"""
-        return await self.mongo_service.search_artifacts(query)
+    async def get_latest_artifact(self, artifact_name: str, version_range: Optional[str] = None) -> Artifact:
+        """
+        Lấy phiên bản mới nhất của artifact thỏa điều kiện version (qua cache)
+        
+        Key cache là khoảng version đã chuẩn hóa nên "^1.4" và ">=1.4,<2" dùng chung entry
+        """
+        parsed = self.parse_version_range(version_range)
+        artifact = await self.cache.get_or_load(
+            ("latest", artifact_name, parsed),
+            lambda: self.mongo_service.get_latest_artifact(artifact_name, parsed)
+        )
+        if not artifact:
+            raise NoMatchingVersionError(artifact_name, version_range)
+        return artifact
+    
+    async def search_artifacts(self, query: str, page: int = 1, size: int = 20) -> tuple[List[Artifact], int]:
+        """Tìm kiếm artifacts theo mức độ liên quan, trả về (artifacts của trang, tổng số kết quả)"""
+        return await self.mongo_service.search_artifacts(query, skip=(page - 1) * size, limit=size)
     
     async def generate_upload_url(self, artifact_name: str, version: str) -> str:
         """Tạo presigned URL để upload artifact"""
         try:
             minio_path = f"artifacts/{artifact_name}/versions/{version}/fatjar/{artifact_name}-{version}.jar"
-            return self.minio_service.generate_presigned_url(minio_path)
+            return await self.minio_service.generate_presigned_url(minio_path)
         except Exception as e:
-            logger.error(f"Lỗi tạo upload URL: {e}")
+            logger.error("Lỗi tạo upload URL: %s", e)
             raise MinIOError(f"Không thể tạo upload URL: {e}")
-
-
-# Global instance
-artifact_service = ArtifactService()
-
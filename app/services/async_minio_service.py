@@ -0,0 +1,176 @@
+from app.services.minio_service import MinIOService, ObjectStream
+from app.utils.helpers import StreamDigest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, BinaryIO, Dict, Any, Callable
+import asyncio
+import functools
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMinIOService:
+    """
+    Async facade cho MinIOService: mọi lời gọi SDK blocking được chạy trên
+    thread pool riêng có giới hạn kích thước, kèm giới hạn số lời gọi đồng thời
+    theo từng loại operation để một loại (ví dụ upload lớn) không chiếm hết pool
+    """
+    
+    def __init__(self, minio_service: MinIOService, max_workers: int, operation_limits: Dict[str, int]):
+        self.minio_service = minio_service
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="minio")
+        self._max_workers = max_workers
+        self._limits = {op: asyncio.Semaphore(limit) for op, limit in operation_limits.items()}
+        self._stats: Dict[str, Dict[str, int]] = {
+            op: {"limit": limit, "waiting": 0, "in_flight": 0, "max_waiting": 0, "completed": 0, "failed": 0}
+            for op, limit in operation_limits.items()
+        }
+        # Số task đã submit vào executor nhưng chưa có thread xử lý
+        self._executor_pending = 0
+        self._pending_lock = threading.Lock()
+    
+    def _track_start(self, func: Callable, *args):
+        """Chạy trong worker thread: đánh dấu task đã rời hàng đợi của executor"""
+        with self._pending_lock:
+            self._executor_pending -= 1
+        return func(*args)
+    
+    async def _run(self, operation: str, func: Callable, *args):
+        """Chạy func trên executor với giới hạn đồng thời của operation"""
+        stats = self._stats[operation]
+        semaphore = self._limits[operation]
+        
+        stats["waiting"] += 1
+        stats["max_waiting"] = max(stats["max_waiting"], stats["waiting"])
+        try:
+            await semaphore.acquire()
+        finally:
+            stats["waiting"] -= 1
+        
+        stats["in_flight"] += 1
+        try:
+            with self._pending_lock:
+                self._executor_pending += 1
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._executor, functools.partial(self._track_start, func, *args)
+            )
+            stats["completed"] += 1
+            return result
+        except Exception:
+            stats["failed"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+            semaphore.release()
+    
+    async def upload_artifact(self, artifact_name: str, version: str, file_data: BinaryIO, file_size: int) -> tuple[str, str]:
+        """Upload artifact JAR file (async)"""
+        return await self._run("upload", self.minio_service.upload_artifact,
+                               artifact_name, version, file_data, file_size)
+    
+    async def upload_blob(self, file_hash: str, file_data: BinaryIO, file_size: int,
+                          metadata: Optional[Dict[str, str]] = None) -> str:
+        """Upload nội dung JAR vào blob layer (async)"""
+        return await self._run("upload", self.minio_service.upload_blob, file_hash, file_data, file_size, metadata)
+    
+    async def upload_staging(self, file_data: BinaryIO, file_size: int) -> tuple[str, StreamDigest]:
+        """Upload vào vùng staging và tính digest trong cùng lần đọc (async)"""
+        return await self._run("upload", self.minio_service.upload_staging, file_data, file_size)
+    
+    async def promote_staging(self, staging_path: str, minio_path: str,
+                              metadata: Optional[Dict[str, str]] = None) -> str:
+        """Chuyển object staging sang blob layer (async)"""
+        return await self._run("upload", self.minio_service.promote_staging, staging_path, minio_path, metadata)
+    
+    def blob_path(self, file_hash: str) -> str:
+        return self.minio_service.blob_path(file_hash)
+    
+    def is_blob_path(self, minio_path: str) -> bool:
+        return self.minio_service.is_blob_path(minio_path)
+    
+    async def download_artifact(self, minio_path: str) -> bytes:
+        """Download toàn bộ artifact JAR file (async)"""
+        return await self._run("download", self.minio_service.download_artifact, minio_path)
+    
+    async def stream_artifact(self, minio_path: str, offset: int = 0,
+                              length: Optional[int] = None) -> "AsyncObjectStream":
+        """
+        Mở stream đọc artifact (async). Object được mở ngay để lỗi được raise
+        trước khi trả response; mỗi chunk được đọc trên executor.
+        Consumer phải gọi aclose() khi dùng xong (kể cả khi chưa đọc hết)
+        """
+        stream = await self._run("download", self.minio_service.stream_artifact, minio_path, offset, length)
+        return AsyncObjectStream(self, stream)
+    
+    async def close_stream(self, stream: ObjectStream):
+        """
+        Đóng stream trên executor. Nếu consumer bị hủy giữa lúc đọc, lần read() đó có
+        thể vẫn đang chạy: close() đợi nó xong (lock trong ObjectStream) rồi trả connection
+        về pool. Shield để việc đóng vẫn hoàn tất dù lần await này bị hủy tiếp
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.shield(loop.run_in_executor(self._executor, stream.close))
+    
+    async def delete_artifact(self, minio_path: str) -> bool:
+        """Xóa artifact JAR file (async)"""
+        return await self._run("delete", self.minio_service.delete_artifact, minio_path)
+    
+    async def artifact_exists(self, minio_path: str) -> bool:
+        """Kiểm tra artifact có tồn tại không (async)"""
+        return await self._run("stat", self.minio_service.artifact_exists, minio_path)
+    
+    async def ping(self) -> bool:
+        """Kiểm tra kết nối tới MinIO và bucket (async)"""
+        return await self._run("stat", self.minio_service.ping)
+    
+    async def get_artifact_info(self, minio_path: str) -> dict:
+        """Lấy thông tin artifact (async)"""
+        return await self._run("stat", self.minio_service.get_artifact_info, minio_path)
+    
+    async def generate_presigned_url(self, minio_path: str, expires_in: int = 3600) -> str:
+        """Tạo presigned URL (async)"""
+        return await self._run("presign", self.minio_service.generate_presigned_url, minio_path, expires_in)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Metrics về hàng đợi và số lời gọi đang chạy của từng operation"""
+        return {
+            "max_workers": self._max_workers,
+            "executor_queue_depth": self._executor_pending,
+            "operations": {op: dict(stats) for op, stats in self._stats.items()}
+        }
+    
+    def shutdown(self):
+        """Dừng executor"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncObjectStream:
+    """
+    Async iterator đọc ObjectStream trên executor của AsyncMinIOService
+    
+    aclose() luôn đóng stream và trả connection về pool, kể cả khi chưa đọc chunk nào
+    (khác với async generator: aclose() của generator chưa chạy không thực thi finally)
+    """
+    
+    def __init__(self, service: AsyncMinIOService, stream: ObjectStream):
+        self._service = service
+        self._stream = stream
+        self._closed = False
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> bytes:
+        chunk = await self._service._run("download", self._stream.read)
+        if chunk is None:
+            await self.aclose()
+            raise StopAsyncIteration
+        return chunk
+    
+    async def aclose(self):
+        if self._closed:
+            return
+        self._closed = True
+        await self._service.close_stream(self._stream)
@@ -0,0 +1,143 @@
+from functools import cached_property
+
+from app.config import settings
+from app.services.minio_service import MinIOService
+from app.services.async_minio_service import AsyncMinIOService
+from app.services.mongo_service import MongoService
+from app.services.flink_client import FlinkRestClient
+from app.services.flink_jar_cache import FlinkJarCache
+from app.services.jar_inspector import JarInspector
+from app.services.artifact_cache import ArtifactBlobCache
+from app.services.artifact_service import ArtifactService
+from app.services.job_spec_service import JobSpecService, ExecutionService
+from app.services.execution_events import ExecutionEventBroadcaster
+from app.services.execution_reconciler import ExecutionReconciler
+
+
+class ServiceContainer:
+    """
+    Tập các service của ứng dụng, được tạo trong lifespan của FastAPI
+    
+    Mỗi service chỉ được khởi tạo (và SDK tương ứng chỉ được import) khi được dùng lần
+    đầu; các dependency được truyền qua constructor
+    """
+    
+    @cached_property
+    def minio_service(self) -> MinIOService:
+        return MinIOService()
+    
+    @cached_property
+    def async_minio_service(self) -> AsyncMinIOService:
+        return AsyncMinIOService(
+            self.minio_service,
+            max_workers=settings.minio_executor_workers,
+            operation_limits={
+                "upload": settings.minio_max_concurrent_uploads,
+                "download": settings.minio_max_concurrent_downloads,
+                "delete": settings.minio_max_concurrent_requests,
+                "stat": settings.minio_max_concurrent_requests,
+                "presign": settings.minio_max_concurrent_requests
+            }
+        )
+    
+    @cached_property
+    def mongo_service(self) -> MongoService:
+        return MongoService()
+    
+    @cached_property
+    def flink_client(self) -> FlinkRestClient:
+        return FlinkRestClient(
+            settings.flink_rest_api_url,
+            max_connections=settings.flink_max_connections,
+            max_keepalive_connections=settings.flink_max_keepalive_connections,
+            keepalive_expiry=settings.flink_keepalive_expiry,
+            connect_timeout=settings.flink_connect_timeout,
+            request_timeout=settings.flink_request_timeout,
+            upload_timeout=settings.flink_upload_timeout,
+            max_retries=settings.flink_max_retries,
+            retry_backoff=settings.flink_retry_backoff,
+            retry_max_backoff=settings.flink_retry_max_backoff
+        )
+    
+    @cached_property
+    def flink_jar_cache(self) -> FlinkJarCache:
+        return FlinkJarCache(
+            self.flink_client,
+            self.async_minio_service,
+            list_ttl_seconds=settings.flink_jar_list_ttl_seconds
+        )
+    
+    @cached_property
+    def jar_inspector(self) -> JarInspector:
+        return JarInspector(settings.jar_inspect_workers, settings.jar_inspect_max_classes)
+    
+    @cached_property
+    def artifact_cache(self) -> ArtifactBlobCache:
+        return ArtifactBlobCache(
+            self.async_minio_service,
+            cache_dir=settings.artifact_cache_dir,
+            max_bytes=settings.artifact_cache_max_bytes,
+            enabled=settings.artifact_cache_enabled
+        )
+    
+    @cached_property
+    def artifact_service(self) -> ArtifactService:
+        return ArtifactService(self.mongo_service, self.async_minio_service, self.jar_inspector)
+    
+    @cached_property
+    def execution_events(self) -> ExecutionEventBroadcaster:
+        return ExecutionEventBroadcaster(
+            queue_size=settings.sse_queue_size,
+            replay_size=settings.sse_replay_buffer_size
+        )
+    
+    @cached_property
+    def job_spec_service(self) -> JobSpecService:
+        return JobSpecService(self.mongo_service)
+    
+    @cached_property
+    def execution_service(self) -> ExecutionService:
+        return ExecutionService(
+            self.mongo_service,
+            self.job_spec_service,
+            self.artifact_service,
+            self.flink_client,
+            self.flink_jar_cache,
+            self.execution_events
+        )
+    
+    @cached_property
+    def execution_reconciler(self) -> ExecutionReconciler:
+        return ExecutionReconciler(
+            self.mongo_service,
+            self.flink_client,
+            self.execution_events,
+            interval_min=settings.reconcile_interval_min,
+            interval_max=settings.reconcile_interval_max,
+            missing_grace_seconds=settings.reconcile_missing_grace_seconds
+        )
+    
+    def is_created(self, name: str) -> bool:
+        """Service đã được khởi tạo hay chưa (cached_property lưu giá trị trong __dict__)"""
+        return name in self.__dict__
+    
+    def startup(self):
+        """Khởi động các tác vụ nền cần chạy ngay khi ứng dụng start"""
+        if settings.storage_backend == "minio":
+            # Kết nối và kiểm tra bucket ngay lúc start để lỗi cấu hình không bị hoãn tới request đầu tiên
+            self.minio_service
+        if settings.jar_inspection_enabled:
+            self.jar_inspector.start()
+        if settings.flink_backend == "rest" and settings.reconcile_enabled:
+            self.execution_reconciler.start()
+    
+    async def shutdown(self):
+        """Dừng / đóng các service đã được khởi tạo, service chưa dùng tới thì bỏ qua"""
+        if self.is_created("execution_reconciler"):
+            await self.execution_reconciler.stop()
+        if self.is_created("async_minio_service"):
+            self.async_minio_service.shutdown()
+        if self.is_created("jar_inspector"):
+            self.jar_inspector.shutdown()
+        if self.is_created("flink_client"):
+            await self.flink_client.aclose()
@@ -0,0 +1,109 @@
+from app.models.job_config import ExecutionHistory
+from collections import deque
+from fastapi.encoders import jsonable_encoder
+from typing import Optional, Dict, Any, List, Iterable, Set
+import asyncio
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Một subscriber của stream: queue có giới hạn và bộ lọc theo job spec / execution"""
+    
+    def __init__(self, queue_size: int, job_spec_id: Optional[str], execution_ids: Optional[Set[str]]):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.job_spec_id = job_spec_id
+        self.execution_ids = execution_ids
+        self.backlog: List[Dict[str, Any]] = []
+        self.dropped = False
+    
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.job_spec_id and event["data"].get("job_spec_id") != self.job_spec_id:
+            return False
+        if self.execution_ids and event["data"].get("execution_id") not in self.execution_ids:
+            return False
+        return True
+
+
+class ExecutionEventBroadcaster:
+    """
+    Fan-out in-process các ExecutionHistory mới tới các subscriber (SSE)
+    
+    - Mỗi subscriber có queue giới hạn; subscriber không đọc kịp (queue đầy) bị ngắt
+      thay vì làm chậm publisher hoặc giữ memory không giới hạn
+    - Event id có dạng {epoch}-{seq}; các event gần nhất được giữ trong buffer để
+      client kết nối lại với Last-Event-ID nhận tiếp các event bị lỡ
+    - Chỉ phục vụ subscriber trong cùng process
+    """
+    
+    def __init__(self, queue_size: int, replay_size: int):
+        self.queue_size = queue_size
+        self._epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._buffer: deque = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscription] = set()
+        self._stats = {"published": 0, "dropped_subscribers": 0}
+    
+    def publish(self, history: ExecutionHistory, job_spec_id: Optional[str] = None):
+        """Phát một ExecutionHistory vừa được ghi"""
+        self._seq += 1
+        data = jsonable_encoder(history, by_alias=False)
+        data["job_spec_id"] = job_spec_id
+        event = {"id": f"{self._epoch}-{self._seq}", "seq": self._seq, "data": data}
+        self._buffer.append(event)
+        self._stats["published"] += 1
+        
+        for subscription in list(self._subscribers):
+            if not subscription.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+    
+    def publish_many(self, histories: Iterable[ExecutionHistory], job_spec_ids: Dict[str, str]):
+        """Phát nhiều ExecutionHistory (job_spec_ids: execution_id -> job_spec_id)"""
+        for history in histories:
+            self.publish(history, job_spec_ids.get(history.execution_id))
+    
+    def _drop(self, subscription: Subscription):
+        """Ngắt subscriber chậm; client kết nối lại bằng Last-Event-ID để lấy tiếp"""
+        subscription.dropped = True
+        self._subscribers.discard(subscription)
+        self._stats["dropped_subscribers"] += 1
+        logger.warning("Ngắt SSE subscriber chậm (queue đầy)")
+    
+    def subscribe(self, job_spec_id: Optional[str] = None, execution_ids: Optional[List[str]] = None,
+                  last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Đăng ký subscriber mới. Các event sau last_event_id còn trong buffer được đặt
+        vào subscription.backlog (gửi trước các event trong queue)
+        """
+        subscription = Subscription(self.queue_size, job_spec_id, set(execution_ids) if execution_ids else None)
+        
+        if last_event_id:
+            epoch, _, seq = last_event_id.partition("-")
+            # Khác epoch (process đã restart): replay toàn bộ buffer hiện có
+            after = int(seq) if epoch == self._epoch and seq.isdigit() else 0
+            subscription.backlog = [
+                event for event in self._buffer
+                if event["seq"] > after and subscription.matches(event)
+            ]
+        
+        self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+    
+    @staticmethod
+    def format_event(event: Dict[str, Any]) -> str:
+        """Định dạng event theo chuẩn text/event-stream"""
+        return f"id: {event['id']}\nevent: execution_history\ndata: {json.dumps(event['data'])}\n\n"
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Số subscriber và số event đã phát"""
+        return {"subscribers": len(self._subscribers), "buffered": len(self._buffer), **self._stats}
@@ -0,0 +1,216 @@
+from app.services.mongo_service import MongoService
+from app.services.flink_client import FlinkRestClient
+from app.services.execution_events import ExecutionEventBroadcaster
+from app.models.job_config import Execution, ExecutionHistory, JobStatus
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Trạng thái job của Flink -> trạng thái execution
+FLINK_STATE_MAPPING = {
+    "INITIALIZING": JobStatus.CREATED,
+    "CREATED": JobStatus.CREATED,
+    "RUNNING": JobStatus.RUNNING,
+    "RESTARTING": JobStatus.RUNNING,
+    "RECONCILING": JobStatus.RUNNING,
+    "FAILING": JobStatus.RUNNING,
+    "CANCELLING": JobStatus.RUNNING,
+    "FINISHED": JobStatus.FINISHED,
+    "FAILED": JobStatus.FAILED,
+    "CANCELED": JobStatus.CANCELED,
+    "SUSPENDED": JobStatus.SUSPENDED,
+}
+
+# Các execution còn đang hoạt động cần được đối chiếu với cluster
+ACTIVE_STATUSES = [JobStatus.CREATED, JobStatus.RUNNING]
+
+
+class ExecutionReconciler:
+    """
+    Task nền đồng bộ trạng thái execution với Flink cluster
+    
+    Mỗi chu kỳ gọi /jobs/overview một lần cho cả cluster, so sánh với các execution
+    đang hoạt động trong database và ghi mọi thay đổi trong một lần bulk write
+    (kèm ExecutionHistory). Chu kỳ thích ứng: rút về interval_min khi vừa phát hiện
+    thay đổi, giãn dần tới interval_max khi cluster ổn định, không có execution
+    nào đang chạy hoặc khi cluster lỗi
+    """
+    
+    def __init__(self, mongo_service: MongoService, flink_client: FlinkRestClient,
+                 events: ExecutionEventBroadcaster, interval_min: float, interval_max: float,
+                 missing_grace_seconds: float):
+        self.mongo_service = mongo_service
+        self.flink_client = flink_client
+        self.events = events
+        self.interval_min = interval_min
+        self.interval_max = interval_max
+        self.missing_grace_seconds = missing_grace_seconds
+        self.interval = interval_min
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Any] = {
+            "runs": 0,
+            "errors": 0,
+            "transitions": 0,
+            "active_executions": 0,
+            "last_success_at": None,
+            "last_duration_seconds": None,
+            "last_detection_lag_seconds": None,
+            "max_detection_lag_seconds": 0.0
+        }
+        self._last_success_monotonic: Optional[float] = None
+    
+    def start(self):
+        """Chạy reconciler trên event loop hiện tại"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_forever(), name="execution-reconciler")
+            logger.info("Execution reconciler đã khởi động")
+    
+    async def stop(self):
+        """Dừng reconciler"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run_forever(self):
+        while True:
+            try:
+                changed, active = await self.reconcile_once()
+                self._adapt_interval(changed, active)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["errors"] += 1
+                self.interval = self.interval_max
+                logger.warning("Reconcile executions thất bại: %s", e)
+            await asyncio.sleep(self.interval)
+    
+    def _adapt_interval(self, changed: int, active: int):
+        if not active:
+            self.interval = self.interval_max
+        elif changed:
+            self.interval = self.interval_min
+        else:
+            self.interval = min(self.interval * 1.5, self.interval_max)
+    
+    async def reconcile_once(self) -> Tuple[int, int]:
+        """
+        Chạy một chu kỳ đối chiếu
+        Returns: (số execution được cập nhật, số execution đang hoạt động)
+        """
+        started = time.monotonic()
+        executions = await self.mongo_service.list_active_executions(ACTIVE_STATUSES)
+        self._stats["active_executions"] = len(executions)
+        if not executions:
+            self._record_success(started)
+            return 0, 0
+        
+        flink_jobs = {job["jid"]: job for job in await self.flink_client.jobs_overview()}
+        now = datetime.utcnow()
+        
+        updates = []
+        histories: Dict[str, ExecutionHistory] = {}
+        failed_jobs = []
+        detection_lags = []
+        for execution in executions:
+            change = self._diff(execution, flink_jobs.get(execution.flink_job_id), now)
+            if change is None:
+                continue
+            new_status, update_data, details = change
+            updates.append((execution.id, execution.status, update_data))
+            histories[execution.id] = ExecutionHistory(
+                execution_id=execution.id,
+                performed_by="reconciler",
+                performed_at=now,
+                action="RECONCILE",
+                old_status=execution.status,
+                new_status=new_status,
+                details=details
+            )
+            if new_status == JobStatus.FAILED and details["flink_state"]:
+                failed_jobs.append((execution.flink_job_id, update_data))
+            if update_data.get("finished_at"):
+                detection_lags.append((now - update_data["finished_at"]).total_seconds())
+        
+        await self._fill_error_messages(failed_jobs)
+        applied = await self.mongo_service.bulk_update_executions(updates)
+        applied_histories = [histories[execution_id] for execution_id in applied]
+        history_ids = await self.mongo_service.create_execution_histories(applied_histories)
+        for history, history_id in zip(applied_histories, history_ids):
+            history.id = history_id
+        self.events.publish_many(applied_histories, {execution.id: execution.job_spec_id for execution in executions})
+        
+        if applied:
+            logger.info("Reconciler đã cập nhật %s execution", len(applied))
+            self._stats["transitions"] += len(applied)
+        if detection_lags:
+            self._stats["last_detection_lag_seconds"] = max(detection_lags)
+            self._stats["max_detection_lag_seconds"] = max(self._stats["max_detection_lag_seconds"], *detection_lags)
+        self._record_success(started)
+        return len(applied), len(executions)
+    
+    def _diff(self, execution: Execution, flink_job: Optional[Dict[str, Any]],
+              now: datetime) -> Optional[Tuple[JobStatus, Dict[str, Any], Dict[str, Any]]]:
+        """So sánh execution với job trên cluster, trả về (trạng thái mới, dữ liệu cập nhật, details)"""
+        if flink_job is None:
+            # Job vừa submit có thể chưa xuất hiện; quá thời gian chờ thì coi như đã mất
+            if (now - execution.started_at).total_seconds() < self.missing_grace_seconds:
+                return None
+            return JobStatus.FAILED, {
+                "status": JobStatus.FAILED,
+                "finished_at": now,
+                "error_message": "Job không còn tồn tại trên Flink cluster"
+            }, {"flink_state": None}
+        
+        flink_state = flink_job.get("state")
+        new_status = FLINK_STATE_MAPPING.get(flink_state)
+        if new_status is None or new_status == execution.status:
+            return None
+        
+        update_data: Dict[str, Any] = {"status": new_status}
+        end_time = flink_job.get("end-time")
+        if new_status in (JobStatus.FINISHED, JobStatus.FAILED, JobStatus.CANCELED):
+            update_data["finished_at"] = datetime.utcfromtimestamp(end_time / 1000) if end_time and end_time > 0 else now
+        if new_status == JobStatus.FAILED:
+            update_data["error_message"] = f"Flink job {flink_state}"
+        return new_status, update_data, {"flink_state": flink_state}
+    
+    async def _fill_error_messages(self, failed: List[Tuple[str, Dict[str, Any]]]):
+        """Lấy root exception cho các job FAILED (đồng thời, số connection do pool của client giới hạn)"""
+        if not failed:
+            return
+        
+        results = await asyncio.gather(
+            *(self.flink_client.job_root_exception(flink_job_id) for flink_job_id, _ in failed),
+            return_exceptions=True
+        )
+        for (flink_job_id, update_data), result in zip(failed, results):
+            if isinstance(result, Exception):
+                logger.warning("Không lấy được exception của job %s: %s", flink_job_id, result)
+            elif result:
+                update_data["error_message"] = result
+    
+    def _record_success(self, started: float):
+        self._stats["runs"] += 1
+        self._stats["last_duration_seconds"] = round(time.monotonic() - started, 4)
+        self._stats["last_success_at"] = datetime.utcnow().isoformat()
+        self._last_success_monotonic = time.monotonic()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Metrics của reconciler; lag_seconds là thời gian kể từ lần đối chiếu thành công gần nhất"""
+        lag = None
+        if self._last_success_monotonic is not None:
+            lag = round(time.monotonic() - self._last_success_monotonic, 3)
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "lag_seconds": lag,
+            **self._stats
+        }
@@ -0,0 +1,200 @@
+from app.core.exceptions import FlinkClusterError
+from app.core.metrics import instrument_dependency
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, BinaryIO, Union
+import asyncio
+import logging
+import os
+import random
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Status code được coi là lỗi tạm thời của cluster (JobManager đang restart, proxy...)
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+
+@instrument_dependency("flink", exclude=("get_stats", "aclose"))
+class FlinkRestClient:
+    """
+    Client async cho Flink REST API dùng chung một httpx.AsyncClient
+    
+    - HTTP/1.1 keep-alive: connection được tái sử dụng giữa các request, số connection
+      tới JobManager bị giới hạn bởi max_connections (request vượt quá sẽ chờ trong pool)
+    - Timeout riêng cho connect/read, upload JAR có read timeout dài hơn
+    - Retry với exponential backoff + full jitter: request idempotent (GET/PATCH) được
+      retry khi lỗi mạng hoặc 502/503/504; request không idempotent (POST) chỉ được retry
+      khi chưa kết nối được (request chắc chắn chưa tới server)
+    """
+    
+    def __init__(self, base_url: str, max_connections: int, max_keepalive_connections: int,
+                 keepalive_expiry: float, connect_timeout: float, request_timeout: float,
+                 upload_timeout: float, max_retries: int, retry_backoff: float, retry_max_backoff: float):
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+        self.upload_timeout = upload_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_max_backoff = retry_max_backoff
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._stats = {"requests": 0, "retries": 0, "errors": 0}
+    
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """AsyncClient dùng chung, được tạo khi có request đầu tiên (httpx cũng chỉ được import lúc này)"""
+        if self._client is None or self._client.is_closed:
+            import httpx
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(self.request_timeout, connect=self.connect_timeout),
+                http2=False
+            )
+        return self._client
+    
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: sleep ngẫu nhiên trong [0, min(max, base * 2^attempt)]"""
+        return random.uniform(0, min(self.retry_max_backoff, self.retry_backoff * (2 ** attempt)))
+    
+    def _timeout(self, read_timeout: float) -> "httpx.Timeout":
+        import httpx
+        return httpx.Timeout(read_timeout, connect=self.connect_timeout)
+    
+    async def _request(self, method: str, path: str, idempotent: bool, **kwargs) -> "httpx.Response":
+        """Gửi request tới Flink với retry; raise FlinkClusterError khi thất bại"""
+        import httpx
+        
+        attempt = 0
+        while True:
+            self._stats["requests"] += 1
+            try:
+                response = await self.client.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                if retryable and attempt < self.max_retries:
+                    await self._retry_sleep(method, path, attempt, repr(e))
+                    attempt += 1
+                    continue
+                self._stats["errors"] += 1
+                raise FlinkClusterError(f"{method} {path} thất bại", flink_error=repr(e))
+            
+            if response.status_code in RETRYABLE_STATUS_CODES and idempotent and attempt < self.max_retries:
+                await response.aclose()
+                await self._retry_sleep(method, path, attempt, f"HTTP {response.status_code}")
+                attempt += 1
+                continue
+            
+            if response.is_error:
+                self._stats["errors"] += 1
+                raise FlinkClusterError(
+                    f"{method} {path} trả về HTTP {response.status_code}",
+                    flink_error=self._error_message(response)
+                )
+            return response
+    
+    async def _retry_sleep(self, method: str, path: str, attempt: int, reason: str):
+        self._stats["retries"] += 1
+        delay = self._backoff(attempt)
+        logger.warning("Retry Flink %s %s sau %.2fs (lần %s): %s", method, path, delay, attempt + 1, reason)
+        await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _error_message(response: "httpx.Response") -> str:
+        """Flink trả lỗi dạng {"errors": [...]}"""
+        try:
+            errors = response.json().get("errors")
+            if errors:
+                return "; ".join(str(error) for error in errors)
+        except ValueError:
+            pass
+        return response.text[:1000]
+    
+    async def upload_jar(self, filename: str, jar_data: Union[bytes, BinaryIO]) -> str:
+        """Upload JAR lên JobManager (POST /jars/upload), trả về jar ID"""
+        response = await self._request(
+            "POST", "/jars/upload", idempotent=False,
+            files={"jarfile": (filename, jar_data, "application/x-java-archive")},
+            timeout=self._timeout(self.upload_timeout)
+        )
+        # filename trả về là đường dẫn đầy đủ trên JobManager, jar ID là tên file
+        return os.path.basename(response.json()["filename"])
+    
+    async def run_jar(self, jar_id: str, entry_class: Optional[str] = None, parallelism: Optional[int] = None,
+                      program_args: Optional[List[str]] = None, savepoint_path: Optional[str] = None,
+                      allow_non_restored_state: bool = False) -> str:
+        """Chạy job từ JAR đã upload (POST /jars/{id}/run), trả về Flink job ID"""
+        body: Dict[str, Any] = {"allowNonRestoredState": allow_non_restored_state}
+        if entry_class:
+            body["entryClass"] = entry_class
+        if parallelism:
+            body["parallelism"] = parallelism
+        if program_args:
+            body["programArgsList"] = program_args
+        if savepoint_path:
+            body["savepointPath"] = savepoint_path
+        
+        response = await self._request("POST", f"/jars/{jar_id}/run", idempotent=False, json=body)
+        return response.json()["jobid"]
+    
+    async def list_jars(self) -> Dict[str, str]:
+        """Danh sách JAR đã upload trên JobManager (GET /jars), dạng {jar ID: tên file gốc}"""
+        response = await self._request("GET", "/jars", idempotent=True)
+        return {jar["id"]: jar.get("name", "") for jar in response.json().get("files", [])}
+    
+    async def delete_jar(self, jar_id: str):
+        """Xóa JAR khỏi JobManager (DELETE /jars/{id})"""
+        await self._request("DELETE", f"/jars/{jar_id}", idempotent=True)
+    
+    async def stop_job(self, job_id: str, savepoint_path: Optional[str] = None, drain: bool = False) -> str:
+        """Dừng job kèm savepoint (POST /jobs/{id}/stop), trả về trigger ID của savepoint"""
+        body: Dict[str, Any] = {"drain": drain}
+        if savepoint_path:
+            body["targetDirectory"] = savepoint_path
+        response = await self._request("POST", f"/jobs/{job_id}/stop", idempotent=False, json=body)
+        return response.json()["request-id"]
+    
+    async def cancel_job(self, job_id: str):
+        """Hủy job không savepoint (PATCH /jobs/{id}?mode=cancel)"""
+        await self._request("PATCH", f"/jobs/{job_id}", idempotent=True, params={"mode": "cancel"})
+    
+    async def jobs_overview(self) -> List[Dict[str, Any]]:
+        """Danh sách job và trạng thái trên cluster (GET /jobs/overview)"""
+        response = await self._request("GET", "/jobs/overview", idempotent=True)
+        return response.json().get("jobs", [])
+    
+    async def job_root_exception(self, job_id: str) -> Optional[str]:
+        """Dòng đầu của root exception của job (GET /jobs/{id}/exceptions)"""
+        response = await self._request("GET", f"/jobs/{job_id}/exceptions", idempotent=True,
+                                       params={"maxExceptions": 1})
+        payload = response.json()
+        entries = (payload.get("exceptionHistory") or {}).get("entries") or []
+        stacktrace = entries[0].get("stacktrace") if entries else payload.get("root-exception")
+        return stacktrace.strip().splitlines()[0] if stacktrace else None
+    
+    async def cluster_overview(self) -> Dict[str, Any]:
+        """Thông tin tổng quan cluster (GET /overview)"""
+        response = await self._request("GET", "/overview", idempotent=True)
+        return response.json()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Cấu hình pool và số request/retry/lỗi"""
+        return {
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            **self._stats
+        }
+    
+    async def aclose(self):
+        """Đóng connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
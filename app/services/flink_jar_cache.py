@@ -0,0 +1,120 @@
+from app.services.flink_client import FlinkRestClient
+from app.services.async_minio_service import AsyncMinIOService
+from app.models.artifact import Artifact
+from app.utils.cache import TTLCache
+from fastapi.concurrency import run_in_threadpool
+from typing import BinaryIO, Dict, Any, Callable, Awaitable
+import asyncio
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+class FlinkJarCache:
+    """
+    Cache JAR đã upload lên JobManager, keyed theo (cluster, SHA256 của artifact)
+    
+    - JAR được upload với tên {hash}.jar nên sau khi app restart vẫn nhận lại được
+      JAR đã có trên cluster qua GET /jars mà không cần upload lại
+    - jar ID trong cache được kiểm tra lại với danh sách /jars (danh sách được cache
+      ngắn hạn để nhiều lần start đồng thời chỉ gọi /jars một lần)
+    - Single-flight: nhiều lần start cùng artifact lúc chưa có JAR chỉ tạo một lần upload
+    """
+    
+    def __init__(self, flink_client: FlinkRestClient, minio_service: AsyncMinIOService, list_ttl_seconds: float):
+        self.flink_client = flink_client
+        self.minio_service = minio_service
+        self._jar_ids: Dict[tuple, str] = {}
+        self._listing = TTLCache(list_ttl_seconds, max_entries=16)
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._stats = {"hits": 0, "adopted": 0, "uploads": 0, "invalidations": 0}
+    
+    @staticmethod
+    def jar_name(file_hash: str) -> str:
+        return f"{file_hash}.jar"
+    
+    async def _single_flight(self, key: tuple, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Các lời gọi đồng thời cùng key dùng chung một kết quả
+        
+        func() chạy trong task riêng nên caller khởi tạo bị hủy (ví dụ client ngắt kết
+        nối) không hủy công việc mà các caller khác đang chờ
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+    
+    def _finish(self, key: tuple, task: asyncio.Task):
+        del self._inflight[key]
+        if not task.cancelled():
+            # Lấy exception để asyncio không cảnh báo khi mọi caller đã bị hủy
+            task.exception()
+    
+    async def _list_jars(self) -> Dict[str, str]:
+        """Danh sách /jars của cluster (cache ngắn hạn)"""
+        cluster = self.flink_client.base_url
+        jars = self._listing.get((cluster,))
+        if jars is None:
+            jars = await self._single_flight(("list", cluster), self.flink_client.list_jars)
+            self._listing.set((cluster,), jars)
+        return jars
+    
+    async def get_jar_id(self, artifact: Artifact) -> str:
+        """Lấy jar ID của artifact trên cluster, chỉ upload khi cluster chưa có JAR"""
+        key = (self.flink_client.base_url, artifact.metadata.hash)
+        jar_id = self._jar_ids.get(key)
+        if jar_id and jar_id in await self._list_jars():
+            self._stats["hits"] += 1
+            return jar_id
+        
+        return await self._single_flight(("register",) + key, lambda: self._register(key, artifact))
+    
+    async def _register(self, key: tuple, artifact: Artifact) -> str:
+        cluster, file_hash = key
+        name = self.jar_name(file_hash)
+        
+        # JAR có thể đã được upload trước đó (ví dụ trước khi app restart)
+        self._listing.invalidate(cluster)
+        for jar_id, jar_name in (await self._list_jars()).items():
+            if jar_name == name:
+                self._stats["adopted"] += 1
+                self._jar_ids[key] = jar_id
+                return jar_id
+        
+        with tempfile.TemporaryFile() as jar_file:
+            await self._spool(artifact.minio_path, jar_file)
+            jar_id = await self.flink_client.upload_jar(name, jar_file)
+        self._stats["uploads"] += 1
+        self._jar_ids[key] = jar_id
+        self._listing.invalidate(cluster)
+        logger.info("Đã upload JAR %s v%s lên Flink: %s", artifact.artifact_name, artifact.version, jar_id)
+        return jar_id
+    
+    async def _spool(self, minio_path: str, jar_file: BinaryIO):
+        """
+        Ghi JAR từ object storage ra file tạm theo từng chunk (không giữ cả JAR trong
+        memory); httpx đọc file này theo chunk khi gửi multipart lên JobManager
+        """
+        stream = await self.minio_service.stream_artifact(minio_path)
+        try:
+            async for chunk in stream:
+                await run_in_threadpool(jar_file.write, chunk)
+        finally:
+            await stream.aclose()
+        await run_in_threadpool(jar_file.flush)
+        jar_file.seek(0)
+    
+    def invalidate(self, file_hash: str):
+        """Bỏ jar ID đã cache (ví dụ khi /jars/{id}/run báo JAR không còn tồn tại)"""
+        cluster = self.flink_client.base_url
+        if self._jar_ids.pop((cluster, file_hash), None):
+            self._stats["invalidations"] += 1
+        self._listing.invalidate(cluster)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Thống kê hit/upload của cache"""
+        return {"entries": len(self._jar_ids), **self._stats}
@@ -0,0 +1,150 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+import asyncio
+import io
+import logging
+import mmap
+import multiprocessing
+import struct
+import tempfile
+import time
+import zlib
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.exceptions import InvalidArtifactError
+from app.utils.jar import find_entry_classes, main_class_from_manifest, read_central_directory, read_directory, read_entries
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _open_view(file_data: BinaryIO) -> Iterator[Any]:
+    """
+    View chỉ đọc trên toàn bộ file: mmap nếu file nằm trên đĩa (đọc theo vùng, không
+    đổi vị trí đọc của file), ngược lại là buffer của file in-memory
+    """
+    # SpooledTemporaryFile.fileno() ghi file ra đĩa (rollover): upload nhỏ còn trong
+    # memory được đọc trực tiếp qua buffer BytesIO bên trong
+    if isinstance(file_data, tempfile.SpooledTemporaryFile) and not file_data._rolled:
+        file_data = file_data._file
+    
+    try:
+        fileno = file_data.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        fileno = None
+    
+    if fileno is None:
+        if isinstance(file_data, io.BytesIO):
+            with file_data.getbuffer() as view:
+                yield view
+        else:
+            position = file_data.tell()
+            file_data.seek(0)
+            yield file_data.read()
+            file_data.seek(position)
+        return
+    
+    # Dữ liệu còn trong buffer của file object chưa hiện trên mmap
+    file_data.flush()
+    with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as view:
+        yield view
+
+
+class JarInspector:
+    """
+    Kiểm tra JAR lúc upload chỉ qua central directory của file zip
+    
+    - Tìm MANIFEST.MF bằng tìm kiếm byte trên central directory, đọc Main-Class
+    - Duyệt central directory trong process pool: kiểm tra các class được khai báo có trong
+      JAR và chọn các class ứng viên (bỏ qua package của thư viện được shade)
+    - Chỉ đọc / giải nén các class ứng viên để tìm public static void main(String[])
+    
+    Phần parse chạy trong process riêng nên không giữ GIL của event loop; phần đọc file
+    là range read trên mmap chạy trong thread pool
+    """
+    
+    def __init__(self, max_workers: int, max_candidates: int):
+        self.max_workers = max_workers
+        self.max_candidates = max_candidates
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stats = {"inspected": 0, "rejected": 0, "truncated": 0, "total_ms": 0.0, "max_ms": 0.0}
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: process con không kế thừa thread / connection của app
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+    
+    def start(self):
+        """Khởi động trước các worker process để lần upload đầu tiên không phải chờ spawn"""
+        pool = self._pool()
+        for _ in range(self.max_workers):
+            pool.submit(int)
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    async def _in_process(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool(), func, *args)
+        except BrokenProcessPool:
+            # Worker bị kill (OOM...): tạo lại pool và thử lại một lần
+            logger.warning("Process pool kiểm tra JAR bị hỏng, khởi tạo lại")
+            self.shutdown()
+            return await loop.run_in_executor(self._pool(), func, *args)
+    
+    async def inspect(self, file_data: BinaryIO, entry_classes: List[str]) -> Dict[str, Any]:
+        """
+        Kiểm tra JAR và tìm entry class
+        
+        Trả về main_class (Main-Class trong manifest), entry_classes (class có main),
+        class_count và truncated (số class ứng viên vượt giới hạn, danh sách có thể thiếu).
+        Raise InvalidArtifactError nếu file không phải JAR hợp lệ hoặc thiếu class được khai báo
+        """
+        started = time.perf_counter()
+        try:
+            with _open_view(file_data) as view:
+                directory, concat, manifest_data = await run_in_threadpool(read_directory, view)
+                main_class = main_class_from_manifest(manifest_data)
+                
+                required = list(dict.fromkeys(entry_classes + ([main_class] if main_class else [])))
+                index = await self._in_process(read_central_directory, directory, concat, required, self.max_candidates)
+                if index.missing_classes:
+                    raise ValueError(f"Các class không có trong JAR: {', '.join(index.missing_classes)}")
+                
+                classes = await run_in_threadpool(read_entries, view, index.candidates)
+            detected = await self._in_process(find_entry_classes, classes, main_class)
+        
+        except (ValueError, struct.error, zlib.error) as e:
+            self._stats["rejected"] += 1
+            raise InvalidArtifactError(str(e))
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._stats["inspected"] += 1
+        self._stats["truncated"] += int(index.truncated)
+        self._stats["total_ms"] += elapsed_ms
+        self._stats["max_ms"] = max(self._stats["max_ms"], elapsed_ms)
+        logger.info(
+            "Đã kiểm tra JAR: %s class, %s ứng viên, %s entry class (%.1fms)",
+            index.class_count, len(index.candidates), len(detected), elapsed_ms
+        )
+        return {
+            "main_class": main_class,
+            "entry_classes": detected,
+            "class_count": index.class_count,
+            "truncated": index.truncated,
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["avg_ms"] = stats["total_ms"] / stats["inspected"] if stats["inspected"] else 0.0
+        return stats
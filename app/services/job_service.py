@@ -1,4 +1,4 @@
-from app.services.mongo_service import mongo_service
+from app.services.mongo_service import MongoService
 from app.core.database import get_database
 from app.models.job_config import JobConfig, DeploymentHistory, JobStatus
 from app.schemas.job_config import JobConfigCreate, JobConfigUpdate, JobDeployRequest
@@ -17,7 +17,7 @@ logger = logging.getLogger(__name__)
 class JobService:
     """Service để quản lý job configs"""
     
-    def __init__(self):
+    def __init__(self, mongo_service: MongoService):
         self.mongo_service = mongo_service
         self.use_mock = True  # Sử dụng mock mode
         self.db = None
@@ -27,7 +27,7 @@ class JobService:
             try:
                 self.db = get_database()
             except Exception as e:
-                logger.warning(f"Database connection failed, using mock: {e}")
+                logger.warning("Database connection failed, using mock: %s", e)
                 self.use_mock = True
     
     async def create_job_config(self, job_data: JobConfigCreate) -> str:
@@ -50,7 +50,7 @@ class JobService:
                 "updated_at": datetime.utcnow()
             }
             mock_mongo_service.job_configs[job_id] = job_dict
-            logger.info(f"Mock tạo job config: {job_data.job_name}")
+            logger.info("Mock tạo job config: %s", job_data.job_name)
             return job_id
         
         # Real implementation would go here
@@ -119,7 +119,7 @@ class JobService:
             update_dict["updated_at"] = datetime.utcnow()
             
             job_doc.update(update_dict)
-            logger.info(f"Mock cập nhật job config: {job_id}")
+            logger.info("Mock cập nhật job config: %s", job_id)
             return True
         
         # Real implementation would go here
@@ -130,7 +130,7 @@ class JobService:
         if self.use_mock:
             if job_id in mock_mongo_service.job_configs:
                 del mock_mongo_service.job_configs[job_id]
-                logger.info(f"Mock xóa job config: {job_id}")
+                logger.info("Mock xóa job config: %s", job_id)
                 return True
             return False
         
@@ -163,7 +163,7 @@ class JobService:
             }
             mock_mongo_service.deployment_history[deployment_id] = deployment
             
-            logger.info(f"Mock deploy job: {job_id} -> {flink_job_id}")
+            logger.info("Mock deploy job: %s -> %s", job_id, flink_job_id)
             
             return {
                 "job_id": job_id,
@@ -188,7 +188,7 @@ class JobService:
                 mock_mongo_service.job_configs[job_id]["status"] = "canceled"
                 mock_mongo_service.job_configs[job_id]["updated_at"] = datetime.utcnow()
             
-            logger.info(f"Mock stop job: {job_id}")
+            logger.info("Mock stop job: %s", job_id)
             
             return {
                 "job_id": job_id,
@@ -220,4 +220,4 @@ class JobService:
 
 
 # Global instance
-job_service = JobService()
\ No newline at end of file
+job_service = JobService(MongoService())
\ No newline at end of file
@@ -1,14 +1,22 @@
-from app.services.mongo_service import mongo_service
-from app.core.database import get_database
+from app.services.mongo_service import MongoService
+from app.services.artifact_service import ArtifactService
+from app.services.flink_client import FlinkRestClient
+from app.services.flink_jar_cache import FlinkJarCache
+from app.services.execution_events import ExecutionEventBroadcaster
+from app.models.artifact import Artifact
 from app.models.job_config import JobSpec, Execution, ExecutionHistory, JobStatus
 from app.schemas.job_config import JobSpecCreate, JobSpecUpdate, ExecutionCreate
-from app.core.exceptions import JobConfigNotFoundError, JobNameExistsError, FlinkClusterError, ArtifactNotFoundError
-from app.services.mock_services import mock_mongo_service
+from app.core.exceptions import (
+    FlinkManagerException, JobConfigNotFoundError, ExecutionNotFoundError, ArtifactNotFoundError, FlinkClusterError,
+    ExecutionStateConflictError
+)
+from app.utils.helpers import decode_cursor, split_page
+from app.utils.cache import TTLCache
 from typing import List, Optional, Dict, Any
-from bson import ObjectId
+import asyncio
 import logging
-import httpx
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -17,279 +25,383 @@ logger = logging.getLogger(__name__)
 class JobSpecService:
     """Service để quản lý Job Specifications"""
     
-    def __init__(self):
+    def __init__(self, mongo_service: MongoService):
         self.mongo_service = mongo_service
-        self.use_mock = True  # Sử dụng mock mode
-        self.db = None
-        
-        if not self.use_mock:
-            try:
-                self.db = get_database()
-            except Exception as e:
-                logger.warning(f"Database connection failed, using mock: {e}")
-                self.use_mock = True
+        # Job spec được đọc lại ở mỗi lần start execution; model trả về từ cache là dùng chung
+        self.cache = TTLCache(
+            settings.metadata_cache_ttl_seconds,
+            settings.metadata_cache_max_entries,
+            negative_ttl_seconds=settings.metadata_cache_negative_ttl_seconds
+        )
     
     async def create_job_spec(self, job_spec_data: JobSpecCreate) -> str:
         """Tạo job spec mới"""
-        if self.use_mock:
-            # Mock implementation
-            job_spec_id = f"job_spec_{len(mock_mongo_service.job_specs) + 1}"
-            job_spec_dict = {
-                "_id": job_spec_id,
-                "job_spec_name": job_spec_data.job_spec_name,
-                "artifact_id": job_spec_data.artifact_id,
-                "entry_class": job_spec_data.entry_class,
-                "parallelism": job_spec_data.parallelism,
-                "program_args": job_spec_data.program_args or [],
-                "savepoint_path": job_spec_data.savepoint_path,
-                "flink_config": job_spec_data.flink_config or {},
-                "created_by": job_spec_data.created_by,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-            mock_mongo_service.job_specs[job_spec_id] = job_spec_dict
-            logger.info(f"Mock tạo job spec: {job_spec_data.job_spec_name}")
-            return job_spec_id
+        job_spec = JobSpec(
+            job_spec_name=job_spec_data.job_spec_name,
+            artifact_id=job_spec_data.artifact_id,
+            version_range=job_spec_data.version_range,
+            entry_class=job_spec_data.entry_class,
+            parallelism=job_spec_data.parallelism,
+            program_args=job_spec_data.program_args or [],
+            savepoint_path=job_spec_data.savepoint_path,
+            flink_config=job_spec_data.flink_config or {},
+            created_by=job_spec_data.created_by
+        )
         
-        # Real implementation would go here
-        raise NotImplementedError("Real MongoDB implementation not available")
+        job_spec_id = await self.mongo_service.create_job_spec(job_spec)
+        self.cache.delete(("job_spec", job_spec_id))
+        logger.info("Đã tạo job spec: %s", job_spec_data.job_spec_name)
+        return job_spec_id
     
     async def get_job_spec(self, job_spec_id: str) -> Optional[JobSpec]:
-        """Lấy job spec theo ID"""
-        if self.use_mock:
-            if job_spec_id in mock_mongo_service.job_specs:
-                job_spec_doc = mock_mongo_service.job_specs[job_spec_id].copy()
-                job_spec_doc["id"] = job_spec_doc["_id"]
-                return JobSpec(**job_spec_doc)
-            return None
-        
-        # Real implementation would go here
-        raise NotImplementedError("Real MongoDB implementation not available")
+        """Lấy job spec theo ID (qua cache)"""
+        return await self.cache.get_or_load(
+            ("job_spec", job_spec_id),
+            lambda: self.mongo_service.get_job_spec_by_id(job_spec_id)
+        )
     
-    async def list_job_specs(self, page: int = 1, size: int = 20, 
+    def list_version(self) -> str:
+        """Version của danh sách job specs, thay đổi sau mỗi thao tác ghi"""
+        return self.mongo_service.collection_version("job_specs")
+    
+    async def list_job_specs(self, page: int = 1, size: int = 20,
                            job_spec_name: Optional[str] = None,
                            created_by: Optional[str] = None,
-                           sort_by: str = "created_at", sort_order: str = "desc") -> tuple[List[JobSpec], int]:
-        """Lấy danh sách job specs với phân trang"""
-        if self.use_mock:
-            job_specs = []
-            for job_spec_id, job_spec_doc in mock_mongo_service.job_specs.items():
-                if job_spec_name:
-                    if job_spec_name.lower() not in job_spec_doc.get("job_spec_name", "").lower():
-                        continue
-                if created_by:
-                    if job_spec_doc.get("created_by") != created_by:
-                        continue
-                
-                job_spec_doc = job_spec_doc.copy()
-                job_spec_doc["id"] = job_spec_doc["_id"]
-                job_specs.append(JobSpec(**job_spec_doc))
-            
-            # Simple pagination
-            skip = (page - 1) * size
-            total = len(job_specs)
-            job_specs = job_specs[skip:skip + size]
-            
-            return job_specs, total
+                           sort_by: str = "created_at", sort_order: str = "desc",
+                           cursor: Optional[str] = None, include_total: bool = True,
+                           estimated_total: bool = False) -> tuple[List[JobSpec], Optional[int], Optional[str]]:
+        """Lấy danh sách job specs với phân trang (page hoặc cursor keyset)"""
+        sort_direction = -1 if sort_order == "desc" else 1
+        after = decode_cursor(cursor, sort_by, sort_direction) if cursor else None
+        skip = 0 if after else (page - 1) * size
+        
+        job_specs = await self.mongo_service.list_job_specs(
+            skip=skip,
+            limit=size + 1,
+            job_spec_name=job_spec_name,
+            created_by=created_by,
+            sort_by=sort_by,
+            sort_order=sort_direction,
+            after=after
+        )
+        job_specs, next_cursor = split_page(job_specs, size, sort_by, sort_direction)
         
-        # Real implementation would go here
-        raise NotImplementedError("Real MongoDB implementation not available")
+        total = None
+        if include_total:
+            total = await self.mongo_service.count_job_specs(job_spec_name, created_by, estimated=estimated_total)
+        
+        return job_specs, total, next_cursor
     
     async def update_job_spec(self, job_spec_id: str, update_data: JobSpecUpdate) -> bool:
         """Cập nhật job spec"""
-        if self.use_mock:
-            if job_spec_id not in mock_mongo_service.job_specs:
-                return False
-            
-            job_spec_doc = mock_mongo_service.job_specs[job_spec_id]
-            update_dict = update_data.dict(exclude_unset=True)
-            update_dict["updated_at"] = datetime.utcnow()
-            
-            job_spec_doc.update(update_dict)
-            logger.info(f"Mock cập nhật job spec: {job_spec_id}")
-            return True
-        
-        # Real implementation would go here
-        raise NotImplementedError("Real MongoDB implementation not available")
+        update_dict = update_data.dict(exclude_unset=True)
+        success = await self.mongo_service.update_job_spec(job_spec_id, update_dict)
+        self.cache.delete(("job_spec", job_spec_id))
+        if success:
+            logger.info("Đã cập nhật job spec: %s", job_spec_id)
+        return success
     
     async def delete_job_spec(self, job_spec_id: str) -> bool:
         """Xóa job spec"""
-        if self.use_mock:
-            if job_spec_id in mock_mongo_service.job_specs:
-                del mock_mongo_service.job_specs[job_spec_id]
-                logger.info(f"Mock xóa job spec: {job_spec_id}")
-                return True
-            return False
-        
-        # Real implementation would go here
-        raise NotImplementedError("Real MongoDB implementation not available")
+        success = await self.mongo_service.delete_job_spec(job_spec_id)
+        self.cache.delete(("job_spec", job_spec_id))
+        if success:
+            logger.info("Đã xóa job spec: %s", job_spec_id)
+        return success
 
 
 class ExecutionService:
     """Service để quản lý Executions"""
     
-    def __init__(self):
+    def __init__(self, mongo_service: MongoService, job_spec_service: JobSpecService,
+                 artifact_service: ArtifactService, flink_client: FlinkRestClient,
+                 jar_cache: FlinkJarCache, events: ExecutionEventBroadcaster):
         self.mongo_service = mongo_service
-        self.use_mock = True  # Sử dụng mock mode
-        self.db = None
+        # Đọc job spec / artifact qua cache metadata của các service tương ứng
+        self.job_spec_service = job_spec_service
+        self.artifact_service = artifact_service
+        self.flink_client = flink_client
+        self.jar_cache = jar_cache
+        self.events = events
+        self.use_mock = settings.flink_backend != "rest"
         self.flink_api_url = settings.flink_rest_api_url
-        
-        if not self.use_mock:
-            try:
-                self.db = get_database()
-            except Exception as e:
-                logger.warning(f"Database connection failed, using mock: {e}")
-                self.use_mock = True
     
     async def start_execution(self, job_spec_id: str, execution_data: ExecutionCreate) -> Dict[str, Any]:
         """Bắt đầu execution từ job spec"""
+        result, history = await self._start_one(job_spec_id, execution_data.started_by)
+        await self._record_histories([history], {history.execution_id: job_spec_id})
+        return result
+    
+    async def _start_one(self, job_spec_id: str, started_by: str) -> tuple[Dict[str, Any], ExecutionHistory]:
+        """Chạy job trên Flink và tạo execution record; trả về kết quả và history (chưa ghi)"""
+        job_spec = await self.job_spec_service.get_job_spec(job_spec_id)
+        if not job_spec:
+            raise JobConfigNotFoundError(job_spec_id)
+        
+        # Mock Flink không cần JAR; vẫn resolve phiên bản nếu job spec ghim theo điều kiện version
+        artifact = None
+        if job_spec.version_range or not self.use_mock:
+            artifact = await self._resolve_artifact(job_spec)
+        
         if self.use_mock:
-            # Mock implementation
-            execution_id = f"exec_{len(mock_mongo_service.executions) + 1}"
-            flink_job_id = f"flink_job_{execution_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-            
-            # Tạo execution record
-            execution_dict = {
-                "_id": execution_id,
-                "job_spec_id": job_spec_id,
-                "flink_job_id": flink_job_id,
-                "status": "running",
-                "started_by": execution_data.started_by,
-                "started_at": datetime.utcnow(),
-                "finished_at": None,
-                "error_message": None
-            }
-            mock_mongo_service.executions[execution_id] = execution_dict
-            
-            # Tạo execution history
-            history_id = f"history_{len(mock_mongo_service.execution_history) + 1}"
-            history_dict = {
-                "_id": history_id,
-                "execution_id": execution_id,
-                "performed_by": execution_data.started_by,
-                "performed_at": datetime.utcnow(),
-                "action": "START",
-                "old_status": None,
-                "new_status": "running",
-                "details": {"job_spec_id": job_spec_id}
-            }
-            mock_mongo_service.execution_history[history_id] = history_dict
-            
-            logger.info(f"Mock start execution: {execution_id} -> {flink_job_id}")
-            
-            return {
-                "execution_id": execution_id,
-                "flink_job_id": flink_job_id,
-                "status": "running",
-                "started_at": datetime.utcnow(),
-                "started_by": execution_data.started_by
-            }
+            # Mock Flink: job ID có dạng 32 ký tự hex như Flink thật
+            flink_job_id = uuid.uuid4().hex
+        else:
+            flink_job_id = await self._submit_job(job_spec, artifact)
+        started_at = datetime.utcnow()
+        
+        # Tạo execution record
+        execution = Execution(
+            job_spec_id=job_spec_id,
+            flink_job_id=flink_job_id,
+            status=JobStatus.RUNNING,
+            started_by=started_by,
+            started_at=started_at
+        )
+        execution_id = await self.mongo_service.create_execution(execution)
         
-        # Real implementation would go here
-        raise NotImplementedError("Real Flink execution not available")
+        history = ExecutionHistory(
+            execution_id=execution_id,
+            performed_by=started_by,
+            performed_at=started_at,
+            action="START",
+            old_status=None,
+            new_status=JobStatus.RUNNING,
+            details={"job_spec_id": job_spec_id}
+        )
+        if artifact:
+            history.details.update(artifact_id=artifact.id, artifact_version=artifact.version)
+        
+        logger.info("Đã start execution: %s -> %s", execution_id, flink_job_id)
+        
+        return {
+            "execution_id": execution_id,
+            "flink_job_id": flink_job_id,
+            "status": JobStatus.RUNNING,
+            "started_at": started_at,
+            "started_by": started_by
+        }, history
     
     async def stop_execution(self, execution_id: str, savepoint: bool = False, savepoint_path: Optional[str] = None) -> Dict[str, Any]:
         """Dừng execution"""
-        if self.use_mock:
-            # Mock stop execution
-            execution_doc = mock_mongo_service.executions.get(execution_id, {})
-            flink_job_id = execution_doc.get("flink_job_id", f"flink_job_{execution_id}")
-            
-            # Cập nhật execution
-            if execution_id in mock_mongo_service.executions:
-                mock_mongo_service.executions[execution_id]["status"] = "canceled"
-                mock_mongo_service.executions[execution_id]["finished_at"] = datetime.utcnow()
-            
-            # Tạo execution history
-            history_id = f"history_{len(mock_mongo_service.execution_history) + 1}"
-            history_dict = {
-                "_id": history_id,
-                "execution_id": execution_id,
-                "performed_by": "system",  # Mock user
-                "performed_at": datetime.utcnow(),
-                "action": "STOP",
-                "old_status": "running",
-                "new_status": "canceled",
-                "details": {"savepoint": savepoint, "savepoint_path": savepoint_path}
-            }
-            mock_mongo_service.execution_history[history_id] = history_dict
-            
-            logger.info(f"Mock stop execution: {execution_id}")
-            
-            return {
-                "execution_id": execution_id,
-                "flink_job_id": flink_job_id,
-                "status": "canceled",
-                "stopped_at": datetime.utcnow(),
-                "savepoint_path": savepoint_path if savepoint else None
-            }
+        execution = await self.mongo_service.get_execution_by_id(execution_id)
+        if not execution:
+            raise ExecutionNotFoundError(execution_id)
+        
+        stopped_at = await self._stop_job(execution, savepoint, savepoint_path)
+        
+        # Cập nhật có điều kiện như batch stop / reconciler: không ghi đè trạng thái
+        # (FAILED, FINISHED...) đã được ghi ở nơi khác trong lúc gọi Flink
+        applied = await self.mongo_service.bulk_update_executions([
+            (execution_id, execution.status, {"status": JobStatus.CANCELED, "finished_at": stopped_at})
+        ])
+        if not applied:
+            raise (await self._state_conflicts([execution]))[execution_id]
+        
+        history = self._stop_history(execution, stopped_at, savepoint, savepoint_path)
+        await self._record_histories([history], {execution_id: execution.job_spec_id})
+        
+        logger.info("Đã stop execution: %s", execution_id)
+        
+        return self._stop_result(execution, stopped_at, savepoint, savepoint_path)
+    
+    async def _state_conflicts(self, executions: List[Execution]) -> Dict[str, FlinkManagerException]:
+        """Lỗi cho các execution không được cập nhật vì trạng thái đã đổi, kèm trạng thái hiện tại"""
+        if not executions:
+            return {}
+        current = {item.id: item for item in await self.mongo_service.get_executions_by_ids([e.id for e in executions])}
+        return {
+            execution.id: ExecutionStateConflictError(execution.id, execution.status, current[execution.id].status)
+            if execution.id in current else ExecutionNotFoundError(execution.id)
+            for execution in executions
+        }
+    
+    async def _stop_job(self, execution: Execution, savepoint: bool, savepoint_path: Optional[str]) -> datetime:
+        """Dừng job trên Flink (stop kèm savepoint hoặc cancel), trả về thời điểm dừng"""
+        if not self.use_mock and execution.flink_job_id:
+            if savepoint:
+                await self.flink_client.stop_job(execution.flink_job_id, savepoint_path=savepoint_path)
+            else:
+                await self.flink_client.cancel_job(execution.flink_job_id)
+        return datetime.utcnow()
+    
+    @staticmethod
+    def _stop_history(execution: Execution, stopped_at: datetime, savepoint: bool,
+                      savepoint_path: Optional[str]) -> ExecutionHistory:
+        return ExecutionHistory(
+            execution_id=execution.id,
+            performed_by="system",
+            performed_at=stopped_at,
+            action="STOP",
+            old_status=execution.status,
+            new_status=JobStatus.CANCELED,
+            details={"savepoint": savepoint, "savepoint_path": savepoint_path}
+        )
+    
+    @staticmethod
+    def _stop_result(execution: Execution, stopped_at: datetime, savepoint: bool,
+                     savepoint_path: Optional[str]) -> Dict[str, Any]:
+        return {
+            "execution_id": execution.id,
+            "flink_job_id": execution.flink_job_id,
+            "status": JobStatus.CANCELED,
+            "stopped_at": stopped_at,
+            "savepoint_path": savepoint_path if savepoint else None
+        }
+    
+    async def _record_histories(self, histories: List[ExecutionHistory], job_spec_ids: Dict[str, str]):
+        """Ghi history bằng một lần insert và phát event cho các subscriber"""
+        history_ids = await self.mongo_service.create_execution_histories(histories)
+        for history, history_id in zip(histories, history_ids):
+            history.id = history_id
+        self.events.publish_many(histories, job_spec_ids)
+    
+    @staticmethod
+    def _item_error(item_id: str, error: Exception) -> Dict[str, Any]:
+        """Kết quả lỗi của một phần tử trong batch"""
+        if isinstance(error, FlinkManagerException):
+            return {"id": item_id, "success": False, "error_code": error.error_code, "message": error.message}
+        logger.error("Lỗi không mong muốn khi xử lý %s: %s", item_id, error, exc_info=error)
+        return {"id": item_id, "success": False, "error_code": "INTERNAL_SERVER_ERROR",
+                "message": "Lỗi hệ thống không mong muốn"}
+    
+    async def batch_start(self, job_spec_ids: List[str], started_by: str) -> List[Dict[str, Any]]:
+        """
+        Bắt đầu execution cho nhiều job spec. Các lời gọi Flink chạy song song với giới hạn
+        execution_batch_concurrency; lỗi của một phần tử không làm dừng các phần tử khác
+        """
+        semaphore = asyncio.Semaphore(settings.execution_batch_concurrency)
+        
+        async def start(job_spec_id: str):
+            async with semaphore:
+                try:
+                    result, history = await self._start_one(job_spec_id, started_by)
+                    return {"id": job_spec_id, "success": True, "data": result}, history
+                except Exception as e:
+                    return self._item_error(job_spec_id, e), None
+        
+        outcomes = await asyncio.gather(*(start(job_spec_id) for job_spec_id in dict.fromkeys(job_spec_ids)))
+        histories = [history for _, history in outcomes if history is not None]
+        await self._record_histories(histories, {h.execution_id: h.details["job_spec_id"] for h in histories})
+        return [result for result, _ in outcomes]
+    
+    async def batch_stop(self, execution_ids: List[str], savepoint: bool = False,
+                         savepoint_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Dừng nhiều execution: gọi Flink song song có giới hạn, sau đó cập nhật trạng thái
+        bằng một bulk write và ghi history bằng một lần insert
+        """
+        execution_ids = list(dict.fromkeys(execution_ids))
+        executions = {execution.id: execution for execution in await self.mongo_service.get_executions_by_ids(execution_ids)}
+        semaphore = asyncio.Semaphore(settings.execution_batch_concurrency)
+        
+        async def stop(execution_id: str) -> Dict[str, Any]:
+            execution = executions.get(execution_id)
+            if execution is None:
+                return self._item_error(execution_id, ExecutionNotFoundError(execution_id))
+            async with semaphore:
+                try:
+                    stopped_at = await self._stop_job(execution, savepoint, savepoint_path)
+                except Exception as e:
+                    return self._item_error(execution_id, e)
+            return {"id": execution_id, "success": True,
+                    "data": self._stop_result(execution, stopped_at, savepoint, savepoint_path)}
+        
+        results = await asyncio.gather(*(stop(execution_id) for execution_id in execution_ids))
+        
+        stopped = {result["id"]: result["data"]["stopped_at"] for result in results if result["success"]}
+        applied = await self.mongo_service.bulk_update_executions([
+            (execution_id, executions[execution_id].status,
+             {"status": JobStatus.CANCELED, "finished_at": stopped_at})
+            for execution_id, stopped_at in stopped.items()
+        ])
+        await self._record_histories(
+            [self._stop_history(executions[execution_id], stopped[execution_id], savepoint, savepoint_path)
+             for execution_id in applied],
+            {execution_id: executions[execution_id].job_spec_id for execution_id in applied}
+        )
+        
+        # Job đã dừng trên Flink nhưng trạng thái đã được đổi ở nơi khác: báo conflict cùng trạng thái hiện tại
+        applied = set(applied)
+        conflicts = await self._state_conflicts([executions[execution_id] for execution_id in stopped
+                                                 if execution_id not in applied])
+        results = [self._item_error(result["id"], conflicts[result["id"]]) if result["id"] in conflicts else result
+                   for result in results]
         
-        # Real implementation would go here
-        raise NotImplementedError("Real Flink stop not available")
+        logger.info("Đã stop %s/%s execution", len(applied), len(execution_ids))
+        return results
+    
+    async def _resolve_artifact(self, job_spec: JobSpec) -> Artifact:
+        """
+        Artifact sẽ chạy: artifact_id của job spec, hoặc nếu có version_range thì phiên bản
+        mới nhất cùng tên thỏa điều kiện (một lần seek trên index phiên bản, có cache)
+        """
+        artifact = await self.artifact_service.get_artifact(job_spec.artifact_id)
+        if not artifact:
+            raise ArtifactNotFoundError(job_spec.artifact_id)
+        if job_spec.version_range:
+            return await self.artifact_service.get_latest_artifact(artifact.artifact_name, job_spec.version_range)
+        return artifact
+    
+    async def _submit_job(self, job_spec: JobSpec, artifact: Artifact) -> str:
+        """Đưa JAR của artifact lên Flink (qua cache) và chạy job, trả về Flink job ID"""
+        # JAR chỉ được upload khi cluster chưa có (restart sau khi đổi config không upload lại)
+        jar_id = await self.jar_cache.get_jar_id(artifact)
+        try:
+            return await self.flink_client.run_jar(
+                jar_id,
+                entry_class=job_spec.entry_class,
+                parallelism=job_spec.parallelism,
+                program_args=job_spec.program_args,
+                savepoint_path=job_spec.savepoint_path
+            )
+        except FlinkClusterError:
+            # JAR có thể đã bị xóa khỏi JobManager; lần start sau sẽ kiểm tra và upload lại
+            self.jar_cache.invalidate(artifact.metadata.hash)
+            raise
     
     async def get_execution(self, execution_id: str) -> Optional[Execution]:
         """Lấy execution theo ID"""
-        if self.use_mock:
-            if execution_id in mock_mongo_service.executions:
-                execution_doc = mock_mongo_service.executions[execution_id].copy()
-                execution_doc["id"] = execution_doc["_id"]
-                return Execution(**execution_doc)
-            return None
-        
-        # Real implementation would go here
-        raise NotImplementedError("Real MongoDB implementation not available")
+        return await self.mongo_service.get_execution_by_id(execution_id)
     
-    async def list_executions(self, page: int = 1, size: int = 20, 
+    async def list_executions(self, page: int = 1, size: int = 20,
                             job_spec_id: Optional[str] = None,
                             status: Optional[JobStatus] = None,
                             started_by: Optional[str] = None,
-                            sort_by: str = "started_at", sort_order: str = "desc") -> tuple[List[Execution], int]:
-        """Lấy danh sách executions với phân trang"""
-        if self.use_mock:
-            executions = []
-            for execution_id, execution_doc in mock_mongo_service.executions.items():
-                if job_spec_id:
-                    if execution_doc.get("job_spec_id") != job_spec_id:
-                        continue
-                if status:
-                    if execution_doc.get("status") != status:
-                        continue
-                if started_by:
-                    if execution_doc.get("started_by") != started_by:
-                        continue
-                
-                execution_doc = execution_doc.copy()
-                execution_doc["id"] = execution_doc["_id"]
-                executions.append(Execution(**execution_doc))
-            
-            # Simple pagination
-            skip = (page - 1) * size
-            total = len(executions)
-            executions = executions[skip:skip + size]
-            
-            return executions, total
+                            sort_by: str = "started_at", sort_order: str = "desc",
+                            cursor: Optional[str] = None, include_total: bool = True,
+                            estimated_total: bool = False) -> tuple[List[Execution], Optional[int], Optional[str]]:
+        """Lấy danh sách executions với phân trang (page hoặc cursor keyset)"""
+        sort_direction = -1 if sort_order == "desc" else 1
+        after = decode_cursor(cursor, sort_by, sort_direction) if cursor else None
+        skip = 0 if after else (page - 1) * size
+        
+        executions = await self.mongo_service.list_executions(
+            skip=skip,
+            limit=size + 1,
+            job_spec_id=job_spec_id,
+            status=status,
+            started_by=started_by,
+            sort_by=sort_by,
+            sort_order=sort_direction,
+            after=after
+        )
+        executions, next_cursor = split_page(executions, size, sort_by, sort_direction)
+        
+        total = None
+        if include_total:
+            total = await self.mongo_service.count_executions(job_spec_id, status, started_by, estimated=estimated_total)
         
-        # Real implementation would go here
-        raise NotImplementedError("Real MongoDB implementation not available")
+        return executions, total, next_cursor
+    
+    def list_version(self) -> str:
+        """Version của danh sách executions (bao gồm thay đổi trạng thái từ reconciler)"""
+        return self.mongo_service.collection_version("executions")
+    
+    def history_version(self) -> str:
+        """Version của lịch sử execution"""
+        return self.mongo_service.collection_version("execution_history")
     
     async def get_execution_history(self, execution_id: str) -> List[ExecutionHistory]:
         """Lấy lịch sử execution"""
-        if self.use_mock:
-            history = []
-            for history_id, history_doc in mock_mongo_service.execution_history.items():
-                if history_doc.get("execution_id") == execution_id:
-                    history_doc = history_doc.copy()
-                    history_doc["id"] = history_doc["_id"]
-                    history.append(ExecutionHistory(**history_doc))
-            
-            # Sort by performed_at desc
-            history.sort(key=lambda x: x.performed_at, reverse=True)
-            return history
-        
-        # Real implementation would go here
-        raise NotImplementedError("Real MongoDB implementation not available")
-
-
-# Global instances
-job_spec_service = JobSpecService()
-execution_service = ExecutionService()
+        return await self.mongo_service.get_execution_history(execution_id)
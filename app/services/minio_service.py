@@ -1,47 +1,107 @@
-from minio import Minio
-from minio.error import S3Error
 from app.config import settings
 from app.core.exceptions import MinIOError
+from app.core.metrics import instrument_dependency
 from app.services.mock_services import mock_minio_service
+from app.utils.helpers import HashingReader, StreamDigest
 import logging
-from typing import Optional, BinaryIO
-import hashlib
+from typing import Optional, BinaryIO, Dict, Iterator
 import os
+import threading
+import uuid
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+# Prefix của blob layer: nội dung JAR được lưu một lần theo SHA256,
+# các phiên bản artifact chỉ trỏ tới blob
+BLOB_PREFIX = "blobs/sha256/"
+# Object tạm của upload được hash trong lúc ghi, chuyển sang blob layer khi đã có SHA256
+STAGING_PREFIX = "blobs/staging/"
 
+
+class ObjectStream:
+    """
+    Stream đọc object theo chunk, dùng được từ nhiều worker thread
+    
+    read() và close() được tuần tự hóa bằng lock: close() gọi trong lúc một lần read()
+    khác đang chạy sẽ đợi lần đọc đó xong rồi mới đóng. close() luôn đóng response và
+    trả connection về pool, kể cả khi chưa đọc chunk nào
+    """
+    
+    def __init__(self, chunks: Iterator[bytes], response=None):
+        self._chunks = chunks
+        self._response = response
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> bytes:
+        chunk = self.read()
+        if chunk is None:
+            raise StopIteration
+        return chunk
+    
+    def read(self) -> Optional[bytes]:
+        """Chunk tiếp theo, None khi đã đọc hết hoặc stream đã đóng"""
+        with self._lock:
+            if self._closed:
+                return None
+            return next(self._chunks, None)
+    
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            close = getattr(self._chunks, "close", None)
+            if close:
+                close()
+            if self._response is not None:
+                self._response.close()
+                self._response.release_conn()
+
+
+@instrument_dependency("minio")
 class MinIOService:
     """Service để tương tác với MinIO"""
     
     def __init__(self):
-        self.use_mock = True  # Sử dụng mock service
+        self.use_mock = settings.storage_backend != "minio"
         self.bucket_name = settings.minio_bucket
         
         if not self.use_mock:
-            try:
-                self.client = Minio(
-                    settings.minio_endpoint,
-                    access_key=settings.minio_access_key,
-                    secret_key=settings.minio_secret_key,
-                    secure=settings.minio_secure
-                )
-                self._ensure_bucket_exists()
-            except Exception as e:
-                logger.warning(f"MinIO connection failed, using mock: {e}")
-                self.use_mock = True
+            # SDK chỉ được import khi dùng MinIO thật (import minio mất ~100ms lúc khởi động)
+            from minio import Minio
+            self.client = Minio(
+                settings.minio_endpoint,
+                access_key=settings.minio_access_key,
+                secret_key=settings.minio_secret_key,
+                secure=settings.minio_secure
+            )
+            self._ensure_bucket_exists()
     
     def _ensure_bucket_exists(self):
         """Đảm bảo bucket tồn tại"""
         try:
             if not self.client.bucket_exists(self.bucket_name):
                 self.client.make_bucket(self.bucket_name)
-                logger.info(f"Đã tạo bucket {self.bucket_name}")
-        except S3Error as e:
-            logger.error(f"Lỗi tạo bucket: {e}")
+                logger.info("Đã tạo bucket %s", self.bucket_name)
+        except Exception as e:
+            logger.error("Lỗi kết nối MinIO / tạo bucket: %s", e)
             raise MinIOError(f"Không thể tạo bucket: {e}")
     
+    def ping(self) -> bool:
+        """Kiểm tra kết nối tới MinIO và bucket còn tồn tại"""
+        if self.use_mock:
+            return True
+        
+        try:
+            return self.client.bucket_exists(self.bucket_name)
+        except Exception as e:
+            raise MinIOError(f"Không thể kết nối MinIO: {e}")
+    
     def upload_artifact(self, artifact_name: str, version: str, file_data: BinaryIO, file_size: int) -> tuple[str, str]:
         """
         Upload artifact JAR file
@@ -50,59 +110,182 @@ class MinIOService:
         if self.use_mock:
             return mock_minio_service.upload_artifact(artifact_name, version, file_data, file_size)
         
+        from minio.error import S3Error
+        
         try:
             # Tạo đường dẫn trong MinIO
             minio_path = f"artifacts/{artifact_name}/versions/{version}/fatjar/{artifact_name}-{version}.jar"
             
-            # Tính hash của file
+            # Upload file theo từng part (multipart), hash được tính trong lúc đọc
             file_data.seek(0)
-            file_hash = hashlib.sha256(file_data.read()).hexdigest()
-            file_data.seek(0)
-            
-            # Upload file
+            reader = HashingReader(file_data)
             self.client.put_object(
                 bucket_name=self.bucket_name,
                 object_name=minio_path,
-                data=file_data,
+                data=reader,
                 length=file_size,
-                content_type="application/java-archive"
+                content_type="application/java-archive",
+                part_size=settings.minio_part_size
             )
+            file_hash = reader.hexdigest()
             
-            logger.info(f"Đã upload artifact: {minio_path}")
+            logger.info("Đã upload artifact: %s", minio_path)
             return minio_path, file_hash
+        
+        except S3Error as e:
+            logger.error("Lỗi upload artifact: %s", e)
+            raise MinIOError(f"Không thể upload artifact: {e}")
+    
+    @staticmethod
+    def blob_path(file_hash: str) -> str:
+        """Đường dẫn content-addressed của blob theo SHA256"""
+        return f"{BLOB_PREFIX}{file_hash[:2]}/{file_hash}.jar"
+    
+    @staticmethod
+    def is_blob_path(minio_path: str) -> bool:
+        """Kiểm tra đường dẫn có thuộc blob layer (content-addressed) không"""
+        return minio_path.startswith(BLOB_PREFIX)
+    
+    def upload_blob(self, file_hash: str, file_data: BinaryIO, file_size: int,
+                    metadata: Optional[Dict[str, str]] = None) -> str:
+        """
+        Upload nội dung JAR vào blob layer theo SHA256 đã tính trước
+        Returns: minio_path của blob
+        """
+        minio_path = self.blob_path(file_hash)
+        if self.use_mock:
+            return mock_minio_service.upload_blob(minio_path, file_data, file_size, metadata)
+        
+        from minio.error import S3Error
+        
+        try:
+            file_data.seek(0)
+            self.client.put_object(
+                bucket_name=self.bucket_name,
+                object_name=minio_path,
+                data=file_data,
+                length=file_size,
+                content_type="application/java-archive",
+                metadata=metadata,
+                part_size=settings.minio_part_size
+            )
             
+            logger.info("Đã upload blob: %s", minio_path)
+            return minio_path
+        
+        except S3Error as e:
+            logger.error("Lỗi upload blob: %s", e)
+            raise MinIOError(f"Không thể upload blob: {e}")
+    
+    def upload_staging(self, file_data: BinaryIO, file_size: int) -> tuple[str, StreamDigest]:
+        """
+        Upload nội dung vào vùng staging, tính SHA256 (và checksum bổ sung) trong lúc đọc
+        
+        SDK đọc tuần tự từng part rồi upload song song, nên việc hash part tiếp theo
+        chạy chồng lên việc ghi các part trước (chỉ một lần đọc file)
+        Returns: (đường dẫn staging, digest của nội dung)
+        """
+        staging_path = f"{STAGING_PREFIX}{uuid.uuid4().hex}.jar"
+        if self.use_mock:
+            return mock_minio_service.upload_staging(staging_path, file_data, file_size)
+        
+        from minio.error import S3Error
+        
+        try:
+            file_data.seek(0)
+            reader = HashingReader(file_data, StreamDigest(settings.upload_checksum_algorithm))
+            self.client.put_object(
+                bucket_name=self.bucket_name,
+                object_name=staging_path,
+                data=reader,
+                length=file_size,
+                content_type="application/java-archive",
+                part_size=settings.minio_part_size
+            )
+            return staging_path, reader.digest
+        
         except S3Error as e:
-            logger.error(f"Lỗi upload artifact: {e}")
+            logger.error("Lỗi upload staging: %s", e)
             raise MinIOError(f"Không thể upload artifact: {e}")
     
+    def promote_staging(self, staging_path: str, minio_path: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        """Chuyển object staging sang đường dẫn blob (copy phía server) rồi xóa staging"""
+        if self.use_mock:
+            return mock_minio_service.promote_staging(staging_path, minio_path, metadata)
+        
+        from minio.commonconfig import ComposeSource
+        from minio.error import S3Error
+        
+        try:
+            self.client.compose_object(
+                self.bucket_name,
+                minio_path,
+                [ComposeSource(self.bucket_name, staging_path)],
+                metadata=metadata
+            )
+            self.client.remove_object(self.bucket_name, staging_path)
+            
+            logger.info("Đã chuyển staging %s -> %s", staging_path, minio_path)
+            return minio_path
+        
+        except S3Error as e:
+            logger.error("Lỗi chuyển staging sang blob: %s", e)
+            raise MinIOError(f"Không thể lưu blob: {e}")
+    
     def download_artifact(self, minio_path: str) -> bytes:
         """Download artifact JAR file"""
         if self.use_mock:
             return mock_minio_service.download_artifact(minio_path)
         
+        from minio.error import S3Error
+        
         try:
             response = self.client.get_object(self.bucket_name, minio_path)
             data = response.read()
             response.close()
             response.release_conn()
             return data
-            
+        
         except S3Error as e:
-            logger.error(f"Lỗi download artifact: {e}")
+            logger.error("Lỗi download artifact: %s", e)
             raise MinIOError(f"Không thể download artifact: {e}")
     
+    def stream_artifact(self, minio_path: str, offset: int = 0, length: Optional[int] = None,
+                        chunk_size: Optional[int] = None) -> ObjectStream:
+        """
+        Mở object và trả về iterator đọc theo từng chunk cố định
+        (lỗi khi mở object được raise ngay, không đợi đến lần đọc đầu tiên)
+        """
+        chunk_size = chunk_size or settings.download_chunk_size
+        if self.use_mock:
+            return ObjectStream(mock_minio_service.stream_artifact(minio_path, offset, length, chunk_size))
+        
+        from minio.error import S3Error
+        
+        try:
+            response = self.client.get_object(
+                self.bucket_name, minio_path, offset=offset, length=length or 0
+            )
+        except S3Error as e:
+            logger.error("Lỗi download artifact: %s", e)
+            raise MinIOError(f"Không thể download artifact: {e}")
+        
+        return ObjectStream(response.stream(chunk_size), response)
+    
     def delete_artifact(self, minio_path: str) -> bool:
         """Xóa artifact JAR file"""
         if self.use_mock:
             return mock_minio_service.delete_artifact(minio_path)
         
+        from minio.error import S3Error
+        
         try:
             self.client.remove_object(self.bucket_name, minio_path)
-            logger.info(f"Đã xóa artifact: {minio_path}")
+            logger.info("Đã xóa artifact: %s", minio_path)
             return True
-            
+        
         except S3Error as e:
-            logger.error(f"Lỗi xóa artifact: {e}")
+            logger.error("Lỗi xóa artifact: %s", e)
             raise MinIOError(f"Không thể xóa artifact: {e}")
     
     def artifact_exists(self, minio_path: str) -> bool:
@@ -110,6 +293,8 @@ class MinIOService:
         if self.use_mock:
             return mock_minio_service.artifact_exists(minio_path)
         
+        from minio.error import S3Error
+        
         try:
             self.client.stat_object(self.bucket_name, minio_path)
             return True
@@ -121,6 +306,8 @@ class MinIOService:
         if self.use_mock:
             return mock_minio_service.get_artifact_info(minio_path)
         
+        from minio.error import S3Error
+        
         try:
             stat = self.client.stat_object(self.bucket_name, minio_path)
             return {
@@ -130,7 +317,7 @@ class MinIOService:
                 "content_type": stat.content_type
             }
         except S3Error as e:
-            logger.error(f"Lỗi lấy thông tin artifact: {e}")
+            logger.error("Lỗi lấy thông tin artifact: %s", e)
             raise MinIOError(f"Không thể lấy thông tin artifact: {e}")
     
     def generate_presigned_url(self, minio_path: str, expires_in: int = 3600) -> str:
@@ -138,6 +325,8 @@ class MinIOService:
         if self.use_mock:
             return mock_minio_service.generate_presigned_url(minio_path, expires_in)
         
+        from minio.error import S3Error
+        
         try:
             url = self.client.presigned_put_object(
                 bucket_name=self.bucket_name,
@@ -146,9 +335,5 @@ class MinIOService:
             )
             return url
         except S3Error as e:
-            logger.error(f"Lỗi tạo presigned URL: {e}")
+            logger.error("Lỗi tạo presigned URL: %s", e)
             raise MinIOError(f"Không thể tạo presigned URL: {e}")
-
-
-# Global instance
-minio_service = MinIOService()
\ No newline at end of file
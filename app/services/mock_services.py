@@ -1,8 +1,16 @@
-from typing import Dict, Any, Optional, List, BinaryIO
+from typing import Dict, Any, Optional, List, BinaryIO, Iterator, Iterable, Callable, Set, Tuple
+import bisect
+import heapq
 import logging
 from datetime import datetime
+from enum import Enum
 import hashlib
 import io
+from app.config import settings
+from app.core.exceptions import ArtifactVersionExistsError, JobNameExistsError
+from app.utils.helpers import HashingReader, StreamDigest
+from app.utils.search import InvertedIndex, artifact_search_fields
+from app.utils.semver import VersionRange, safe_version_key
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +20,7 @@ class MockMinIOService:
     
     def __init__(self):
         self.files: Dict[str, bytes] = {}
+        self.metadata: Dict[str, Dict[str, str]] = {}
         logger.info("Mock MinIO service initialized")
     
     def _ensure_bucket_exists(self):
@@ -23,45 +32,101 @@ class MockMinIOService:
         try:
             minio_path = f"artifacts/{artifact_name}/versions/{version}/fatjar/{artifact_name}-{version}.jar"
             
-            # Đọc và tính hash
+            # Đọc theo từng chunk và tính hash trong lúc đọc
             file_data.seek(0)
-            file_content = file_data.read()
-            file_hash = hashlib.sha256(file_content).hexdigest()
+            sha256 = hashlib.sha256()
+            chunks = []
+            for chunk in iter(lambda: file_data.read(settings.upload_chunk_size), b""):
+                sha256.update(chunk)
+                chunks.append(chunk)
+            file_hash = sha256.hexdigest()
             
             # Lưu vào mock storage
-            self.files[minio_path] = file_content
+            self.files[minio_path] = b"".join(chunks)
             
-            logger.info(f"Mock upload artifact: {minio_path}")
+            logger.info("Mock upload artifact: %s", minio_path)
             return minio_path, file_hash
+        
+        except Exception as e:
+            logger.error("Mock upload error: %s", e)
+            raise Exception(f"Mock upload failed: {e}")
+    
+    def upload_blob(self, minio_path: str, file_data: BinaryIO, file_size: int,
+                    metadata: Optional[Dict[str, str]] = None) -> str:
+        """Mock upload blob"""
+        try:
+            file_data.seek(0)
+            chunks = list(iter(lambda: file_data.read(settings.upload_chunk_size), b""))
+            self.files[minio_path] = b"".join(chunks)
+            self.metadata[minio_path] = dict(metadata or {})
+            
+            logger.info("Mock upload blob: %s", minio_path)
+            return minio_path
+        
+        except Exception as e:
+            logger.error("Mock upload error: %s", e)
+            raise Exception(f"Mock upload failed: {e}")
+    
+    def upload_staging(self, staging_path: str, file_data: BinaryIO, file_size: int) -> tuple[str, StreamDigest]:
+        """Mock upload vào vùng staging, tính digest trong lúc đọc"""
+        try:
+            file_data.seek(0)
+            reader = HashingReader(file_data, StreamDigest(settings.upload_checksum_algorithm))
+            chunks = list(iter(lambda: reader.read(settings.upload_hash_chunk_size), b""))
+            self.files[staging_path] = b"".join(chunks)
             
+            logger.info("Mock upload staging: %s", staging_path)
+            return staging_path, reader.digest
+        
         except Exception as e:
-            logger.error(f"Mock upload error: {e}")
+            logger.error("Mock upload error: %s", e)
             raise Exception(f"Mock upload failed: {e}")
     
+    def promote_staging(self, staging_path: str, minio_path: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        """Mock chuyển object staging sang blob"""
+        if staging_path not in self.files:
+            raise Exception(f"File not found: {staging_path}")
+        self.files[minio_path] = self.files.pop(staging_path)
+        self.metadata[minio_path] = dict(metadata or {})
+        logger.info("Mock promote staging: %s -> %s", staging_path, minio_path)
+        return minio_path
+    
     def download_artifact(self, minio_path: str) -> bytes:
         """Mock download artifact"""
         try:
             if minio_path not in self.files:
                 raise Exception(f"File not found: {minio_path}")
             
-            logger.info(f"Mock download artifact: {minio_path}")
+            logger.info("Mock download artifact: %s", minio_path)
             return self.files[minio_path]
-            
+        
         except Exception as e:
-            logger.error(f"Mock download error: {e}")
+            logger.error("Mock download error: %s", e)
             raise Exception(f"Mock download failed: {e}")
     
+    def stream_artifact(self, minio_path: str, offset: int = 0, length: Optional[int] = None,
+                        chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """Mock stream artifact theo từng chunk"""
+        if minio_path not in self.files:
+            raise Exception(f"File not found: {minio_path}")
+        
+        chunk_size = chunk_size or settings.download_chunk_size
+        data = memoryview(self.files[minio_path])
+        end = len(data) if length is None else min(offset + length, len(data))
+        return (bytes(data[pos:min(pos + chunk_size, end)]) for pos in range(offset, end, chunk_size))
+    
     def delete_artifact(self, minio_path: str) -> bool:
         """Mock delete artifact"""
         try:
             if minio_path in self.files:
                 del self.files[minio_path]
-                logger.info(f"Mock delete artifact: {minio_path}")
+                self.metadata.pop(minio_path, None)
+                logger.info("Mock delete artifact: %s", minio_path)
                 return True
             return False
-            
+        
         except Exception as e:
-            logger.error(f"Mock delete error: {e}")
+            logger.error("Mock delete error: %s", e)
             raise Exception(f"Mock delete failed: {e}")
     
     def artifact_exists(self, minio_path: str) -> bool:
@@ -86,14 +151,251 @@ class MockMinIOService:
         return f"http://mock-minio:9000/{minio_path}?expires={expires_in}"
 
 
+class InMemoryCollection:
+    """
+    Collection in-memory có index để thay cho việc scan toàn bộ dict:
+    
+    - hash index: field -> {value -> set(_id)}, lookup O(1), nhiều điều kiện
+      được giao bắt đầu từ set nhỏ nhất
+    - sorted index: field -> list (value, _id) đã sắp xếp, duy trì bằng bisect;
+      phân trang duyệt index theo thứ tự và dừng khi đủ trang
+    - unique index: tuple field -> {tuple value -> _id}
+    """
+    
+    def __init__(self, hash_indexes: Iterable[str] = (), sorted_indexes: Iterable[str] = (),
+                 unique_indexes: Iterable[Tuple[str, ...]] = ()):
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self._hash: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in hash_indexes}
+        self._sorted: Dict[str, List[tuple]] = {field: [] for field in sorted_indexes}
+        self._unique: Dict[Tuple[str, ...], Dict[tuple, str]] = {fields: {} for fields in unique_indexes}
+    
+    @staticmethod
+    def _key(value: Any) -> Any:
+        """Chuẩn hóa giá trị để dùng làm key (Enum -> value)"""
+        return value.value if isinstance(value, Enum) else value
+    
+    @staticmethod
+    def _sort_key(value: Any) -> tuple:
+        """Key sắp xếp an toàn với None (None đứng trước mọi giá trị)"""
+        return (value is not None, value)
+    
+    def __len__(self) -> int:
+        return len(self.docs)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.docs
+    
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Lấy bản copy của document (kèm field id)"""
+        doc = self.docs.get(doc_id)
+        return self._copy(doc) if doc is not None else None
+    
+    @staticmethod
+    def _copy(doc: Dict[str, Any]) -> Dict[str, Any]:
+        doc = doc.copy()
+        doc["id"] = doc["_id"]
+        return doc
+    
+    def find_unique(self, fields: Tuple[str, ...], values: tuple) -> Optional[Dict[str, Any]]:
+        """Lookup theo unique index"""
+        doc_id = self._unique[fields].get(tuple(self._key(v) for v in values))
+        return self.get(doc_id) if doc_id is not None else None
+    
+    def insert(self, doc: Dict[str, Any]):
+        """Thêm document (raise KeyError nếu vi phạm unique index)"""
+        doc_id = doc["_id"]
+        for fields, index in self._unique.items():
+            if tuple(self._key(doc.get(f)) for f in fields) in index:
+                raise KeyError(fields)
+        
+        self.docs[doc_id] = doc
+        self._index(doc_id, doc)
+    
+    def update(self, doc_id: str, changes: Dict[str, Any]) -> bool:
+        """Cập nhật document và các index bị ảnh hưởng"""
+        doc = self.docs.get(doc_id)
+        if doc is None:
+            return False
+        
+        for fields, index in self._unique.items():
+            if any(f in changes for f in fields):
+                new_key = tuple(self._key(changes.get(f, doc.get(f))) for f in fields)
+                if index.get(new_key, doc_id) != doc_id:
+                    raise KeyError(fields)
+        
+        self._unindex(doc_id, doc)
+        doc.update(changes)
+        self._index(doc_id, doc)
+        return True
+    
+    def delete(self, doc_id: str) -> bool:
+        """Xóa document"""
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        self._unindex(doc_id, doc)
+        return True
+    
+    def _index(self, doc_id: str, doc: Dict[str, Any]):
+        for field, index in self._hash.items():
+            index.setdefault(self._key(doc.get(field)), set()).add(doc_id)
+        for field, entries in self._sorted.items():
+            bisect.insort(entries, (self._sort_key(self._key(doc.get(field))), doc_id))
+        for fields, index in self._unique.items():
+            index[tuple(self._key(doc.get(f)) for f in fields)] = doc_id
+    
+    def _unindex(self, doc_id: str, doc: Dict[str, Any]):
+        for field, index in self._hash.items():
+            key = self._key(doc.get(field))
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del index[key]
+        for field, entries in self._sorted.items():
+            entry = (self._sort_key(self._key(doc.get(field))), doc_id)
+            pos = bisect.bisect_left(entries, entry)
+            if pos < len(entries) and entries[pos] == entry:
+                del entries[pos]
+        for fields, index in self._unique.items():
+            index.pop(tuple(self._key(doc.get(f)) for f in fields), None)
+    
+    def _candidate_ids(self, equals: Dict[str, Any]) -> Optional[Set[str]]:
+        """Giao các set id từ hash index (None nếu không có điều kiện)"""
+        id_sets = []
+        for field, value in equals.items():
+            if value is None:
+                continue
+            id_sets.append(self._hash[field].get(self._key(value), set()))
+        if not id_sets:
+            return None
+        
+        id_sets.sort(key=len)
+        if len(id_sets) == 1:
+            return id_sets[0]
+        return id_sets[0].intersection(*id_sets[1:])
+    
+    @staticmethod
+    def _field(doc: Dict[str, Any], path: str) -> Any:
+        """Lấy giá trị field của document (hỗ trợ đường dẫn dạng a.b)"""
+        value = doc
+        for part in path.split("."):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+    
+    def _iter_matches(self, equals: Dict[str, Any], predicate: Optional[Callable[[Dict[str, Any]], bool]],
+                      sort_by: Optional[str], sort_order: int,
+                      after: Optional[Tuple[Any, str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Duyệt các document khớp điều kiện theo thứ tự yêu cầu (lazy)
+        after: vị trí (sort_value, _id) của phần tử cuối trang trước (keyset pagination)
+        """
+        candidates = self._candidate_ids(equals)
+        sorted_entries = self._sorted.get(sort_by) if sort_by else None
+        bound = (self._sort_key(self._key(after[0])), after[1]) if after else None
+        
+        if sorted_entries is not None and (candidates is None or len(candidates) * 8 >= len(sorted_entries)):
+            # Duyệt sorted index từ vị trí cursor (bisect), dừng sớm khi caller đã lấy đủ
+            if sort_order == -1:
+                stop = bisect.bisect_left(sorted_entries, bound) if bound else len(sorted_entries)
+                positions = range(stop - 1, -1, -1)
+            else:
+                begin = bisect.bisect_right(sorted_entries, bound) if bound else 0
+                positions = range(begin, len(sorted_entries))
+            doc_ids = (
+                sorted_entries[pos][1] for pos in positions
+                if candidates is None or sorted_entries[pos][1] in candidates
+            )
+        elif sort_by:
+            # Tập ứng viên nhỏ hoặc field không có index: sắp xếp trực tiếp
+            keyed = [
+                (self._sort_key(self._key(self._field(self.docs[doc_id], sort_by))), doc_id)
+                for doc_id in (self.docs if candidates is None else candidates)
+            ]
+            if bound:
+                keyed = [k for k in keyed if (k < bound if sort_order == -1 else k > bound)]
+            keyed.sort(reverse=(sort_order == -1))
+            doc_ids = (doc_id for _, doc_id in keyed)
+        elif candidates is None:
+            doc_ids = self.docs.keys()
+        else:
+            # Giữ thứ tự insert như khi scan dict
+            doc_ids = (doc_id for doc_id in self.docs if doc_id in candidates)
+        
+        for doc_id in doc_ids:
+            doc = self.docs[doc_id]
+            if predicate is None or predicate(doc):
+                yield doc
+    
+    def find(self, equals: Optional[Dict[str, Any]] = None,
+             predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+             sort_by: Optional[str] = None, sort_order: int = -1,
+             skip: int = 0, limit: Optional[int] = None,
+             after: Optional[Tuple[Any, str]] = None) -> List[Dict[str, Any]]:
+        """Tìm document; chỉ các document thuộc trang kết quả mới được copy"""
+        results = []
+        matches = self._iter_matches(equals or {}, predicate, sort_by, sort_order, after)
+        for position, doc in enumerate(matches):
+            if position < skip:
+                continue
+            if limit is not None and len(results) >= limit:
+                break
+            results.append(self._copy(doc))
+        return results
+    
+    def count(self, equals: Optional[Dict[str, Any]] = None,
+              predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> int:
+        """Đếm document khớp điều kiện (O(1) khi chỉ lọc bằng một hash index)"""
+        candidates = self._candidate_ids(equals or {})
+        if predicate is None:
+            return len(self.docs) if candidates is None else len(candidates)
+        doc_ids = self.docs.keys() if candidates is None else candidates
+        return sum(1 for doc_id in doc_ids if predicate(self.docs[doc_id]))
+
+
+def _contains(field: str, value: Optional[str]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Predicate tìm kiếm substring không phân biệt hoa thường"""
+    if not value:
+        return None
+    value = value.lower()
+    return lambda doc: value in (doc.get(field) or "").lower()
+
+
+def _prefix(field: str, value: Optional[str]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Predicate lọc theo tiền tố (phân biệt hoa thường), giống regex ^prefix của MongoService"""
+    if not value:
+        return None
+    return lambda doc: (doc.get(field) or "").startswith(value)
+
+
 class MockMongoService:
     """Mock MongoDB service để test mà không cần MongoDB thực tế"""
     
     def __init__(self):
-        self.artifacts: Dict[str, Dict[str, Any]] = {}
-        self.job_specs: Dict[str, Dict[str, Any]] = {}
-        self.executions: Dict[str, Dict[str, Any]] = {}
-        self.execution_history: Dict[str, Dict[str, Any]] = {}
+        self.artifacts = InMemoryCollection(
+            hash_indexes=["artifact_name"],
+            sorted_indexes=["created_at", "updated_at"],
+            unique_indexes=[("artifact_name", "version")]
+        )
+        self.artifact_search = InvertedIndex(settings.search_min_prefix_length)
+        # artifact_name -> [(version_key, artifact ID)] tăng dần theo semver
+        self.artifact_versions: Dict[str, List[Tuple[str, str]]] = {}
+        self.job_specs = InMemoryCollection(
+            hash_indexes=["created_by"],
+            sorted_indexes=["created_at", "updated_at"],
+            unique_indexes=[("job_spec_name",)]
+        )
+        self.executions = InMemoryCollection(
+            hash_indexes=["job_spec_id", "status", "started_by"],
+            sorted_indexes=["started_at"]
+        )
+        self.execution_history = InMemoryCollection(
+            hash_indexes=["execution_id"],
+            sorted_indexes=["performed_at"]
+        )
+        self.blobs: Dict[str, Dict[str, Any]] = {}
         self._next_id = 1
         logger.info("Mock MongoDB service initialized")
     
@@ -110,136 +412,155 @@ class MockMongoService:
             artifact_id = self._generate_id()
             artifact_dict = artifact.dict(by_alias=True, exclude={"id"})
             artifact_dict["_id"] = artifact_id
-            self.artifacts[artifact_id] = artifact_dict
-            
-            logger.info(f"Mock create artifact: {artifact_id}")
+            artifact_dict["version_key"] = safe_version_key(artifact.version)
+            try:
+                self.artifacts.insert(artifact_dict)
+            except KeyError:
+                raise ArtifactVersionExistsError(artifact.artifact_name, artifact.version)
+            self.artifact_search.add(artifact_id, artifact_search_fields(artifact_dict))
+            if artifact_dict["version_key"] is not None:
+                bisect.insort(
+                    self.artifact_versions.setdefault(artifact.artifact_name, []),
+                    (artifact_dict["version_key"], artifact_id)
+                )
+            
+            logger.info("Mock create artifact: %s", artifact_id)
             return artifact_id
-            
+        
+        except ArtifactVersionExistsError:
+            raise
         except Exception as e:
-            logger.error(f"Mock create artifact error: {e}")
+            logger.error("Mock create artifact error: %s", e)
             raise
     
     async def get_artifact_by_id(self, artifact_id: str) -> Optional[Any]:
         """Mock get artifact by ID"""
-        try:
-            if artifact_id in self.artifacts:
-                artifact_doc = self.artifacts[artifact_id].copy()
-                artifact_doc["id"] = artifact_doc["_id"]
-                return artifact_doc
-            return None
-            
-        except Exception as e:
-            logger.error(f"Mock get artifact error: {e}")
-            raise
+        return self.artifacts.get(artifact_id)
     
     async def get_artifact_by_name_version(self, artifact_name: str, version: str) -> Optional[Any]:
         """Mock get artifact by name and version"""
-        try:
-            for artifact_id, artifact_doc in self.artifacts.items():
-                if (artifact_doc.get("artifact_name") == artifact_name and 
-                    artifact_doc.get("version") == version):
-                    artifact_doc = artifact_doc.copy()
-                    artifact_doc["id"] = artifact_doc["_id"]
-                    return artifact_doc
-            return None
-            
-        except Exception as e:
-            logger.error(f"Mock get artifact by name/version error: {e}")
-            raise
+        return self.artifacts.find_unique(("artifact_name", "version"), (artifact_name, version))
     
     async def list_artifacts(self, skip: int = 0, limit: int = 20, 
                            artifact_name: Optional[str] = None,
-                           sort_by: str = "created_at", sort_order: int = -1) -> List[Any]:
+                           sort_by: str = "created_at", sort_order: int = -1,
+                           after: Optional[tuple] = None) -> List[Any]:
         """Mock list artifacts"""
         try:
-            artifacts = []
-            for artifact_id, artifact_doc in self.artifacts.items():
-                if artifact_name:
-                    if artifact_name.lower() not in artifact_doc.get("artifact_name", "").lower():
-                        continue
-                
-                artifact_doc = artifact_doc.copy()
-                artifact_doc["id"] = artifact_doc["_id"]
-                artifacts.append(artifact_doc)
-            
-            # Simple sorting
-            if sort_by in ["created_at", "updated_at"]:
-                artifacts.sort(key=lambda x: x.get(sort_by, ""), reverse=(sort_order == -1))
-            
-            return artifacts[skip:skip + limit]
-            
+            return self.artifacts.find(
+                predicate=_prefix("artifact_name", artifact_name),
+                sort_by=sort_by, sort_order=sort_order, skip=skip, limit=limit, after=after
+            )
+        
         except Exception as e:
-            logger.error(f"Mock list artifacts error: {e}")
+            logger.error("Mock list artifacts error: %s", e)
             raise
     
     async def count_artifacts(self, artifact_name: Optional[str] = None) -> int:
         """Mock count artifacts"""
-        try:
-            count = 0
-            for artifact_doc in self.artifacts.values():
-                if artifact_name:
-                    if artifact_name.lower() in artifact_doc.get("artifact_name", "").lower():
-                        count += 1
-                else:
-                    count += 1
-            return count
-            
-        except Exception as e:
-            logger.error(f"Mock count artifacts error: {e}")
-            raise
+        return self.artifacts.count(predicate=_prefix("artifact_name", artifact_name))
     
     async def delete_artifact(self, artifact_id: str) -> bool:
         """Mock delete artifact"""
-        try:
-            if artifact_id in self.artifacts:
-                del self.artifacts[artifact_id]
-                logger.info(f"Mock delete artifact: {artifact_id}")
-                return True
-            return False
-            
-        except Exception as e:
-            logger.error(f"Mock delete artifact error: {e}")
-            raise
+        artifact_doc = self.artifacts.docs.get(artifact_id)
+        if self.artifacts.delete(artifact_id):
+            self.artifact_search.remove(artifact_id)
+            self._remove_version(artifact_doc)
+            logger.info("Mock delete artifact: %s", artifact_id)
+            return True
+        return False
+    
+    def _remove_version(self, artifact_doc: Dict[str, Any]):
+        """Xóa artifact khỏi index phiên bản"""
+        entries = self.artifact_versions.get(artifact_doc["artifact_name"])
+        entry = (artifact_doc.get("version_key"), artifact_doc["_id"])
+        if not entries or entry[0] is None:
+            return
+        i = bisect.bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+        if not entries:
+            del self.artifact_versions[artifact_doc["artifact_name"]]
+    
+    def _version_slice(self, artifact_name: str,
+                       version_range: Optional[VersionRange]) -> Tuple[List[Tuple[str, str]], int, int]:
+        """Index phiên bản của artifact và vị trí [start, end) của các phiên bản thuộc khoảng"""
+        entries = self.artifact_versions.get(artifact_name, [])
+        lower, upper = version_range.key_bounds() if version_range else (None, None)
+        start = bisect.bisect_left(entries, (lower,)) if lower is not None else 0
+        end = bisect.bisect_left(entries, (upper,)) if upper is not None else len(entries)
+        return entries, start, end
     
-    async def get_artifact_versions(self, artifact_name: str) -> List[str]:
-        """Mock get artifact versions"""
+    async def get_artifact_versions(self, artifact_name: str,
+                                    version_range: Optional[VersionRange] = None) -> List[str]:
+        """Mock get artifact versions (mới nhất trước, theo semver)"""
         try:
-            versions = []
-            for artifact_doc in self.artifacts.values():
-                if artifact_doc.get("artifact_name") == artifact_name:
-                    versions.append(artifact_doc.get("version", ""))
-            
-            # Sort versions (simple string sort)
-            versions.sort(reverse=True)
-            return versions
-            
+            entries, start, end = self._version_slice(artifact_name, version_range)
+            return [self.artifacts.docs[doc_id]["version"] for _, doc_id in reversed(entries[start:end])]
+        
         except Exception as e:
-            logger.error(f"Mock get artifact versions error: {e}")
+            logger.error("Mock get artifact versions error: %s", e)
             raise
     
-    async def search_artifacts(self, query: str) -> List[Any]:
-        """Mock search artifacts"""
+    async def get_latest_artifact(self, artifact_name: str,
+                                  version_range: Optional[VersionRange] = None) -> Optional[Any]:
+        """Mock lấy phiên bản mới nhất thuộc khoảng version (bisect trên index phiên bản)"""
+        entries, start, end = self._version_slice(artifact_name, version_range)
+        if end <= start:
+            return None
+        return self.artifacts.get(entries[end - 1][1])
+    
+    async def search_artifacts(self, query_tokens: List[str], skip: int = 0, limit: int = 20) -> Tuple[List[Any], int]:
+        """Mock search artifacts qua inverted index"""
         try:
-            results = []
-            for artifact_id, artifact_doc in self.artifacts.items():
-                # Simple text search
-                searchable_text = (
-                    artifact_doc.get("artifact_name", "") + " " +
-                    artifact_doc.get("version", "") + " " +
-                    artifact_doc.get("metadata", {}).get("description", "")
-                ).lower()
-                
-                if query.lower() in searchable_text:
-                    artifact_doc = artifact_doc.copy()
-                    artifact_doc["id"] = artifact_doc["_id"]
-                    results.append(artifact_doc)
-            
-            return results
-            
+            scored = [
+                (score, self.artifacts.docs[doc_id]["created_at"], doc_id)
+                for score, doc_id in self.artifact_search.search(query_tokens)
+            ]
+            page = heapq.nlargest(skip + limit, scored)[skip:]
+            return [self.artifacts.get(doc_id) for _, _, doc_id in page], len(scored)
+        
         except Exception as e:
-            logger.error(f"Mock search artifacts error: {e}")
+            logger.error("Mock search artifacts error: %s", e)
             raise
     
+    # Blob operations
+    async def get_blob(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Mock get blob"""
+        blob_doc = self.blobs.get(file_hash)
+        return blob_doc.copy() if blob_doc else None
+    
+    async def acquire_blob(self, file_hash: str, minio_path: str, file_size: int, state: Any) -> Dict[str, Any]:
+        """Mock tăng reference count của blob"""
+        blob_doc = self.blobs.setdefault(file_hash, {
+            "_id": file_hash,
+            "minio_path": minio_path,
+            "file_size": file_size,
+            "ref_count": 0,
+            "state": getattr(state, "value", state),
+            "created_at": datetime.utcnow()
+        })
+        blob_doc["ref_count"] += 1
+        return blob_doc.copy()
+    
+    async def commit_blob(self, file_hash: str):
+        """Mock đánh dấu blob đã committed"""
+        blob_doc = self.blobs.get(file_hash)
+        if blob_doc:
+            blob_doc["state"] = "committed"
+    
+    async def release_blob(self, file_hash: str) -> int:
+        """Mock giảm reference count của blob"""
+        blob_doc = self.blobs.get(file_hash)
+        if not blob_doc:
+            return 0
+        
+        blob_doc["ref_count"] -= 1
+        if blob_doc["ref_count"] <= 0:
+            del self.blobs[file_hash]
+            return 0
+        return blob_doc["ref_count"]
+    
     # JobSpec operations
     async def create_job_spec(self, job_spec: Any) -> str:
         """Mock create job spec"""
@@ -247,101 +568,69 @@ class MockMongoService:
             job_spec_id = self._generate_id()
             job_spec_dict = job_spec.dict(by_alias=True, exclude={"id"})
             job_spec_dict["_id"] = job_spec_id
-            self.job_specs[job_spec_id] = job_spec_dict
+            try:
+                self.job_specs.insert(job_spec_dict)
+            except KeyError:
+                raise JobNameExistsError(job_spec.job_spec_name)
             
-            logger.info(f"Mock create job spec: {job_spec_id}")
+            logger.info("Mock create job spec: %s", job_spec_id)
             return job_spec_id
-            
+        
+        except JobNameExistsError:
+            raise
         except Exception as e:
-            logger.error(f"Mock create job spec error: {e}")
+            logger.error("Mock create job spec error: %s", e)
             raise
     
     async def get_job_spec_by_id(self, job_spec_id: str) -> Optional[Any]:
         """Mock get job spec by ID"""
-        try:
-            if job_spec_id in self.job_specs:
-                job_spec_doc = self.job_specs[job_spec_id].copy()
-                job_spec_doc["id"] = job_spec_doc["_id"]
-                return job_spec_doc
-            return None
-            
-        except Exception as e:
-            logger.error(f"Mock get job spec error: {e}")
-            raise
+        return self.job_specs.get(job_spec_id)
+    
+    async def get_job_spec_by_name(self, job_spec_name: str) -> Optional[Any]:
+        """Mock get job spec by name"""
+        return self.job_specs.find_unique(("job_spec_name",), (job_spec_name,))
     
     async def list_job_specs(self, skip: int = 0, limit: int = 20, 
                            job_spec_name: Optional[str] = None,
                            created_by: Optional[str] = None,
-                           sort_by: str = "created_at", sort_order: int = -1) -> List[Any]:
+                           sort_by: str = "created_at", sort_order: int = -1,
+                           after: Optional[tuple] = None) -> List[Any]:
         """Mock list job specs"""
         try:
-            job_specs = []
-            for job_spec_id, job_spec_doc in self.job_specs.items():
-                if job_spec_name:
-                    if job_spec_name.lower() not in job_spec_doc.get("job_spec_name", "").lower():
-                        continue
-                if created_by:
-                    if job_spec_doc.get("created_by") != created_by:
-                        continue
-                
-                job_spec_doc = job_spec_doc.copy()
-                job_spec_doc["id"] = job_spec_doc["_id"]
-                job_specs.append(job_spec_doc)
-            
-            # Simple sorting
-            if sort_by in ["created_at", "updated_at"]:
-                job_specs.sort(key=lambda x: x.get(sort_by, ""), reverse=(sort_order == -1))
-            
-            return job_specs[skip:skip + limit]
-            
+            return self.job_specs.find(
+                {"created_by": created_by},
+                predicate=_contains("job_spec_name", job_spec_name),
+                sort_by=sort_by, sort_order=sort_order, skip=skip, limit=limit, after=after
+            )
+        
         except Exception as e:
-            logger.error(f"Mock list job specs error: {e}")
+            logger.error("Mock list job specs error: %s", e)
             raise
     
     async def count_job_specs(self, job_spec_name: Optional[str] = None, created_by: Optional[str] = None) -> int:
         """Mock count job specs"""
-        try:
-            count = 0
-            for job_spec_doc in self.job_specs.values():
-                if job_spec_name:
-                    if job_spec_name.lower() not in job_spec_doc.get("job_spec_name", "").lower():
-                        continue
-                if created_by:
-                    if job_spec_doc.get("created_by") != created_by:
-                        continue
-                count += 1
-            return count
-            
-        except Exception as e:
-            logger.error(f"Mock count job specs error: {e}")
-            raise
+        return self.job_specs.count({"created_by": created_by}, predicate=_contains("job_spec_name", job_spec_name))
     
     async def update_job_spec(self, job_spec_id: str, update_data: Dict[str, Any]) -> bool:
         """Mock update job spec"""
         try:
-            if job_spec_id in self.job_specs:
-                self.job_specs[job_spec_id].update(update_data)
-                self.job_specs[job_spec_id]["updated_at"] = datetime.utcnow()
-                logger.info(f"Mock update job spec: {job_spec_id}")
+            if self.job_specs.update(job_spec_id, {**update_data, "updated_at": datetime.utcnow()}):
+                logger.info("Mock update job spec: %s", job_spec_id)
                 return True
             return False
-            
+        
+        except KeyError:
+            raise JobNameExistsError(update_data.get("job_spec_name", ""))
         except Exception as e:
-            logger.error(f"Mock update job spec error: {e}")
+            logger.error("Mock update job spec error: %s", e)
             raise
     
     async def delete_job_spec(self, job_spec_id: str) -> bool:
         """Mock delete job spec"""
-        try:
-            if job_spec_id in self.job_specs:
-                del self.job_specs[job_spec_id]
-                logger.info(f"Mock delete job spec: {job_spec_id}")
-                return True
-            return False
-            
-        except Exception as e:
-            logger.error(f"Mock delete job spec error: {e}")
-            raise
+        if self.job_specs.delete(job_spec_id):
+            logger.info("Mock delete job spec: %s", job_spec_id)
+            return True
+        return False
     
     # Execution operations
     async def create_execution(self, execution: Any) -> str:
@@ -350,96 +639,72 @@ class MockMongoService:
             execution_id = self._generate_id()
             execution_dict = execution.dict(by_alias=True, exclude={"id"})
             execution_dict["_id"] = execution_id
-            self.executions[execution_id] = execution_dict
+            self.executions.insert(execution_dict)
             
-            logger.info(f"Mock create execution: {execution_id}")
+            logger.info("Mock create execution: %s", execution_id)
             return execution_id
-            
+        
         except Exception as e:
-            logger.error(f"Mock create execution error: {e}")
+            logger.error("Mock create execution error: %s", e)
             raise
     
     async def get_execution_by_id(self, execution_id: str) -> Optional[Any]:
         """Mock get execution by ID"""
-        try:
-            if execution_id in self.executions:
-                execution_doc = self.executions[execution_id].copy()
-                execution_doc["id"] = execution_doc["_id"]
-                return execution_doc
-            return None
-            
-        except Exception as e:
-            logger.error(f"Mock get execution error: {e}")
-            raise
+        return self.executions.get(execution_id)
+    
+    async def get_executions_by_ids(self, execution_ids: List[str]) -> List[Any]:
+        """Mock lấy nhiều execution theo ID"""
+        return [doc for doc in map(self.executions.get, execution_ids) if doc is not None]
     
     async def list_executions(self, skip: int = 0, limit: int = 20, 
                             job_spec_id: Optional[str] = None,
                             status: Optional[str] = None,
                             started_by: Optional[str] = None,
-                            sort_by: str = "created_at", sort_order: int = -1) -> List[Any]:
+                            sort_by: str = "started_at", sort_order: int = -1,
+                            after: Optional[tuple] = None) -> List[Any]:
         """Mock list executions"""
         try:
-            executions = []
-            for execution_id, execution_doc in self.executions.items():
-                if job_spec_id:
-                    if execution_doc.get("job_spec_id") != job_spec_id:
-                        continue
-                if status:
-                    if execution_doc.get("status") != status:
-                        continue
-                if started_by:
-                    if execution_doc.get("started_by") != started_by:
-                        continue
-                
-                execution_doc = execution_doc.copy()
-                execution_doc["id"] = execution_doc["_id"]
-                executions.append(execution_doc)
-            
-            # Simple sorting
-            if sort_by in ["created_at", "updated_at", "started_at"]:
-                executions.sort(key=lambda x: x.get(sort_by, ""), reverse=(sort_order == -1))
-            
-            return executions[skip:skip + limit]
-            
+            return self.executions.find(
+                {"job_spec_id": job_spec_id, "status": status, "started_by": started_by},
+                sort_by=sort_by, sort_order=sort_order, skip=skip, limit=limit, after=after
+            )
+        
         except Exception as e:
-            logger.error(f"Mock list executions error: {e}")
+            logger.error("Mock list executions error: %s", e)
             raise
     
     async def count_executions(self, job_spec_id: Optional[str] = None, 
                              status: Optional[str] = None, started_by: Optional[str] = None) -> int:
         """Mock count executions"""
-        try:
-            count = 0
-            for execution_doc in self.executions.values():
-                if job_spec_id:
-                    if execution_doc.get("job_spec_id") != job_spec_id:
-                        continue
-                if status:
-                    if execution_doc.get("status") != status:
-                        continue
-                if started_by:
-                    if execution_doc.get("started_by") != started_by:
-                        continue
-                count += 1
-            return count
-            
-        except Exception as e:
-            logger.error(f"Mock count executions error: {e}")
-            raise
+        return self.executions.count({"job_spec_id": job_spec_id, "status": status, "started_by": started_by})
     
     async def update_execution(self, execution_id: str, update_data: Dict[str, Any]) -> bool:
         """Mock update execution"""
-        try:
-            if execution_id in self.executions:
-                self.executions[execution_id].update(update_data)
-                self.executions[execution_id]["updated_at"] = datetime.utcnow()
-                logger.info(f"Mock update execution: {execution_id}")
-                return True
-            return False
-            
-        except Exception as e:
-            logger.error(f"Mock update execution error: {e}")
-            raise
+        if self.executions.update(execution_id, update_data):
+            logger.info("Mock update execution: %s", execution_id)
+            return True
+        return False
+    
+    async def list_active_executions(self, statuses: List[str]) -> List[Any]:
+        """Mock lấy các execution đang ở một trong các trạng thái (có flink_job_id)"""
+        executions = []
+        for status in statuses:
+            executions.extend(self.executions.find({"status": status}, predicate=lambda doc: bool(doc.get("flink_job_id"))))
+        return executions
+    
+    async def bulk_update_executions(self, updates: List[tuple]) -> List[str]:
+        """Mock cập nhật nhiều execution; chỉ áp dụng khi trạng thái hiện tại còn đúng như expected"""
+        applied = []
+        for execution_id, expected_status, update_data in updates:
+            doc = self.executions.docs.get(execution_id)
+            if doc is not None and InMemoryCollection._key(doc.get("status")) == InMemoryCollection._key(expected_status):
+                self.executions.update(execution_id, update_data)
+                applied.append(execution_id)
+        return applied
+    
+    async def create_execution_histories(self, histories: List[Any]) -> List[str]:
+        """Mock ghi nhiều execution history"""
+        return [await self.create_execution_history(history) for history in histories]
     
     async def create_execution_history(self, history: Any) -> str:
         """Mock create execution history"""
@@ -447,32 +712,19 @@ class MockMongoService:
             history_id = self._generate_id()
             history_dict = history.dict(by_alias=True, exclude={"id"})
             history_dict["_id"] = history_id
-            self.execution_history[history_id] = history_dict
+            self.execution_history.insert(history_dict)
             
-            logger.info(f"Mock create execution history: {history_id}")
+            logger.info("Mock create execution history: %s", history_id)
             return history_id
-            
+        
         except Exception as e:
-            logger.error(f"Mock create execution history error: {e}")
+            logger.error("Mock create execution history error: %s", e)
             raise
     
     async def get_execution_history(self, execution_id: str) -> List[Any]:
         """Mock get execution history"""
-        try:
-            history = []
-            for history_id, history_doc in self.execution_history.items():
-                if history_doc.get("execution_id") == execution_id:
-                    history_doc = history_doc.copy()
-                    history_doc["id"] = history_doc["_id"]
-                    history.append(history_doc)
-            
-            # Sort by performed_at desc
-            history.sort(key=lambda x: x.get("performed_at", ""), reverse=True)
-            return history
-            
-        except Exception as e:
-            logger.error(f"Mock get execution history error: {e}")
-            raise
+        # Sort by performed_at desc
+        return self.execution_history.find({"execution_id": execution_id}, sort_by="performed_at", sort_order=-1)
 
 
 # Mock instances
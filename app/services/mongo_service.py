@@ -1,30 +1,108 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from app.core.database import get_database
-from app.models.artifact import Artifact, ArtifactMetadata
-from app.core.exceptions import ArtifactNotFoundError, ArtifactVersionExistsError
+from app.models.artifact import Artifact, ArtifactMetadata, BlobState
+from app.models.job_config import JobSpec, Execution, ExecutionHistory
+from app.core.exceptions import ArtifactNotFoundError, ArtifactVersionExistsError, JobNameExistsError, InvalidCursorError
+from app.core.metrics import instrument_dependency
+from app.config import settings
 from app.services.mock_services import mock_mongo_service
-from typing import List, Optional, Dict, Any
-from bson import ObjectId
+from app.utils.cache import TTLCache
+from app.utils.search import tokenize_query, artifact_search_fields, artifact_search_tokens, score_fields
+from app.utils.semver import VersionRange, safe_version_key
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
+from datetime import datetime
+import functools
+import heapq
 import logging
+import re
+import uuid
+
+if TYPE_CHECKING:
+    from bson import ObjectId
+    from motor.motor_asyncio import AsyncIOMotorDatabase
 
 logger = logging.getLogger(__name__)
 
 
+def to_object_id(value: str) -> Optional["ObjectId"]:
+    """Chuyển ID dạng string sang ObjectId (None nếu không hợp lệ)"""
+    # bson / pymongo / motor chỉ được import khi dùng backend MongoDB
+    from bson import ObjectId
+    return ObjectId(value) if ObjectId.is_valid(value) else None
+
+
+def keyset_filter(filter_dict: Dict[str, Any], sort_by: str, sort_order: int,
+                  after: Optional[Tuple[Any, str]]) -> Dict[str, Any]:
+    """
+    Thêm điều kiện keyset pagination: chỉ lấy các document đứng sau (sort_value, _id)
+    theo thứ tự sắp xếp. null đứng trước mọi giá trị trong thứ tự của MongoDB
+    """
+    if after is None:
+        return filter_dict
+    
+    sort_value, last_id = after
+    object_id = to_object_id(last_id)
+    if object_id is None:
+        raise InvalidCursorError(last_id)
+    
+    op = "$lt" if sort_order == -1 else "$gt"
+    if sort_value is None:
+        conditions = [{sort_by: None, "_id": {op: object_id}}]
+        if sort_order != -1:
+            conditions.append({sort_by: {"$ne": None}})
+    else:
+        conditions = [{sort_by: {op: sort_value}}, {sort_by: sort_value, "_id": {op: object_id}}]
+        if sort_order == -1:
+            conditions.append({sort_by: None})
+    
+    return {"$and": [filter_dict, {"$or": conditions}]} if filter_dict else {"$or": conditions}
+
+
+def version_key_filter(version_range: Optional[VersionRange]) -> Optional[Dict[str, str]]:
+    """Điều kiện trên version_key tương ứng với khoảng version (None nếu không giới hạn)"""
+    if version_range is None:
+        return None
+    lower, upper = version_range.key_bounds()
+    condition = {}
+    if lower is not None:
+        condition["$gte"] = lower
+    if upper is not None:
+        condition["$lt"] = upper
+    return condition or None
+
+
+def tracks_writes(collection: str):
+    """Decorator cho các thao tác ghi: tăng revision và xóa count đã cache của collection sau khi ghi"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await func(self, *args, **kwargs)
+            finally:
+                self._revisions[collection] = self._revisions.get(collection, 0) + 1
+                self.count_cache.invalidate(collection)
+        return wrapper
+    return decorator
+
+
+@instrument_dependency("mongo", exclude=("collection_version",))
 class MongoService:
     """Service để tương tác với MongoDB"""
     
     def __init__(self):
-        self.use_mock = True  # Sử dụng mock service
-        self.db: Optional[AsyncIOMotorDatabase] = None
-        
-        if not self.use_mock:
-            try:
-                self.db = get_database()
-            except Exception as e:
-                logger.warning(f"MongoDB connection failed, using mock: {e}")
-                self.use_mock = True
+        # Backend được chọn bằng config; kết nối thực tế được tạo lúc startup
+        self.use_mock = settings.database_backend != "mongo"
+        # Cache count theo filter để các dashboard poll liên tục không scan collection mỗi request
+        self.count_cache = TTLCache(settings.count_cache_ttl_seconds, settings.count_cache_max_entries)
+        # Revision của từng collection, tăng sau mỗi thao tác ghi qua service này
+        self._epoch = uuid.uuid4().hex[:8]
+        self._revisions: Dict[str, int] = {}
+    
+    @property
+    def db(self) -> Optional["AsyncIOMotorDatabase"]:
+        return get_database()
     
     # Artifact operations
+    @tracks_writes("artifacts")
     async def create_artifact(self, artifact: Artifact) -> str:
         """Tạo artifact mới"""
         if self.use_mock:
@@ -42,39 +120,47 @@ class MongoService:
             
             # Chuyển đổi model thành dict
             artifact_dict = artifact.dict(by_alias=True, exclude={"id"})
+            artifact_dict["search_tokens"] = artifact_search_tokens(artifact_dict)
+            artifact_dict["version_key"] = safe_version_key(artifact.version)
             
             # Insert vào database
             result = await self.db.artifacts.insert_one(artifact_dict)
             
-            logger.info(f"Đã tạo artifact: {artifact.artifact_name} v{artifact.version}")
+            logger.info("Đã tạo artifact: %s v%s", artifact.artifact_name, artifact.version)
             return str(result.inserted_id)
-            
+        
         except ArtifactVersionExistsError:
             raise
         except Exception as e:
-            logger.error(f"Lỗi tạo artifact: {e}")
+            logger.error("Lỗi tạo artifact: %s", e)
             raise
     
     async def get_artifact_by_id(self, artifact_id: str) -> Optional[Artifact]:
         """Lấy artifact theo ID"""
         if self.use_mock:
-            return await mock_mongo_service.get_artifact_by_id(artifact_id)
+            artifact_doc = await mock_mongo_service.get_artifact_by_id(artifact_id)
+            return Artifact(**artifact_doc) if artifact_doc else None
         
         try:
-            artifact_doc = await self.db.artifacts.find_one({"_id": ObjectId(artifact_id)})
+            object_id = to_object_id(artifact_id)
+            if object_id is None:
+                return None
+            
+            artifact_doc = await self.db.artifacts.find_one({"_id": object_id})
             if artifact_doc:
-                artifact_doc["id"] = str(artifact_doc["_id"])
+                artifact_doc["_id"] = str(artifact_doc["_id"])
                 return Artifact(**artifact_doc)
             return None
-            
+        
         except Exception as e:
-            logger.error(f"Lỗi lấy artifact: {e}")
+            logger.error("Lỗi lấy artifact: %s", e)
             raise
     
     async def get_artifact_by_name_version(self, artifact_name: str, version: str) -> Optional[Artifact]:
         """Lấy artifact theo tên và phiên bản"""
         if self.use_mock:
-            return await mock_mongo_service.get_artifact_by_name_version(artifact_name, version)
+            artifact_doc = await mock_mongo_service.get_artifact_by_name_version(artifact_name, version)
+            return Artifact(**artifact_doc) if artifact_doc else None
         
         try:
             artifact_doc = await self.db.artifacts.find_one({
@@ -82,120 +168,700 @@ class MongoService:
                 "version": version
             })
             if artifact_doc:
-                artifact_doc["id"] = str(artifact_doc["_id"])
+                artifact_doc["_id"] = str(artifact_doc["_id"])
                 return Artifact(**artifact_doc)
             return None
-            
+        
         except Exception as e:
-            logger.error(f"Lỗi lấy artifact: {e}")
+            logger.error("Lỗi lấy artifact: %s", e)
             raise
     
+    @staticmethod
+    def _artifact_filter(artifact_name: Optional[str]) -> Dict[str, Any]:
+        """
+        Lọc theo tiền tố tên artifact (phân biệt hoa thường): regex neo ở đầu chuỗi và đã
+        escape nên MongoDB dùng được index artifact_name (tìm gần đúng dùng search_artifacts)
+        """
+        if not artifact_name:
+            return {}
+        return {"artifact_name": {"$regex": "^" + re.escape(artifact_name)}}
+    
     async def list_artifacts(self, skip: int = 0, limit: int = 20, 
                            artifact_name: Optional[str] = None,
-                           sort_by: str = "created_at", sort_order: int = -1) -> List[Artifact]:
+                           sort_by: str = "created_at", sort_order: int = -1,
+                           after: Optional[Tuple[Any, str]] = None) -> List[Artifact]:
         """Lấy danh sách artifacts"""
         if self.use_mock:
-            return await mock_mongo_service.list_artifacts(skip, limit, artifact_name, sort_by, sort_order)
+            artifact_docs = await mock_mongo_service.list_artifacts(skip, limit, artifact_name, sort_by, sort_order, after)
+            return [Artifact(**doc) for doc in artifact_docs]
         
         try:
-            filter_dict = {}
-            if artifact_name:
-                filter_dict["artifact_name"] = {"$regex": artifact_name, "$options": "i"}
+            filter_dict = self._artifact_filter(artifact_name)
             
-            cursor = self.db.artifacts.find(filter_dict).sort(sort_by, sort_order).skip(skip).limit(limit)
+            cursor = self.db.artifacts.find(keyset_filter(filter_dict, sort_by, sort_order, after))\
+                .sort([(sort_by, sort_order), ("_id", sort_order)]).skip(skip).limit(limit)
             artifacts = []
             
             async for doc in cursor:
-                doc["id"] = str(doc["_id"])
+                doc["_id"] = str(doc["_id"])
                 artifacts.append(Artifact(**doc))
             
             return artifacts
-            
+        
         except Exception as e:
-            logger.error(f"Lỗi lấy danh sách artifacts: {e}")
+            logger.error("Lỗi lấy danh sách artifacts: %s", e)
             raise
     
-    async def count_artifacts(self, artifact_name: Optional[str] = None) -> int:
-        """Đếm số lượng artifacts"""
+    def collection_version(self, collection: str) -> str:
+        """
+        Version của collection, thay đổi sau mỗi thao tác ghi (dùng làm ETag cho các list)
+        Revision nằm trong memory của process nên chỉ phản ánh các thao tác ghi đi qua process này
+        """
+        return f"{self._epoch}.{self._revisions.get(collection, 0)}"
+    
+    async def _cached_count(self, key: tuple, count_func, *args) -> int:
+        """
+        Trả về count đã cache theo filter đã chuẩn hóa, nếu hết hạn thì đếm lại
+        (kết quả đếm không được cache nếu collection bị ghi trong lúc đếm)
+        """
+        return await self.count_cache.get_or_load(key, lambda: count_func(*args))
+    
+    async def estimated_count(self, collection: str) -> int:
+        """Số document ước lượng từ metadata của collection (không scan, bỏ qua filter)"""
+        if self.use_mock:
+            return len(getattr(mock_mongo_service, collection))
+        return await self.db[collection].estimated_document_count()
+    
+    async def count_artifacts(self, artifact_name: Optional[str] = None, estimated: bool = False) -> int:
+        """Đếm số lượng artifacts (estimated chỉ áp dụng khi không có filter)"""
+        if estimated and not artifact_name:
+            return await self.estimated_count("artifacts")
+        return await self._cached_count(("artifacts", artifact_name or None), self._count_artifacts, artifact_name)
+    
+    async def _count_artifacts(self, artifact_name: Optional[str]) -> int:
         if self.use_mock:
             return await mock_mongo_service.count_artifacts(artifact_name)
         
         try:
-            filter_dict = {}
-            if artifact_name:
-                filter_dict["artifact_name"] = {"$regex": artifact_name, "$options": "i"}
+            filter_dict = self._artifact_filter(artifact_name)
             
             count = await self.db.artifacts.count_documents(filter_dict)
             return count
-            
+        
         except Exception as e:
-            logger.error(f"Lỗi đếm artifacts: {e}")
+            logger.error("Lỗi đếm artifacts: %s", e)
             raise
     
+    @tracks_writes("artifacts")
     async def delete_artifact(self, artifact_id: str) -> bool:
         """Xóa artifact"""
         if self.use_mock:
             return await mock_mongo_service.delete_artifact(artifact_id)
         
         try:
-            result = await self.db.artifacts.delete_one({"_id": ObjectId(artifact_id)})
+            object_id = to_object_id(artifact_id)
+            if object_id is None:
+                return False
+            
+            result = await self.db.artifacts.delete_one({"_id": object_id})
             if result.deleted_count > 0:
-                logger.info(f"Đã xóa artifact: {artifact_id}")
+                logger.info("Đã xóa artifact: %s", artifact_id)
                 return True
             return False
-            
+        
         except Exception as e:
-            logger.error(f"Lỗi xóa artifact: {e}")
+            logger.error("Lỗi xóa artifact: %s", e)
             raise
     
-    async def get_artifact_versions(self, artifact_name: str) -> List[str]:
-        """Lấy danh sách phiên bản của artifact"""
+    def _version_query(self, artifact_name: str, version_range: Optional[VersionRange]) -> Dict[str, Any]:
+        """Điều kiện lọc các phiên bản của artifact thuộc khoảng version"""
+        query: Dict[str, Any] = {"artifact_name": artifact_name}
+        key_condition = version_key_filter(version_range)
+        if key_condition:
+            query["version_key"] = key_condition
+        return query
+    
+    async def get_artifact_versions(self, artifact_name: str,
+                                    version_range: Optional[VersionRange] = None) -> List[str]:
+        """Lấy danh sách phiên bản của artifact (mới nhất trước, theo semver)"""
         if self.use_mock:
-            return await mock_mongo_service.get_artifact_versions(artifact_name)
+            return await mock_mongo_service.get_artifact_versions(artifact_name, version_range)
         
         try:
             cursor = self.db.artifacts.find(
-                {"artifact_name": artifact_name},
+                self._version_query(artifact_name, version_range),
                 {"version": 1, "_id": 0}
-            ).sort("version", -1)
+            ).sort("version_key", -1)
             
             versions = []
             async for doc in cursor:
                 versions.append(doc["version"])
             
             return versions
+        
+        except Exception as e:
+            logger.error("Lỗi lấy phiên bản artifact: %s", e)
+            raise
+    
+    async def get_latest_artifact(self, artifact_name: str,
+                                  version_range: Optional[VersionRange] = None) -> Optional[Artifact]:
+        """Lấy phiên bản mới nhất (theo semver) của artifact, có thể giới hạn trong một khoảng version"""
+        if self.use_mock:
+            artifact_doc = await mock_mongo_service.get_latest_artifact(artifact_name, version_range)
+            return Artifact(**artifact_doc) if artifact_doc else None
+        
+        try:
+            # Index (artifact_name, version_key): chỉ cần seek tới cận trên của khoảng
+            artifact_doc = await self.db.artifacts.find_one(
+                self._version_query(artifact_name, version_range),
+                sort=[("version_key", -1)]
+            )
+            if artifact_doc:
+                artifact_doc["_id"] = str(artifact_doc["_id"])
+                return Artifact(**artifact_doc)
+            return None
+        
+        except Exception as e:
+            logger.error("Lỗi lấy phiên bản mới nhất của artifact: %s", e)
+            raise
+    
+    # Blob operations (content-addressed storage)
+    async def get_blob(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Lấy thông tin blob theo SHA256"""
+        if self.use_mock:
+            return await mock_mongo_service.get_blob(file_hash)
+        
+        try:
+            return await self.db.blobs.find_one({"_id": file_hash})
+        
+        except Exception as e:
+            logger.error("Lỗi lấy blob: %s", e)
+            raise
+    
+    async def acquire_blob(self, file_hash: str, minio_path: str, file_size: int,
+                           state: BlobState = BlobState.COMMITTED) -> Dict[str, Any]:
+        """
+        Tăng reference count của blob (tạo mới với state nếu chưa có)
+        Returns: record blob sau khi tăng (ref_count, state; record cũ không có state là committed)
+        """
+        if self.use_mock:
+            return await mock_mongo_service.acquire_blob(file_hash, minio_path, file_size, state)
+        
+        from pymongo import ReturnDocument
+        
+        try:
+            blob_doc = await self.db.blobs.find_one_and_update(
+                {"_id": file_hash},
+                {
+                    "$inc": {"ref_count": 1},
+                    "$setOnInsert": {
+                        "minio_path": minio_path,
+                        "file_size": file_size,
+                        "state": state.value,
+                        "created_at": datetime.utcnow()
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return blob_doc
+        
+        except Exception as e:
+            logger.error("Lỗi tăng reference count blob: %s", e)
+            raise
+    
+    async def commit_blob(self, file_hash: str):
+        """Đánh dấu blob đã có object ở đường dẫn blob (pending → committed)"""
+        if self.use_mock:
+            return await mock_mongo_service.commit_blob(file_hash)
+        
+        try:
+            await self.db.blobs.update_one(
+                {"_id": file_hash, "state": BlobState.PENDING.value},
+                {"$set": {"state": BlobState.COMMITTED.value}}
+            )
+        
+        except Exception as e:
+            logger.error("Lỗi commit blob: %s", e)
+            raise
+    
+    async def release_blob(self, file_hash: str) -> int:
+        """
+        Giảm reference count của blob, xóa record khi không còn version nào trỏ tới
+        Returns: reference count còn lại (0 nghĩa là có thể xóa object)
+        """
+        if self.use_mock:
+            return await mock_mongo_service.release_blob(file_hash)
+        
+        from pymongo import ReturnDocument
+        
+        try:
+            blob_doc = await self.db.blobs.find_one_and_update(
+                {"_id": file_hash},
+                {"$inc": {"ref_count": -1}},
+                return_document=ReturnDocument.AFTER
+            )
+            if not blob_doc:
+                return 0
             
+            if blob_doc["ref_count"] <= 0:
+                result = await self.db.blobs.delete_one({"_id": file_hash, "ref_count": {"$lte": 0}})
+                # Một upload khác có thể vừa tăng lại reference count
+                return 0 if result.deleted_count > 0 else 1
+            return blob_doc["ref_count"]
+        
         except Exception as e:
-            logger.error(f"Lỗi lấy phiên bản artifact: {e}")
+            logger.error("Lỗi giảm reference count blob: %s", e)
             raise
     
-    async def search_artifacts(self, query: str) -> List[Artifact]:
-        """Tìm kiếm artifacts"""
+    async def search_artifacts(self, query: str, skip: int = 0, limit: int = 20) -> Tuple[List[Artifact], int]:
+        """
+        Tìm kiếm artifacts theo token của tên, entry classes và mô tả (khớp chính xác hoặc prefix),
+        sắp xếp theo điểm liên quan rồi theo thời gian tạo
+        Returns: (artifacts của trang, tổng số kết quả)
+        """
+        query_tokens = tokenize_query(query)
+        if not query_tokens:
+            return [], 0
+        
         if self.use_mock:
-            return await mock_mongo_service.search_artifacts(query)
+            artifact_docs, total = await mock_mongo_service.search_artifacts(query_tokens, skip, limit)
+            return [Artifact(**doc) for doc in artifact_docs], total
         
         try:
-            filter_dict = {
-                "$or": [
-                    {"artifact_name": {"$regex": query, "$options": "i"}},
-                    {"metadata.description": {"$regex": query, "$options": "i"}},
-                    {"metadata.entry_classes": {"$regex": query, "$options": "i"}}
-                ]
-            }
+            min_prefix = settings.search_min_prefix_length
+            # Regex prefix có neo "^" trên multikey index search_tokens là một range scan
+            conditions = [
+                {"search_tokens": {"$regex": f"^{re.escape(token)}"}} if len(token) >= min_prefix
+                else {"search_tokens": token}
+                for token in query_tokens
+            ]
+            cursor = self.db.artifacts.find(
+                {"$and": conditions},
+                {"artifact_name": 1, "metadata.entry_classes": 1, "metadata.description": 1, "created_at": 1}
+            ).limit(settings.search_max_candidates)
             
-            cursor = self.db.artifacts.find(filter_dict).sort("created_at", -1)
-            artifacts = []
+            scored = []
+            async for doc in cursor:
+                score = score_fields(query_tokens, artifact_search_fields(doc), min_prefix)
+                scored.append((score, doc["created_at"], doc["_id"]))
+            
+            page = heapq.nlargest(skip + limit, scored)[skip:]
+            ids = [doc_id for _, _, doc_id in page]
+            docs = {}
+            async for doc in self.db.artifacts.find({"_id": {"$in": ids}}):
+                doc["_id"] = str(doc["_id"])
+                docs[doc["_id"]] = doc
+            
+            artifacts = [Artifact(**docs[str(doc_id)]) for doc_id in ids if str(doc_id) in docs]
+            return artifacts, len(scored)
+        
+        except Exception as e:
+            logger.error("Lỗi tìm kiếm artifacts: %s", e)
+            raise
+    
+    # JobSpec operations
+    @tracks_writes("job_specs")
+    async def create_job_spec(self, job_spec: JobSpec) -> str:
+        """Tạo job spec mới"""
+        if self.use_mock:
+            if await mock_mongo_service.get_job_spec_by_name(job_spec.job_spec_name):
+                raise JobNameExistsError(job_spec.job_spec_name)
+            return await mock_mongo_service.create_job_spec(job_spec)
+        
+        from pymongo.errors import DuplicateKeyError
+        
+        try:
+            job_spec_dict = job_spec.dict(by_alias=True, exclude={"id"})
+            result = await self.db.job_specs.insert_one(job_spec_dict)
+            
+            logger.info("Đã tạo job spec: %s", job_spec.job_spec_name)
+            return str(result.inserted_id)
+        
+        except DuplicateKeyError:
+            raise JobNameExistsError(job_spec.job_spec_name)
+        except Exception as e:
+            logger.error("Lỗi tạo job spec: %s", e)
+            raise
+    
+    async def get_job_spec_by_id(self, job_spec_id: str) -> Optional[JobSpec]:
+        """Lấy job spec theo ID"""
+        if self.use_mock:
+            job_spec_doc = await mock_mongo_service.get_job_spec_by_id(job_spec_id)
+            return JobSpec(**job_spec_doc) if job_spec_doc else None
+        
+        try:
+            object_id = to_object_id(job_spec_id)
+            if object_id is None:
+                return None
+            
+            job_spec_doc = await self.db.job_specs.find_one({"_id": object_id})
+            if job_spec_doc:
+                job_spec_doc["_id"] = str(job_spec_doc["_id"])
+                return JobSpec(**job_spec_doc)
+            return None
+        
+        except Exception as e:
+            logger.error("Lỗi lấy job spec: %s", e)
+            raise
+    
+    def _job_spec_filter(self, job_spec_name: Optional[str], created_by: Optional[str]) -> Dict[str, Any]:
+        filter_dict = {}
+        if job_spec_name:
+            filter_dict["job_spec_name"] = {"$regex": re.escape(job_spec_name), "$options": "i"}
+        if created_by:
+            filter_dict["created_by"] = created_by
+        return filter_dict
+    
+    async def list_job_specs(self, skip: int = 0, limit: int = 20,
+                           job_spec_name: Optional[str] = None,
+                           created_by: Optional[str] = None,
+                           sort_by: str = "created_at", sort_order: int = -1,
+                           after: Optional[Tuple[Any, str]] = None) -> List[JobSpec]:
+        """Lấy danh sách job specs"""
+        if self.use_mock:
+            job_spec_docs = await mock_mongo_service.list_job_specs(
+                skip, limit, job_spec_name, created_by, sort_by, sort_order, after
+            )
+            return [JobSpec(**doc) for doc in job_spec_docs]
+        
+        try:
+            filter_dict = self._job_spec_filter(job_spec_name, created_by)
+            cursor = self.db.job_specs.find(keyset_filter(filter_dict, sort_by, sort_order, after))\
+                .sort([(sort_by, sort_order), ("_id", sort_order)]).skip(skip).limit(limit)
+            job_specs = []
             
             async for doc in cursor:
-                doc["id"] = str(doc["_id"])
-                artifacts.append(Artifact(**doc))
+                doc["_id"] = str(doc["_id"])
+                job_specs.append(JobSpec(**doc))
             
-            return artifacts
+            return job_specs
+        
+        except Exception as e:
+            logger.error("Lỗi lấy danh sách job specs: %s", e)
+            raise
+    
+    async def count_job_specs(self, job_spec_name: Optional[str] = None, created_by: Optional[str] = None,
+                              estimated: bool = False) -> int:
+        """Đếm số lượng job specs (estimated chỉ áp dụng khi không có filter)"""
+        if estimated and not job_spec_name and not created_by:
+            return await self.estimated_count("job_specs")
+        key = ("job_specs", (job_spec_name or "").lower() or None, created_by or None)
+        return await self._cached_count(key, self._count_job_specs, job_spec_name, created_by)
+    
+    async def _count_job_specs(self, job_spec_name: Optional[str], created_by: Optional[str]) -> int:
+        if self.use_mock:
+            return await mock_mongo_service.count_job_specs(job_spec_name, created_by)
+        
+        try:
+            return await self.db.job_specs.count_documents(self._job_spec_filter(job_spec_name, created_by))
+        
+        except Exception as e:
+            logger.error("Lỗi đếm job specs: %s", e)
+            raise
+    
+    @tracks_writes("job_specs")
+    async def update_job_spec(self, job_spec_id: str, update_data: Dict[str, Any]) -> bool:
+        """Cập nhật job spec"""
+        if self.use_mock:
+            return await mock_mongo_service.update_job_spec(job_spec_id, update_data)
+        
+        from pymongo.errors import DuplicateKeyError
+        
+        try:
+            object_id = to_object_id(job_spec_id)
+            if object_id is None:
+                return False
             
+            update_data = {**update_data, "updated_at": datetime.utcnow()}
+            result = await self.db.job_specs.update_one({"_id": object_id}, {"$set": update_data})
+            return result.matched_count > 0
+        
+        except DuplicateKeyError:
+            raise JobNameExistsError(update_data.get("job_spec_name", ""))
         except Exception as e:
-            logger.error(f"Lỗi tìm kiếm artifacts: {e}")
+            logger.error("Lỗi cập nhật job spec: %s", e)
+            raise
+    
+    @tracks_writes("job_specs")
+    async def delete_job_spec(self, job_spec_id: str) -> bool:
+        """Xóa job spec"""
+        if self.use_mock:
+            return await mock_mongo_service.delete_job_spec(job_spec_id)
+        
+        try:
+            object_id = to_object_id(job_spec_id)
+            if object_id is None:
+                return False
+            
+            result = await self.db.job_specs.delete_one({"_id": object_id})
+            if result.deleted_count > 0:
+                logger.info("Đã xóa job spec: %s", job_spec_id)
+                return True
+            return False
+        
+        except Exception as e:
+            logger.error("Lỗi xóa job spec: %s", e)
+            raise
+    
+    # Execution operations
+    @tracks_writes("executions")
+    async def create_execution(self, execution: Execution) -> str:
+        """Tạo execution mới"""
+        if self.use_mock:
+            return await mock_mongo_service.create_execution(execution)
+        
+        try:
+            execution_dict = execution.dict(by_alias=True, exclude={"id"})
+            result = await self.db.executions.insert_one(execution_dict)
+            return str(result.inserted_id)
+        
+        except Exception as e:
+            logger.error("Lỗi tạo execution: %s", e)
+            raise
+    
+    async def get_execution_by_id(self, execution_id: str) -> Optional[Execution]:
+        """Lấy execution theo ID"""
+        if self.use_mock:
+            execution_doc = await mock_mongo_service.get_execution_by_id(execution_id)
+            return Execution(**execution_doc) if execution_doc else None
+        
+        try:
+            object_id = to_object_id(execution_id)
+            if object_id is None:
+                return None
+            
+            execution_doc = await self.db.executions.find_one({"_id": object_id})
+            if execution_doc:
+                execution_doc["_id"] = str(execution_doc["_id"])
+                return Execution(**execution_doc)
+            return None
+        
+        except Exception as e:
+            logger.error("Lỗi lấy execution: %s", e)
+            raise
+    
+    async def get_executions_by_ids(self, execution_ids: List[str]) -> List[Execution]:
+        """Lấy nhiều execution theo ID trong một query (ID không tồn tại bị bỏ qua)"""
+        if self.use_mock:
+            execution_docs = await mock_mongo_service.get_executions_by_ids(execution_ids)
+            return [Execution(**doc) for doc in execution_docs]
+        
+        try:
+            object_ids = [object_id for object_id in map(to_object_id, execution_ids) if object_id is not None]
+            if not object_ids:
+                return []
+            
+            executions = []
+            async for doc in self.db.executions.find({"_id": {"$in": object_ids}}):
+                doc["_id"] = str(doc["_id"])
+                executions.append(Execution(**doc))
+            return executions
+        
+        except Exception as e:
+            logger.error("Lỗi lấy executions theo ID: %s", e)
+            raise
+    
+    def _execution_filter(self, job_spec_id: Optional[str], status: Optional[str],
+                          started_by: Optional[str]) -> Dict[str, Any]:
+        filter_dict = {}
+        if job_spec_id:
+            filter_dict["job_spec_id"] = job_spec_id
+        if status:
+            filter_dict["status"] = status
+        if started_by:
+            filter_dict["started_by"] = started_by
+        return filter_dict
+    
+    async def list_executions(self, skip: int = 0, limit: int = 20,
+                            job_spec_id: Optional[str] = None,
+                            status: Optional[str] = None,
+                            started_by: Optional[str] = None,
+                            sort_by: str = "started_at", sort_order: int = -1,
+                            after: Optional[Tuple[Any, str]] = None) -> List[Execution]:
+        """Lấy danh sách executions"""
+        if self.use_mock:
+            execution_docs = await mock_mongo_service.list_executions(
+                skip, limit, job_spec_id, status, started_by, sort_by, sort_order, after
+            )
+            return [Execution(**doc) for doc in execution_docs]
+        
+        try:
+            filter_dict = self._execution_filter(job_spec_id, status, started_by)
+            cursor = self.db.executions.find(keyset_filter(filter_dict, sort_by, sort_order, after))\
+                .sort([(sort_by, sort_order), ("_id", sort_order)]).skip(skip).limit(limit)
+            executions = []
+            
+            async for doc in cursor:
+                doc["_id"] = str(doc["_id"])
+                executions.append(Execution(**doc))
+            
+            return executions
+        
+        except Exception as e:
+            logger.error("Lỗi lấy danh sách executions: %s", e)
+            raise
+    
+    async def count_executions(self, job_spec_id: Optional[str] = None,
+                             status: Optional[str] = None, started_by: Optional[str] = None,
+                             estimated: bool = False) -> int:
+        """Đếm số lượng executions (estimated chỉ áp dụng khi không có filter)"""
+        if estimated and not job_spec_id and not status and not started_by:
+            return await self.estimated_count("executions")
+        status_key = getattr(status, "value", status) or None
+        key = ("executions", job_spec_id or None, status_key, started_by or None)
+        return await self._cached_count(key, self._count_executions, job_spec_id, status, started_by)
+    
+    async def _count_executions(self, job_spec_id: Optional[str], status: Optional[str],
+                                started_by: Optional[str]) -> int:
+        if self.use_mock:
+            return await mock_mongo_service.count_executions(job_spec_id, status, started_by)
+        
+        try:
+            return await self.db.executions.count_documents(
+                self._execution_filter(job_spec_id, status, started_by)
+            )
+        
+        except Exception as e:
+            logger.error("Lỗi đếm executions: %s", e)
+            raise
+    
+    @tracks_writes("executions")
+    async def update_execution(self, execution_id: str, update_data: Dict[str, Any]) -> bool:
+        """Cập nhật execution"""
+        if self.use_mock:
+            return await mock_mongo_service.update_execution(execution_id, update_data)
+        
+        try:
+            object_id = to_object_id(execution_id)
+            if object_id is None:
+                return False
+            
+            result = await self.db.executions.update_one({"_id": object_id}, {"$set": update_data})
+            return result.matched_count > 0
+        
+        except Exception as e:
+            logger.error("Lỗi cập nhật execution: %s", e)
+            raise
+    
+    async def list_active_executions(self, statuses: List[str]) -> List[Execution]:
+        """Lấy toàn bộ execution đang ở một trong các trạng thái và đã có Flink job ID"""
+        statuses = [getattr(status, "value", status) for status in statuses]
+        if self.use_mock:
+            execution_docs = await mock_mongo_service.list_active_executions(statuses)
+            return [Execution(**doc) for doc in execution_docs]
+        
+        try:
+            cursor = self.db.executions.find({"status": {"$in": statuses}, "flink_job_id": {"$ne": None}})
+            executions = []
+            
+            async for doc in cursor:
+                doc["_id"] = str(doc["_id"])
+                executions.append(Execution(**doc))
+            
+            return executions
+        
+        except Exception as e:
+            logger.error("Lỗi lấy executions đang chạy: %s", e)
+            raise
+    
+    @tracks_writes("executions")
+    async def bulk_update_executions(self, updates: List[Tuple[str, str, Dict[str, Any]]]) -> List[str]:
+        """
+        Cập nhật nhiều execution trong một lần ghi (bulk_write)
+        updates: danh sách (execution_id, trạng thái hiện tại mong đợi, dữ liệu cập nhật);
+        execution đã đổi trạng thái ở nơi khác (ví dụ API stop) sẽ không bị ghi đè
+        Returns: danh sách execution_id đã được cập nhật
+        """
+        if not updates:
+            return []
+        if self.use_mock:
+            return await mock_mongo_service.bulk_update_executions(updates)
+        
+        from pymongo import UpdateOne
+        
+        try:
+            # Mỗi lần gọi ghi một update_token riêng: execution đã được nơi khác chuyển sang
+            # cùng trạng thái đích không bị tính là update của lần gọi này
+            update_token = uuid.uuid4().hex
+            operations = []
+            for execution_id, expected_status, update_data in updates:
+                operations.append(UpdateOne(
+                    {"_id": to_object_id(execution_id), "status": getattr(expected_status, "value", expected_status)},
+                    {"$set": {**update_data, "update_token": update_token}}
+                ))
+            result = await self.db.executions.bulk_write(operations, ordered=False)
+            
+            execution_ids = [execution_id for execution_id, _, _ in updates]
+            if result.modified_count == len(updates):
+                return execution_ids
+            
+            # Một số execution đã bị đổi trạng thái trước đó: đọc lại theo update_token để biết update nào được áp dụng
+            cursor = self.db.executions.find(
+                {
+                    "_id": {"$in": [to_object_id(execution_id) for execution_id in execution_ids]},
+                    "update_token": update_token
+                },
+                {"_id": 1}
+            )
+            applied = {str(doc["_id"]) async for doc in cursor}
+            return [execution_id for execution_id in execution_ids if execution_id in applied]
+        
+        except Exception as e:
+            logger.error("Lỗi bulk update executions: %s", e)
+            raise
+    
+    # Execution history operations
+    @tracks_writes("execution_history")
+    async def create_execution_histories(self, histories: List[ExecutionHistory]) -> List[str]:
+        """Ghi nhiều execution history trong một lần insert"""
+        if not histories:
+            return []
+        if self.use_mock:
+            return await mock_mongo_service.create_execution_histories(histories)
+        
+        try:
+            result = await self.db.execution_history.insert_many(
+                [history.dict(by_alias=True, exclude={"id"}) for history in histories],
+                ordered=False
+            )
+            return [str(inserted_id) for inserted_id in result.inserted_ids]
+        
+        except Exception as e:
+            logger.error("Lỗi ghi execution history: %s", e)
+            raise
+    
+    @tracks_writes("execution_history")
+    async def create_execution_history(self, history: ExecutionHistory) -> str:
+        """Ghi lịch sử execution"""
+        if self.use_mock:
+            return await mock_mongo_service.create_execution_history(history)
+        
+        try:
+            history_dict = history.dict(by_alias=True, exclude={"id"})
+            result = await self.db.execution_history.insert_one(history_dict)
+            return str(result.inserted_id)
+        
+        except Exception as e:
+            logger.error("Lỗi ghi lịch sử execution: %s", e)
+            raise
+    
+    async def get_execution_history(self, execution_id: str) -> List[ExecutionHistory]:
+        """Lấy lịch sử execution (mới nhất trước)"""
+        if self.use_mock:
+            history_docs = await mock_mongo_service.get_execution_history(execution_id)
+            return [ExecutionHistory(**doc) for doc in history_docs]
+        
+        try:
+            cursor = self.db.execution_history.find({"execution_id": execution_id}).sort("performed_at", -1)
+            history = []
+            
+            async for doc in cursor:
+                doc["_id"] = str(doc["_id"])
+                history.append(ExecutionHistory(**doc))
+            
+            return history
+        
+        except Exception as e:
+            logger.error("Lỗi lấy lịch sử execution: %s", e)
             raise
-
-
-# Global instance
-mongo_service = MongoService()
\ No newline at end of file
@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import time
+
+
+class TTLCache:
+    """
+    Cache in-memory với thời gian sống (TTL) cho từng entry và giới hạn số entry (LRU)
+    
+    Key là tuple có phần tử đầu là namespace để có thể invalidate theo nhóm
+    (ví dụ toàn bộ count của collection artifacts khi có artifact mới)
+    """
+    
+    _MISSING = object()
+    # Giá trị lưu cho negative caching (key không tồn tại ở backing store)
+    _NONE = object()
+    
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024, negative_ttl_seconds: float = 0.0):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        # Tăng mỗi lần invalidate để giá trị load trước đó không ghi đè lên thay đổi mới
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Lấy giá trị còn hạn (default nếu không có hoặc đã hết hạn)"""
+        entry = self._entries.get(key, self._MISSING)
+        if entry is self._MISSING:
+            self._stats["misses"] += 1
+            return default
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._stats["misses"] += 1
+            return default
+        
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Lưu giá trị, evict entry ít dùng nhất khi vượt max_entries"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+    
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Read-through: trả về giá trị đã cache hoặc gọi loader rồi cache kết quả.
+        Kết quả None được cache với negative_ttl_seconds
+        """
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            generation = self._generation
+            value = await loader()
+            if generation == self._generation:
+                if value is None:
+                    self.set(key, self._NONE, self.negative_ttl_seconds)
+                else:
+                    self.set(key, value)
+            return value
+        return None if value is self._NONE else value
+    
+    def delete(self, *keys: Hashable):
+        """Xóa các key (nếu có)"""
+        for key in keys:
+            self._entries.pop(key, None)
+        self._generation += 1
+        self._stats["invalidations"] += 1
+    
+    def invalidate(self, namespace: Hashable):
+        """Xóa mọi entry có key thuộc namespace"""
+        keys = [key for key in self._entries if isinstance(key, tuple) and key and key[0] == namespace]
+        for key in keys:
+            del self._entries[key]
+        self._generation += 1
+        self._stats["invalidations"] += 1
+    
+    def clear(self):
+        self._entries.clear()
+        self._generation += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Thống kê hit/miss của cache"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else None,
+            **self._stats
+        }
@@ -1,7 +1,17 @@
+import base64
 import hashlib
+import json
 import os
-from typing import Optional
-from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from enum import Enum
+from typing import Optional, BinaryIO, Any, Dict
+from datetime import datetime, timezone
+from app.core.exceptions import InvalidCursorError
+
+try:
+    import crc32c
+except ImportError:  # Dependency tùy chọn, chỉ cần khi dùng checksum crc32c
+    crc32c = None
 
 
 def calculate_file_hash(file_path: str) -> str:
@@ -13,11 +23,245 @@ def calculate_file_hash(file_path: str) -> str:
     return sha256_hash.hexdigest()
 
 
+def calculate_stream_hash(stream: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+    """Tính hash SHA256 của stream theo từng chunk (stream được đưa về đầu sau khi đọc)"""
+    return calculate_stream_digest(stream, chunk_size).hexdigest()
+
+
+def calculate_stream_digest(stream: BinaryIO, chunk_size: int = 8 * 1024 * 1024,
+                            checksum_algorithm: Optional[str] = None) -> "StreamDigest":
+    """
+    Tính SHA256 (và checksum bổ sung nếu có) của stream theo từng chunk lớn; hashlib nhả GIL
+    khi cập nhật chunk lớn nên chạy trong thread pool không chặn event loop.
+    Stream được đưa về đầu sau khi đọc
+    """
+    digest = StreamDigest(checksum_algorithm)
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest
+
+
 def calculate_bytes_hash(data: bytes) -> str:
     """Tính hash SHA256 của bytes data"""
     return hashlib.sha256(data).hexdigest()
 
 
+def get_stream_size(stream: BinaryIO) -> int:
+    """Lấy kích thước của stream có thể seek mà không đọc nội dung"""
+    current = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(current)
+    return size
+
+
+class _CRC32C:
+    """CRC32C (cần package crc32c) theo dạng của hashlib"""
+    
+    def __init__(self):
+        self._value = 0
+    
+    def update(self, chunk: bytes):
+        self._value = crc32c.crc32c(chunk, self._value)
+    
+    def digest(self) -> bytes:
+        return self._value.to_bytes(4, "big")
+
+
+# Checksum bổ sung được hỗ trợ cho header toàn vẹn của S3 (Content-MD5 / x-amz-checksum-crc32c)
+CHECKSUM_ALGORITHMS = {
+    "md5": hashlib.md5,
+    "crc32c": _CRC32C,
+}
+
+
+class StreamDigest:
+    """
+    SHA256 (định danh nội dung của blob) và một checksum bổ sung tùy chọn,
+    được cập nhật cùng lúc trong một lần đọc dữ liệu
+    """
+    
+    def __init__(self, checksum_algorithm: Optional[str] = None):
+        self._sha256 = hashlib.sha256()
+        self.checksum_algorithm = checksum_algorithm or None
+        self._checksum = None
+        if self.checksum_algorithm:
+            if self.checksum_algorithm not in CHECKSUM_ALGORITHMS:
+                raise ValueError(f"Checksum không được hỗ trợ: {self.checksum_algorithm}")
+            if self.checksum_algorithm == "crc32c" and crc32c is None:
+                raise ValueError("Checksum crc32c cần cài package crc32c")
+            self._checksum = CHECKSUM_ALGORITHMS[self.checksum_algorithm]()
+        self.bytes_read = 0
+    
+    def update(self, chunk: bytes):
+        self._sha256.update(chunk)
+        if self._checksum is not None:
+            self._checksum.update(chunk)
+        self.bytes_read += len(chunk)
+    
+    def hexdigest(self) -> str:
+        """SHA256 của toàn bộ dữ liệu đã đọc"""
+        return self._sha256.hexdigest()
+    
+    def object_metadata(self) -> Dict[str, str]:
+        """Metadata lưu kèm object (x-amz-meta-*): sha256 và checksum bổ sung dạng base64 như header của S3"""
+        metadata = {"sha256": self.hexdigest()}
+        if self._checksum is not None:
+            metadata[self.checksum_algorithm] = base64.b64encode(self._checksum.digest()).decode()
+        return metadata
+
+
+class HashingReader:
+    """
+    Bọc một stream nhị phân và cập nhật digest theo từng chunk được đọc,
+    để có thể tính hash trong lúc upload mà không cần đọc file hai lần
+    """
+    
+    def __init__(self, stream: BinaryIO, digest: Optional[StreamDigest] = None):
+        self._stream = stream
+        self.digest = digest or StreamDigest()
+    
+    @property
+    def bytes_read(self) -> int:
+        return self.digest.bytes_read
+    
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        if chunk:
+            self.digest.update(chunk)
+        return chunk
+    
+    def hexdigest(self) -> str:
+        """SHA256 của toàn bộ dữ liệu đã đọc"""
+        return self.digest.hexdigest()
+
+
+def parse_range_header(range_header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse HTTP Range header dạng "bytes=start-end" cho một resource có kích thước size
+    Returns: (start, end) inclusive, hoặc None nếu header không hợp lệ / multi-range
+    (khi đó trả về toàn bộ nội dung)
+    Raises: ValueError nếu range không thể đáp ứng (416)
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not ranges or "," in ranges:
+        return None
+    
+    start_str, sep, end_str = ranges.strip().partition("-")
+    if not sep or not (start_str or end_str):
+        return None
+    if not (start_str or "0").isdigit() or not (end_str or "0").isdigit():
+        return None
+    
+    if not start_str:
+        # Suffix range: n byte cuối
+        suffix_length = int(end_str)
+        if suffix_length == 0 or size == 0:
+            raise ValueError("Range không thể đáp ứng")
+        return max(size - suffix_length, 0), size - 1
+    
+    start = int(start_str)
+    end = int(end_str) if end_str else size - 1
+    if end_str and start > end:
+        return None
+    if start >= size:
+        raise ValueError("Range không thể đáp ứng")
+    
+    return start, min(end, size - 1)
+
+
+def if_range_matches(if_range: Optional[str], etag: str, last_modified: Optional[datetime]) -> bool:
+    """Kiểm tra điều kiện If-Range (so sánh strong ETag hoặc Last-Modified)"""
+    if not if_range:
+        return True
+    
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return not if_range.startswith("W/") and if_range == etag
+    
+    if last_modified is None:
+        return False
+    try:
+        if_range_date = parsedate_to_datetime(if_range)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return if_range_date == last_modified.replace(microsecond=0)
+
+
+def make_etag(*parts: Any) -> str:
+    """Tạo strong ETag từ các thành phần xác định phiên bản của resource (id, updated_at, revision...)"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """Kiểm tra If-None-Match (weak comparison theo RFC 7232: bỏ qua tiền tố W/)"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def format_http_date(value: datetime) -> str:
+    """Format datetime theo chuẩn HTTP-date (RFC 7231)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def encode_cursor(sort_by: str, sort_order: int, sort_value: Any, doc_id: str) -> str:
+    """Mã hóa vị trí (sort_value, _id) của phần tử cuối trang thành cursor opaque"""
+    if isinstance(sort_value, Enum):
+        sort_value = sort_value.value
+    payload = {"f": sort_by, "o": sort_order, "id": doc_id}
+    if isinstance(sort_value, datetime):
+        payload["dt"] = sort_value.isoformat()
+    else:
+        payload["v"] = sort_value
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: int) -> tuple[Any, str]:
+    """Giải mã cursor thành (sort_value, _id); cursor phải khớp sort_by/sort_order hiện tại"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["f"] != sort_by or payload["o"] != sort_order:
+            raise ValueError("sort mismatch")
+        sort_value = datetime.fromisoformat(payload["dt"]) if "dt" in payload else payload.get("v")
+        return sort_value, str(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorError(cursor)
+
+
+def get_sort_value(item: Any, sort_by: str) -> Any:
+    """Lấy giá trị trường sắp xếp của model (hỗ trợ đường dẫn dạng a.b)"""
+    value = item
+    for part in sort_by.split("."):
+        if value is None:
+            return None
+        value = value.get(part) if isinstance(value, dict) else getattr(value, part, None)
+    return value
+
+
+def split_page(items: list, size: int, sort_by: str, sort_order: int) -> tuple[list, Optional[str]]:
+    """
+    Cắt kết quả đã lấy dư một phần tử (limit = size + 1) thành trang hiện tại
+    và next_cursor (None nếu đã là trang cuối)
+    """
+    if len(items) <= size:
+        return items, None
+    items = items[:size]
+    last = items[-1]
+    return items, encode_cursor(sort_by, sort_order, get_sort_value(last, sort_by), last.id)
+
+
 def format_file_size(size_bytes: int) -> str:
     """Format kích thước file thành string dễ đọc"""
     if size_bytes == 0:
@@ -51,7 +295,7 @@ def validate_jar_file(file_path: str) -> bool:
                 return False
         
         return True
-        
+    
     except Exception:
         return False
 
@@ -0,0 +1,340 @@
+"""
+Đọc nội dung JAR trực tiếp từ central directory của file zip (không giải nén cả archive)
+
+Các hàm ở đây chỉ dùng thư viện chuẩn và nhận / trả dữ liệu picklable để chạy được
+trong process pool
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import struct
+import zlib
+
+MANIFEST_PATH = "META-INF/MANIFEST.MF"
+
+# Package của các thư viện thường được shade vào fat JAR: không chứa entry class của người dùng
+LIBRARY_PACKAGE_PREFIXES = (
+    "org/apache/flink/", "org/apache/kafka/", "org/apache/hadoop/", "org/apache/commons/",
+    "org/apache/logging/", "org/apache/avro/", "org/apache/parquet/", "org/apache/http/",
+    "scala/", "kotlin/", "com/google/", "com/fasterxml/", "com/esotericsoftware/",
+    "org/slf4j/", "ch/qos/", "io/netty/", "javax/", "jakarta/", "org/codehaus/",
+    "org/objenesis/", "org/xerial/", "org/yaml/", "org/json/", "shaded/", "META-INF/",
+)
+
+# Class tham chiếu tới các API này được coi là Flink program
+FLINK_ENTRY_REFERENCES = (
+    b"org/apache/flink/streaming/api/environment/StreamExecutionEnvironment",
+    b"org/apache/flink/api/java/ExecutionEnvironment",
+    b"org/apache/flink/table/api/TableEnvironment",
+    b"org/apache/flink/table/api/bridge/java/StreamTableEnvironment",
+)
+
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_ZIP64_EOCD = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_CENTRAL_HEADER_SIGNATURE = b"PK\x01\x02"
+# Chỉ signature, flags và độ dài tên / extra / comment của central directory header
+_CENTRAL_HEADER_LENGTHS = struct.Struct("<4s4xH18xHHH12x")
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_MAX_COMMENT = 0xFFFF
+
+_SKIPPED_CLASS_FILES = (b"module-info.class", b"package-info.class")
+
+_MAIN_NAME = b"main"
+_MAIN_DESCRIPTOR = b"([Ljava/lang/String;)V"
+_ACC_PUBLIC_STATIC = 0x0001 | 0x0008
+
+# Số byte của từng loại constant pool entry (không tính tag); Utf8 (1) có độ dài thay đổi
+_CONSTANT_SIZES = {3: 4, 4: 4, 5: 8, 6: 8, 7: 2, 8: 2, 9: 4, 10: 4, 11: 4, 12: 4,
+                   15: 3, 16: 2, 17: 4, 18: 4, 19: 2, 20: 2}
+
+
+class JarEntry(NamedTuple):
+    """Một entry trong central directory"""
+    name: str
+    method: int
+    compressed_size: int
+    header_offset: int
+
+
+class JarIndex(NamedTuple):
+    """Kết quả đọc central directory"""
+    candidates: List[JarEntry]
+    class_count: int
+    missing_classes: List[str]
+    truncated: bool
+
+
+def locate_central_directory(view) -> Tuple[int, int, int]:
+    """
+    Tìm central directory từ end-of-central-directory record (hỗ trợ zip64)
+    
+    Trả về (offset, size, độ lệch của archive trong file) - độ lệch khác 0 khi có
+    dữ liệu được ghép trước archive
+    """
+    size = len(view)
+    tail_start = max(0, size - _EOCD.size - _MAX_COMMENT)
+    eocd_pos = bytes(view[tail_start:]).rfind(_EOCD_SIGNATURE)
+    if eocd_pos < 0:
+        raise ValueError("File không phải JAR/ZIP hợp lệ (không tìm thấy central directory)")
+    eocd_pos += tail_start
+    _, _, _, _, _, cd_size, cd_offset, _ = _EOCD.unpack_from(view, eocd_pos)
+    
+    locator_pos = eocd_pos - _ZIP64_LOCATOR.size
+    if locator_pos >= 0 and bytes(view[locator_pos:locator_pos + 4]) == _ZIP64_LOCATOR_SIGNATURE:
+        record_pos = locator_pos - _ZIP64_EOCD.size
+        if bytes(view[record_pos:record_pos + 4]) != _ZIP64_EOCD_SIGNATURE:
+            raise ValueError("Zip64 end-of-central-directory không hợp lệ")
+        fields = _ZIP64_EOCD.unpack_from(view, record_pos)
+        cd_size, cd_offset = fields[8], fields[9]
+        concat = record_pos - cd_size - cd_offset
+    else:
+        concat = eocd_pos - cd_size - cd_offset
+    
+    if concat < 0 or cd_offset + concat + cd_size > size:
+        raise ValueError("Central directory nằm ngoài file")
+    return cd_offset + concat, cd_size, concat
+
+
+def _zip64_values(extra: bytes, compressed_size: int, header_offset: int, uncompressed_size: int) -> Tuple[int, int]:
+    """Đọc kích thước / offset thật từ zip64 extra field (chỉ các giá trị bị đánh dấu 0xFFFFFFFF)"""
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, data_size = struct.unpack_from("<2H", extra, pos)
+        if header_id == 0x0001:
+            values = iter(struct.unpack_from(f"<{data_size // 8}Q", extra, pos + 4))
+            if uncompressed_size == 0xFFFFFFFF:
+                next(values, None)
+            if compressed_size == 0xFFFFFFFF:
+                compressed_size = next(values, compressed_size)
+            if header_offset == 0xFFFFFFFF:
+                header_offset = next(values, header_offset)
+            break
+        pos += 4 + data_size
+    return compressed_size, header_offset
+
+
+def class_name(path: str) -> str:
+    """com/example/Job.class -> com.example.Job"""
+    return path[:-len(".class")].replace("/", ".")
+
+
+def class_path(name: str) -> str:
+    """com.example.Job -> com/example/Job.class"""
+    return name.replace(".", "/") + ".class"
+
+
+def _read_central_header(directory: bytes, pos: int, concat: int) -> Tuple[JarEntry, int, int]:
+    """Đọc một central directory header tại pos: trả về (entry, flags, vị trí header tiếp theo)"""
+    (signature, _, _, flags, method, _, _, _, compressed_size, uncompressed_size,
+     name_len, extra_len, comment_len, _, _, _, header_offset) = _CENTRAL_HEADER.unpack_from(directory, pos)
+    if signature != _CENTRAL_HEADER_SIGNATURE:
+        raise ValueError("Central directory bị hỏng")
+    name_start = pos + _CENTRAL_HEADER.size
+    name_end = name_start + name_len
+    if compressed_size == 0xFFFFFFFF or header_offset == 0xFFFFFFFF:
+        extra = directory[name_end:name_end + extra_len]
+        compressed_size, header_offset = _zip64_values(extra, compressed_size, header_offset, uncompressed_size)
+    name = directory[name_start:name_end].decode("utf-8" if flags & 0x800 else "cp437")
+    entry = JarEntry(name, method, compressed_size, header_offset + concat)
+    return entry, flags, name_end + extra_len + comment_len
+
+
+def find_manifest(directory: bytes, concat: int) -> Optional[JarEntry]:
+    """Tìm entry META-INF/MANIFEST.MF bằng tìm kiếm byte thay vì duyệt toàn bộ central directory"""
+    needle = MANIFEST_PATH.encode()
+    pos = directory.find(needle)
+    while pos >= 0:
+        header_pos = pos - _CENTRAL_HEADER.size
+        if header_pos >= 0 and directory[header_pos:header_pos + 4] == _CENTRAL_HEADER_SIGNATURE:
+            entry, _, _ = _read_central_header(directory, header_pos, concat)
+            if entry.name == MANIFEST_PATH:
+                return entry
+        pos = directory.find(needle, pos + 1)
+    return None
+
+
+def read_central_directory(directory: bytes, concat: int, required_classes: Iterable[str],
+                           max_candidates: int) -> JarIndex:
+    """
+    Duyệt central directory: chọn các class có thể là entry class (bỏ qua package
+    của thư viện) và kiểm tra các class bắt buộc có trong JAR
+    
+    Fat JAR có thể có hàng trăm nghìn entry nên vòng lặp chỉ đọc các field cần để
+    nhảy tới header tiếp theo và so sánh tên ở dạng bytes; entry chỉ được parse đầy đủ
+    khi là class ứng viên
+    """
+    required = {class_path(name).encode(): name for name in required_classes}
+    found_required = set()
+    candidates: List[JarEntry] = []
+    class_count = 0
+    truncated = False
+    library_prefixes = tuple(prefix.encode() for prefix in LIBRARY_PACKAGE_PREFIXES)
+    
+    unpack = _CENTRAL_HEADER_LENGTHS.unpack_from
+    header_size = _CENTRAL_HEADER_LENGTHS.size
+    pos = 0
+    end = len(directory)
+    while pos + header_size <= end:
+        signature, flags, name_len, extra_len, comment_len = unpack(directory, pos)
+        if signature != _CENTRAL_HEADER_SIGNATURE:
+            raise ValueError("Central directory bị hỏng")
+        name = directory[pos + header_size:pos + header_size + name_len]
+        entry_pos = pos
+        pos += header_size + name_len + extra_len + comment_len
+        if not name.endswith(b".class"):
+            continue
+        
+        class_count += 1
+        if name in required:
+            found_required.add(name)
+        # Entry bị mã hóa (bit 0) không đọc được
+        if flags & 0x1 or name.startswith(library_prefixes) or name.endswith(_SKIPPED_CLASS_FILES):
+            continue
+        if len(candidates) < max_candidates:
+            candidates.append(_read_central_header(directory, entry_pos, concat)[0])
+        else:
+            truncated = True
+    
+    missing = [name for path, name in required.items() if path not in found_required]
+    return JarIndex(candidates, class_count, missing, truncated)
+
+
+def read_entry_data(view, entry: JarEntry) -> bytes:
+    """Đọc dữ liệu (còn nén) của một entry qua local file header"""
+    header = _LOCAL_HEADER.unpack_from(view, entry.header_offset)
+    if header[0] != _LOCAL_HEADER_SIGNATURE:
+        raise ValueError(f"Local header của {entry.name} không hợp lệ")
+    start = entry.header_offset + _LOCAL_HEADER.size + header[9] + header[10]
+    return bytes(view[start:start + entry.compressed_size])
+
+
+def read_entries(view, entries: List[JarEntry]) -> List[Tuple[str, int, bytes]]:
+    """Đọc dữ liệu nén của các entry: (path, phương thức nén, dữ liệu)"""
+    return [(entry.name, entry.method, read_entry_data(view, entry)) for entry in entries]
+
+
+def read_directory(view) -> Tuple[bytes, int, bytes]:
+    """
+    Đọc central directory và MANIFEST.MF của JAR
+    
+    Trả về (central directory, độ lệch của archive, nội dung MANIFEST.MF đã giải nén)
+    """
+    offset, size, concat = locate_central_directory(view)
+    directory = bytes(view[offset:offset + size])
+    manifest = find_manifest(directory, concat)
+    if manifest is None:
+        raise ValueError(f"JAR không có {MANIFEST_PATH}")
+    manifest_data = decompress_entry(manifest.method, read_entry_data(view, manifest))
+    if manifest_data is None:
+        raise ValueError(f"{MANIFEST_PATH} dùng phương thức nén không được hỗ trợ")
+    return directory, concat, manifest_data
+
+
+def decompress_entry(method: int, data: bytes) -> Optional[bytes]:
+    """Giải nén dữ liệu của entry (stored / deflate); None với phương thức nén khác"""
+    if method == 0:
+        return data
+    if method == 8:
+        return zlib.decompress(data, -15)
+    return None
+
+
+def parse_manifest(data: bytes) -> Dict[str, str]:
+    """Các thuộc tính của main section trong MANIFEST.MF (đã nối các dòng tiếp nối)"""
+    attributes: Dict[str, str] = {}
+    last_key = None
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        if not line:
+            break
+        if line.startswith(" ") and last_key:
+            attributes[last_key] += line[1:]
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f"Dòng MANIFEST.MF không hợp lệ: {line[:100]}")
+        last_key = key.strip()
+        attributes[last_key] = value.strip()
+    return attributes
+
+
+def inspect_class(data: bytes) -> Tuple[bool, bool]:
+    """
+    Đọc class file: trả về (có public static void main(String[]), có tham chiếu tới Flink
+    execution / table environment)
+    """
+    if data[:4] != b"\xca\xfe\xba\xbe":
+        raise ValueError("Class file không hợp lệ")
+    
+    count = struct.unpack_from(">H", data, 8)[0]
+    utf8: Dict[int, bytes] = {}
+    uses_flink = False
+    pos = 10
+    index = 1
+    while index < count:
+        tag = data[pos]
+        if tag == 1:
+            length = struct.unpack_from(">H", data, pos + 1)[0]
+            value = data[pos + 3:pos + 3 + length]
+            utf8[index] = value
+            if not uses_flink and value.startswith(b"org/apache/flink/") and value in FLINK_ENTRY_REFERENCES:
+                uses_flink = True
+            pos += 3 + length
+        else:
+            pos += 1 + _CONSTANT_SIZES[tag]
+            # Long / Double chiếm hai slot
+            if tag in (5, 6):
+                index += 1
+        index += 1
+    
+    interfaces_count = struct.unpack_from(">H", data, pos + 6)[0]
+    pos += 8 + 2 * interfaces_count
+    
+    has_main = False
+    for is_method in (False, True):
+        member_count = struct.unpack_from(">H", data, pos)[0]
+        pos += 2
+        for _ in range(member_count):
+            access, name_index, descriptor_index, attributes_count = struct.unpack_from(">4H", data, pos)
+            pos += 8
+            for _ in range(attributes_count):
+                pos += 6 + struct.unpack_from(">L", data, pos + 2)[0]
+            if (is_method and access & _ACC_PUBLIC_STATIC == _ACC_PUBLIC_STATIC
+                    and utf8.get(name_index) == _MAIN_NAME and utf8.get(descriptor_index) == _MAIN_DESCRIPTOR):
+                has_main = True
+    return has_main, uses_flink
+
+
+def main_class_from_manifest(data: bytes) -> Optional[str]:
+    """Main-Class trong MANIFEST.MF (dạng com.example.Job), None nếu không khai báo"""
+    main_class = parse_manifest(data).get("Main-Class")
+    return main_class.replace("/", ".") if main_class else None
+
+
+def find_entry_classes(classes: List[Tuple[str, int, bytes]], main_class: Optional[str] = None) -> List[str]:
+    """
+    Các class có public static void main(String[]) trong danh sách (path, method, dữ liệu nén)
+    
+    Thứ tự: Main-Class trước, sau đó các class dùng Flink API, cuối cùng các class có main khác
+    """
+    flink_entries = []
+    other_entries = []
+    for path, method, data in classes:
+        try:
+            content = decompress_entry(method, data)
+            if content is None:
+                continue
+            has_main, uses_flink = inspect_class(content)
+        except (ValueError, KeyError, IndexError, struct.error, zlib.error):
+            # Class file hỏng / định dạng lạ không làm hỏng cả JAR
+            continue
+        if has_main:
+            (flink_entries if uses_flink else other_entries).append(class_name(path))
+    
+    entry_classes = sorted(flink_entries) + sorted(other_entries)
+    if main_class:
+        entry_classes = [main_class] + [name for name in entry_classes if name != main_class]
+    return entry_classes
@@ -0,0 +1,180 @@
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Set, Tuple
+import re
+
+# Trọng số của từng field khi tính điểm liên quan
+FIELD_WEIGHTS = {
+    "artifact_name": 3.0,
+    "entry_classes": 2.0,
+    "description": 1.0,
+}
+
+# Token khớp chính xác được điểm cao hơn token chỉ khớp prefix
+PREFIX_MATCH_FACTOR = 0.5
+
+_SPLIT_PATTERN = re.compile(r"[^0-9A-Za-z]+")
+_CAMEL_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Tách text thành các token chữ thường, không trùng lặp
+    
+    Tên dạng camelCase / PascalCase được giữ nguyên và tách thêm thành các từ:
+    "com.example.WordCountJob" -> com, example, wordcountjob, word, count, job
+    """
+    tokens: Dict[str, None] = {}
+    for word in _SPLIT_PATTERN.split(text or ""):
+        if not word:
+            continue
+        tokens[word.lower()] = None
+        parts = _CAMEL_PATTERN.findall(word)
+        if len(parts) > 1:
+            for part in parts:
+                tokens[part.lower()] = None
+    return list(tokens)
+
+
+def tokenize_query(query: str) -> List[str]:
+    """Tách query thành các token (không tách camelCase vì document đã có token ghép)"""
+    return list(dict.fromkeys(word.lower() for word in _SPLIT_PATTERN.split(query) if word))
+
+
+def artifact_search_fields(artifact: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """Token của các field được tìm kiếm trong một artifact document"""
+    metadata = artifact.get("metadata") or {}
+    return {
+        "artifact_name": set(tokenize(artifact.get("artifact_name"))),
+        "entry_classes": {token for entry_class in metadata.get("entry_classes") or [] for token in tokenize(entry_class)},
+        "description": set(tokenize(metadata.get("description"))),
+    }
+
+
+def artifact_search_tokens(artifact: Dict[str, Any]) -> List[str]:
+    """Toàn bộ token của artifact (lưu vào document để index multikey phục vụ tìm kiếm)"""
+    return sorted(set().union(*artifact_search_fields(artifact).values()))
+
+
+def score_fields(query_tokens: List[str], fields: Dict[str, Set[str]], min_prefix_length: int) -> float:
+    """
+    Điểm liên quan của document: tổng theo từng token của query, lấy field có điểm cao nhất.
+    Trả về 0 nếu có token của query không khớp (chính xác hoặc prefix) với field nào
+    """
+    total = 0.0
+    for query_token in query_tokens:
+        best = 0.0
+        for field, tokens in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            if query_token in tokens:
+                best = max(best, weight)
+            elif len(query_token) >= min_prefix_length and any(token.startswith(query_token) for token in tokens):
+                best = max(best, weight * PREFIX_MATCH_FACTOR)
+        if not best:
+            return 0.0
+        total += best
+    return total
+
+
+class InvertedIndex:
+    """
+    Inverted index in-memory: token -> {document ID: trọng số field cao nhất chứa token}
+    
+    Danh sách token được giữ có thứ tự để tìm các token theo prefix bằng bisect;
+    điểm được cộng dồn khi duyệt các posting list của token khớp nên một query
+    không phải duyệt toàn bộ document
+    """
+    
+    def __init__(self, min_prefix_length: int = 2):
+        self.min_prefix_length = min_prefix_length
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []
+        self._doc_tokens: Dict[str, Dict[str, float]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+    
+    def add(self, doc_id: str, fields: Dict[str, Set[str]]):
+        self.remove(doc_id)
+        weights: Dict[str, float] = {}
+        for field, tokens in fields.items():
+            for token in tokens:
+                weights[token] = max(weights.get(token, 0.0), FIELD_WEIGHTS[field])
+        
+        self._doc_tokens[doc_id] = weights
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._terms, token)
+            postings[doc_id] = weight
+    
+    def remove(self, doc_id: str):
+        for token in self._doc_tokens.pop(doc_id, {}):
+            postings = self._postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[token]
+                del self._terms[bisect_left(self._terms, token)]
+    
+    def _matching_terms(self, query_token: str) -> List[str]:
+        """Các token trong index bằng query_token hoặc (nếu đủ dài) bắt đầu bằng query_token"""
+        if len(query_token) < self.min_prefix_length:
+            return [query_token] if query_token in self._postings else []
+        
+        terms = []
+        for i in range(bisect_left(self._terms, query_token), len(self._terms)):
+            if not self._terms[i].startswith(query_token):
+                break
+            terms.append(self._terms[i])
+        return terms
+    
+    def _token_scores(self, query_token: str, terms: List[str]) -> Dict[str, float]:
+        """Điểm của query_token với mọi document khớp, tính từ posting list"""
+        scores: Dict[str, float] = {}
+        for term in terms:
+            factor = 1.0 if term == query_token else PREFIX_MATCH_FACTOR
+            for doc_id, weight in self._postings[term].items():
+                score = weight * factor
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+    
+    def _doc_score(self, doc_id: str, query_token: str) -> float:
+        """Điểm của query_token với một document, tính từ token của document"""
+        best = 0.0
+        allow_prefix = len(query_token) >= self.min_prefix_length
+        for token, weight in self._doc_tokens[doc_id].items():
+            if token == query_token:
+                best = max(best, weight)
+            elif allow_prefix and token.startswith(query_token):
+                best = max(best, weight * PREFIX_MATCH_FACTOR)
+        return best
+    
+    def search(self, query_tokens: List[str]) -> List[Tuple[float, str]]:
+        """Trả về (điểm, document ID) của các document khớp mọi token của query"""
+        if not query_tokens:
+            return []
+        
+        # Bắt đầu từ token có ít posting nhất; với các token còn lại, nếu số ứng viên đã nhỏ
+        # thì kiểm tra trực tiếp token của từng ứng viên thay vì duyệt posting list lớn
+        matches = []
+        for query_token in query_tokens:
+            terms = self._matching_terms(query_token)
+            matches.append((sum(len(self._postings[term]) for term in terms), query_token, terms))
+        matches.sort()
+        
+        _, query_token, terms = matches[0]
+        totals = self._token_scores(query_token, terms)
+        for postings_count, query_token, terms in matches[1:]:
+            if not totals:
+                return []
+            if len(totals) * 16 < postings_count:
+                totals = {
+                    doc_id: total + score for doc_id, total in totals.items()
+                    if (score := self._doc_score(doc_id, query_token))
+                }
+            else:
+                scores = self._token_scores(query_token, terms)
+                totals = {doc_id: total + scores[doc_id] for doc_id, total in totals.items() if doc_id in scores}
+        
+        return [(score, doc_id) for doc_id, score in totals.items()]
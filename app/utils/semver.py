@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import re
+
+from app.utils.helpers import parse_version
+
+Version = Tuple[int, int, int]
+
+# Số chữ số của mỗi thành phần trong version_key (so sánh chuỗi = so sánh số)
+KEY_COMPONENT_WIDTH = 10
+
+_COMPARATOR_PATTERN = re.compile(
+    r"^(\^|~|>=|<=|>|<|=)?v?(\d+)(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?$"
+)
+_OPERATOR_SPACE_PATTERN = re.compile(r"(>=|<=|>|<|=|\^|~)\s+")
+_WILDCARDS = {"", "*", "x", "X", "latest"}
+
+
+def format_version_key(version: Version) -> str:
+    """Khóa sắp xếp của version: các thành phần được zero-pad để thứ tự chuỗi trùng thứ tự số"""
+    return ".".join(f"{part:0{KEY_COMPONENT_WIDTH}d}" for part in version)
+
+
+def version_key(version: str) -> str:
+    """Khóa sắp xếp của version string x.y.z ("1.10.0" đứng sau "1.9.0")"""
+    return format_version_key(parse_version(version))
+
+
+def safe_version_key(version: Optional[str]) -> Optional[str]:
+    """Như version_key nhưng trả về None với version không đúng format (dữ liệu cũ)"""
+    try:
+        return version_key(version)
+    except (ValueError, AttributeError):
+        return None
+
+
+@dataclass(frozen=True)
+class VersionRange:
+    """Khoảng version [lower, upper); None nghĩa là không giới hạn phía đó"""
+    lower: Optional[Version] = None
+    upper: Optional[Version] = None
+    
+    @property
+    def is_empty(self) -> bool:
+        return self.lower is not None and self.upper is not None and self.lower >= self.upper
+    
+    def contains(self, version: str) -> bool:
+        parsed = parse_version(version)
+        return (self.lower is None or parsed >= self.lower) and (self.upper is None or parsed < self.upper)
+    
+    def key_bounds(self) -> Tuple[Optional[str], Optional[str]]:
+        """Cận dưới (bao gồm) và cận trên (không bao gồm) dạng version_key"""
+        return (
+            format_version_key(self.lower) if self.lower is not None else None,
+            format_version_key(self.upper) if self.upper is not None else None,
+        )
+    
+    def intersect(self, other: "VersionRange") -> "VersionRange":
+        lowers = [bound for bound in (self.lower, other.lower) if bound is not None]
+        uppers = [bound for bound in (self.upper, other.upper) if bound is not None]
+        return VersionRange(max(lowers) if lowers else None, min(uppers) if uppers else None)
+
+
+def _pad(parts: List[int]) -> Version:
+    return tuple(parts + [0] * (3 - len(parts)))
+
+
+def _bump(parts: List[int]) -> Version:
+    """Version nhỏ nhất lớn hơn mọi version khớp với parts ("1.4" -> 1.5.0, "1.4.2" -> 1.4.3)"""
+    bumped = parts[:-1] + [parts[-1] + 1]
+    return _pad(bumped)
+
+
+def _parse_comparator(comparator: str) -> VersionRange:
+    if comparator in _WILDCARDS:
+        return VersionRange()
+    
+    match = _COMPARATOR_PATTERN.match(comparator)
+    if not match:
+        raise ValueError(f"Điều kiện version không hợp lệ: {comparator}")
+    
+    operator = match.group(1) or "="
+    parts: List[int] = []
+    for group in match.groups()[1:]:
+        if group is None or not group.isdigit():
+            break
+        parts.append(int(group))
+    # "1.x.3" không có nghĩa: sau wildcard không được có thành phần số
+    if any(group and group.isdigit() for group in match.groups()[len(parts) + 1:]):
+        raise ValueError(f"Điều kiện version không hợp lệ: {comparator}")
+    
+    if operator == "=":
+        return VersionRange(_pad(parts), _bump(parts))
+    if operator == ">=":
+        return VersionRange(lower=_pad(parts))
+    if operator == ">":
+        return VersionRange(lower=_bump(parts))
+    if operator == "<":
+        return VersionRange(upper=_pad(parts))
+    if operator == "<=":
+        return VersionRange(upper=_bump(parts))
+    if operator == "~":
+        # ~1.4.2 -> >=1.4.2 <1.5.0; ~1 -> >=1.0.0 <2.0.0
+        return VersionRange(_pad(parts), _bump(parts[:2]))
+    
+    # ^: giữ nguyên thành phần khác 0 đầu tiên (^1.4 -> <2.0.0, ^0.4 -> <0.5.0, ^0.0.3 -> <0.0.4)
+    for i, part in enumerate(parts):
+        if part != 0 or i == len(parts) - 1:
+            return VersionRange(_pad(parts), _bump(parts[:i + 1]))
+
+
+def parse_version_range(spec: str) -> VersionRange:
+    """
+    Parse điều kiện version kiểu npm/cargo thành một khoảng version
+    
+    Hỗ trợ "1.2.3", "1.4" / "1.4.x", "^1.4", "~1.4.2", ">=2.0", ">1", "<3", "<=2.1", "*";
+    nhiều điều kiện cách nhau bằng dấu phẩy hoặc khoảng trắng được AND với nhau (">=2.0,<3")
+    """
+    normalized = _OPERATOR_SPACE_PATTERN.sub(r"\1", (spec or "").strip())
+    version_range = VersionRange()
+    for comparator in re.split(r"[,\s]+", normalized):
+        version_range = version_range.intersect(_parse_comparator(comparator))
+    if version_range.is_empty:
+        raise ValueError(f"Khoảng version rỗng: {spec}")
+    return version_range
@@ -0,0 +1,225 @@
+"""
+Tiện ích dùng chung cho các script benchmark
+
+Các script chạy từ thư mục gốc của repo: python -m benchmarks.<tên_script> --help
+"""
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import io
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentile (nearest-rank) của một dãy giá trị"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def rss_mb() -> float:
+    """RSS hiện tại của process (MB)"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE / (1024 * 1024)
+
+
+def quiet_logging():
+    """Tắt log INFO của ứng dụng để không ảnh hưởng kết quả đo"""
+    logging.disable(logging.WARNING)
+
+
+class Sampler:
+    """
+    Đo độ trễ event loop (thời gian một asyncio.sleep(interval) bị trễ so với dự kiến)
+    và RSS đỉnh trong lúc chạy khối async with
+    """
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.lags: List[float] = []
+        self.baseline_rss = 0.0
+        self.peak_rss = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(time.perf_counter() - started - self.interval)
+            self.peak_rss = max(self.peak_rss, rss_mb())
+    
+    async def __aenter__(self) -> "Sampler":
+        self.baseline_rss = self.peak_rss = rss_mb()
+        self._task = asyncio.create_task(self._run())
+        await asyncio.sleep(0)
+        return self
+    
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+    
+    def summary(self) -> Dict[str, float]:
+        return {
+            "lag_p50_ms": percentile(self.lags, 50) * 1000,
+            "lag_p99_ms": percentile(self.lags, 99) * 1000,
+            "lag_max_ms": max(self.lags, default=0.0) * 1000,
+            "rss_baseline_mb": self.baseline_rss,
+            "rss_peak_mb": self.peak_rss
+        }
+
+
+class SyntheticFile(io.RawIOBase):
+    """
+    File-like chỉ đọc có kích thước tùy ý mà không chiếm memory / đĩa
+    (lặp lại một block 1MB, byte đầu tiên theo seed để các file có SHA256 khác nhau)
+    """
+    
+    BLOCK = 1024 * 1024
+    
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self._pos = 0
+        block = bytearray(os.urandom(self.BLOCK))
+        block[:8] = seed.to_bytes(8, "big")
+        self._first = bytes(block)
+        block[:8] = bytes(8)
+        self._block = bytes(block)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self._pos
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+    
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        written = 0
+        while written < len(view) and self._pos < self.size:
+            block = self._first if self._pos < self.BLOCK else self._block
+            start = self._pos % self.BLOCK
+            n = min(len(view) - written, self.BLOCK - start, self.size - self._pos)
+            view[written:written + n] = block[start:start + n]
+            written += n
+            self._pos += n
+        return written
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self._pos
+        buffer = bytearray(min(size, max(self.size - self._pos, 0)))
+        return bytes(buffer[:self.readinto(buffer)])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def run_server(module: str, port: int, *args: str, timeout: float = 15.0):
+    """Chạy server benchmark (python -m <module> --port <port>) ở process riêng"""
+    process = subprocess.Popen([sys.executable, "-m", module, "--port", str(port), *args])
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"Không khởi động được {module}")
+                time.sleep(0.1)
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def use_stub_s3(port: int):
+    """Trỏ MinIOService tới server S3 giả lập (benchmarks.stub_s3)"""
+    from app.config import settings
+    
+    settings.storage_backend = "minio"
+    settings.minio_endpoint = f"127.0.0.1:{port}"
+    settings.minio_secure = False
+
+
+@asynccontextmanager
+async def running_app():
+    """Chạy lifespan của app (tạo ServiceContainer) để gọi route trực tiếp qua ASGI"""
+    from app.main import app
+    
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+async def asgi_request(app, method: str, path: str, query: str = "",
+                       headers: Iterable[Tuple[bytes, bytes]] = (), body: bytes = b"") -> Tuple[int, int]:
+    """
+    Gọi app qua ASGI trong cùng process (không qua TCP), body response không được giữ lại
+    Returns: (status code, số byte body)
+    """
+    status = 0
+    size = 0
+    disconnected = asyncio.Event()
+    request_sent = False
+    
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+    
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [(b"host", b"benchmark"), *headers],
+        "client": ("127.0.0.1", 50000), "server": ("benchmark", 80), "state": {}
+    }
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnected.set()
+    return status, size
+
+
+def print_table(rows: List[Dict[str, object]]):
+    """In kết quả dạng bảng (cột theo key của dòng đầu tiên)"""
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
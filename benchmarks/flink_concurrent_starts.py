@@ -0,0 +1,128 @@
+"""
+Benchmark: N execution start đồng thời (mặc định 200) qua FlinkRestClient dùng chung
+
+Chạy Flink REST API giả lập (benchmarks.stub_flink) ở process riêng, start N execution
+của cùng một job spec bằng ExecutionService và đếm số connection TCP mà JobManager nhận
+được. Với connection pool keep-alive, số connection không vượt quá FLINK_MAX_CONNECTIONS.
+Dòng "client per request" gửi cùng số request /jars/{id}/run, mỗi request một
+httpx.AsyncClient riêng, để so sánh.
+
+    python -m benchmarks.flink_concurrent_starts --starts 200
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+import urllib.request
+import zipfile
+
+from benchmarks.common import free_port, print_table, quiet_logging, run_server, running_app
+
+
+def stub_stats(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/-/stats") as response:
+        return json.loads(response.read())
+
+
+def small_jar() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as jar:
+        jar.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\nMain-Class: bench.Main\n")
+        jar.writestr("bench/Main.class", b"\xca\xfe\xba\xbe")
+    return buffer.getvalue()
+
+
+async def start_pooled(app, starts: int) -> str:
+    from app.schemas.artifact import ArtifactCreate, ArtifactMetadataCreate
+    from app.schemas.job_config import ExecutionCreate, JobSpecCreate
+    
+    services = app.state.services
+    data = small_jar()
+    artifact_id = await services.artifact_service.create_artifact(ArtifactCreate(metadata=ArtifactMetadataCreate(
+        artifact_name="flink-bench", version="1.0.0", entry_classes=["bench.Main"], uploaded_by="bench"
+    )), io.BytesIO(data), len(data))
+    job_spec_id = await services.job_spec_service.create_job_spec(JobSpecCreate(
+        job_spec_name="flink-bench", artifact_id=artifact_id, entry_class="bench.Main", created_by="bench"
+    ))
+    results = await asyncio.gather(*(
+        services.execution_service.start_execution(
+            job_spec_id, ExecutionCreate(job_spec_id=job_spec_id, started_by="bench")
+        )
+        for _ in range(starts)
+    ))
+    assert all(r["flink_job_id"] for r in results)
+    return next(iter((await services.flink_client.list_jars())))
+
+
+async def start_unpooled(base_url: str, jar_id: str, starts: int):
+    import httpx
+    
+    async def run_once():
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            response = await client.post(f"/jars/{jar_id}/run", json={"entryClass": "bench.Main"})
+            response.raise_for_status()
+    
+    await asyncio.gather(*(run_once() for _ in range(starts)))
+
+
+async def run(args, port: int):
+    from app.config import settings
+    
+    rows = []
+    async with running_app() as app:
+        before = stub_stats(port)
+        started = time.perf_counter()
+        jar_id = await start_pooled(app, args.starts)
+        elapsed = time.perf_counter() - started
+        after = stub_stats(port)
+        rows.append({
+            "mode": "shared pool",
+            "starts": args.starts,
+            "wall_s": elapsed,
+            "starts_per_s": args.starts / elapsed,
+            "flink_requests": after["requests"] - before["requests"],
+            "tcp_connections": after["connections"] - before["connections"]
+        })
+        client_stats = app.state.services.flink_client.get_stats()
+    
+    before = stub_stats(port)
+    started = time.perf_counter()
+    await start_unpooled(settings.flink_rest_api_url, jar_id, args.starts)
+    elapsed = time.perf_counter() - started
+    after = stub_stats(port)
+    rows.append({
+        "mode": "client per request",
+        "starts": args.starts,
+        "wall_s": elapsed,
+        "starts_per_s": args.starts / elapsed,
+        "flink_requests": after["requests"] - before["requests"],
+        "tcp_connections": after["connections"] - before["connections"]
+    })
+    
+    print(f"FLINK_MAX_CONNECTIONS={settings.flink_max_connections}, "
+          f"EXECUTION_BATCH_CONCURRENCY={settings.execution_batch_concurrency}, "
+          f"run latency của JobManager={args.run_latency}s, flink client: {client_stats}")
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--starts", type=int, default=200, help="Số execution start đồng thời")
+    parser.add_argument("--run-latency", type=float, default=0.05, help="Thời gian JobManager xử lý một lần run")
+    args = parser.parse_args()
+    
+    from app.config import settings
+    
+    quiet_logging()
+    port = free_port()
+    settings.flink_backend = "rest"
+    settings.flink_rest_api_url = f"http://127.0.0.1:{port}"
+    settings.reconcile_enabled = False
+    settings.jar_inspection_enabled = False
+    with run_server("benchmarks.stub_flink", port, "--run-latency", str(args.run_latency)):
+        asyncio.run(run(args, port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Load test: latency của /api/v1/health/live trong lúc các lời gọi MinIO bị treo
+
+Chạy server S3 giả lập (benchmarks.stub_s3) ở process riêng, bắt đầu N upload đồng thời
+rồi chặn mọi request S3 trong một khoảng thời gian. Các lời gọi SDK chạy trên executor
+của AsyncMinIOService nên event loop vẫn phục vụ health probe: p99 của các pha
+"idle", "stalled" và "uploading" phải xấp xỉ nhau.
+
+    python -m benchmarks.health_under_minio_stall --uploads 50 --stall-seconds 3
+"""
+import argparse
+import asyncio
+import time
+import urllib.request
+
+from benchmarks.common import (
+    asgi_request, free_port, percentile, print_table, quiet_logging, run_server, running_app,
+    use_stub_s3, SyntheticFile
+)
+
+LIVE_PATH = "/api/v1/health/live"
+
+
+async def probe(app, interval: float, duration: float = None, until: asyncio.Future = None) -> list:
+    """Gọi health probe liên tục (trong duration giây hoặc tới khi until xong), trả về latency (giây)"""
+    latencies = []
+    deadline = time.perf_counter() + duration if duration else float("inf")
+    while time.perf_counter() < deadline and not (until and until.done()):
+        started = time.perf_counter()
+        status, _ = await asgi_request(app, "GET", LIVE_PATH)
+        latencies.append(time.perf_counter() - started)
+        assert status == 200, status
+        await asyncio.sleep(interval)
+    return latencies
+
+
+def stub_control(port: int, action: str):
+    urllib.request.urlopen(urllib.request.Request(f"http://127.0.0.1:{port}/-/{action}", method="POST")).read()
+
+
+async def upload(artifact_service, index: int, size: int):
+    from app.schemas.artifact import ArtifactCreate, ArtifactMetadataCreate
+    
+    create = ArtifactCreate(metadata=ArtifactMetadataCreate(
+        artifact_name="stall-bench", version=f"1.0.{index}", entry_classes=["bench.Main"], uploaded_by="bench"
+    ))
+    return await artifact_service.create_artifact(create, SyntheticFile(size, seed=index), size)
+
+
+def phase_row(name: str, latencies: list) -> dict:
+    return {
+        "phase": name,
+        "probes": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000
+    }
+
+
+async def run(args, port: int):
+    from app.config import settings
+    
+    use_stub_s3(port)
+    settings.jar_inspection_enabled = False
+    
+    async with running_app() as app:
+        services = app.state.services
+        rows = [phase_row("idle", await probe(app, args.probe_interval, duration=args.phase_seconds))]
+        
+        stub_control(port, "block")
+        uploads = [
+            asyncio.create_task(upload(services.artifact_service, i, args.size_mb * 1024 * 1024))
+            for i in range(args.uploads)
+        ]
+        rows.append(phase_row("stalled", await probe(app, args.probe_interval, duration=args.stall_seconds)))
+        stalled_stats = services.async_minio_service.get_stats()
+        
+        stub_control(port, "unblock")
+        started = time.perf_counter()
+        finished = asyncio.gather(*uploads, return_exceptions=True)
+        rows.append(phase_row("uploading", await probe(app, args.probe_interval, until=finished)))
+        results = await finished
+        upload_seconds = time.perf_counter() - started
+    
+    failed = [r for r in results if isinstance(r, BaseException)]
+    print(f"{args.uploads} upload x {args.size_mb}MB, S3 bị chặn {args.stall_seconds}s; "
+          f"upload xong sau khi mở lại: {upload_seconds:.2f}s, lỗi: {len(failed)}")
+    upload_stats = stalled_stats["operations"]["upload"]
+    print(f"Lúc bị chặn: upload in_flight={upload_stats['in_flight']} waiting={upload_stats['waiting']} "
+          f"executor_queue_depth={stalled_stats['executor_queue_depth']}")
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=50, help="Số upload đồng thời")
+    parser.add_argument("--size-mb", type=int, default=16, help="Kích thước mỗi upload (MB)")
+    parser.add_argument("--stall-seconds", type=float, default=3.0, help="Thời gian chặn request S3")
+    parser.add_argument("--phase-seconds", type=float, default=2.0, help="Thời gian đo pha idle")
+    parser.add_argument("--probe-interval", type=float, default=0.002, help="Khoảng nghỉ giữa hai probe")
+    args = parser.parse_args()
+    
+    quiet_logging()
+    port = free_port()
+    with run_server("benchmarks.stub_s3", port):
+        asyncio.run(run(args, port))
+
+
+if __name__ == "__main__":
+    main()
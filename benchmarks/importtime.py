@@ -0,0 +1,109 @@
+"""
+Benchmark: thời gian import app.main (cold start), đo bằng python -X importtime
+
+Chạy `python -X importtime -c "import app.main"` nhiều lần trong process mới, lấy median
+thời gian cumulative của app.main, thời gian self theo package gốc và kiểm tra các SDK
+nặng (minio, motor, pymongo, bson, httpx, jose, passlib) không bị import khi dùng backend mock.
+
+Kết quả được so với benchmarks/importtime_baseline.json (đo trên máy tham khảo);
+--check trả exit code 1 nếu chậm hơn baseline quá --tolerance hoặc có SDK nặng bị import,
+--save-baseline ghi kết quả hiện tại làm baseline mới.
+
+    python -m benchmarks.importtime --runs 7 --check
+"""
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import print_table
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "importtime_baseline.json"
+HEAVY_MODULES = ("minio", "motor", "pymongo", "bson", "httpx", "jose", "passlib")
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_once(module: str) -> List[tuple]:
+    """Import module trong process mới. Returns: [(self_us, cumulative_us, độ sâu, tên module)]"""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            entries.append((int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return entries
+
+
+def summarize(entries: List[tuple], module: str) -> Dict[str, object]:
+    by_package: Dict[str, int] = {}
+    for self_us, _, _, name in entries:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    loaded = {name.split(".")[0] for _, _, _, name in entries}
+    return {
+        "cumulative_ms": next(cum for _, cum, depth, name in entries if name == module and depth == 0) / 1000,
+        "modules": len(entries),
+        "packages_ms": {package: us / 1000 for package, us in by_package.items()},
+        "heavy_loaded": sorted(loaded.intersection(HEAVY_MODULES))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Module được import")
+    parser.add_argument("--runs", type=int, default=7, help="Số lần import (mỗi lần một process mới)")
+    parser.add_argument("--top", type=int, default=10, help="Số package tốn thời gian nhất được in ra")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Mức chậm hơn baseline cho phép (0.2 = 20%%)")
+    parser.add_argument("--check", action="store_true", help="Exit code 1 nếu chậm hơn baseline hoặc import SDK nặng")
+    parser.add_argument("--save-baseline", action="store_true", help="Ghi kết quả hiện tại vào " + BASELINE_FILE.name)
+    args = parser.parse_args()
+    
+    # Lần đầu có thể phải đọc file từ đĩa, không tính
+    import_once(args.module)
+    runs = [summarize(import_once(args.module), args.module) for _ in range(args.runs)]
+    cumulative_ms = statistics.median(run["cumulative_ms"] for run in runs)
+    packages = {
+        package: statistics.median(run["packages_ms"].get(package, 0.0) for run in runs)
+        for package in runs[0]["packages_ms"]
+    }
+    heavy_loaded = sorted({name for run in runs for name in run["heavy_loaded"]})
+    
+    print(f"import {args.module}: median {cumulative_ms:.1f}ms cumulative "
+          f"(min {min(r['cumulative_ms'] for r in runs):.1f}, max {max(r['cumulative_ms'] for r in runs):.1f}), "
+          f"{runs[0]['modules']} module, {args.runs} lần")
+    print(f"SDK nặng đã import: {', '.join(heavy_loaded) or 'không có'}")
+    top = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    print_table([{"package": package, "self_ms": ms, "share_pct": ms / cumulative_ms * 100} for package, ms in top])
+    
+    failed = bool(heavy_loaded)
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else None
+    if baseline and baseline["module"] == args.module:
+        change = cumulative_ms / baseline["cumulative_ms"] - 1
+        print(f"baseline: {baseline['cumulative_ms']:.1f}ms ({baseline['note']}), thay đổi: {change * 100:+.1f}%")
+        failed = failed or change > args.tolerance
+    
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps({
+            "module": args.module,
+            "cumulative_ms": round(cumulative_ms, 1),
+            "python": sys.version.split()[0],
+            "note": f"median của {args.runs} lần, {os.cpu_count()} CPU"
+        }, indent=2, ensure_ascii=False) + "\n")
+        print(f"đã ghi {BASELINE_FILE.name}")
+    
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
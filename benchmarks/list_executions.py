@@ -0,0 +1,151 @@
+"""
+Benchmark: latency list / filter / count executions ở 10k, 100k và 1M dòng, mock vs MongoDB
+
+Các truy vấn đi qua MongoService (cùng đường mà ExecutionService / API dùng):
+trang đầu không filter, trang kế tiếp theo cursor (keyset), filter theo job_spec_id,
+filter theo status + started_by, và count theo status (bỏ qua count cache).
+
+Backend mongo cần một mongod local (dữ liệu được ghi vào database riêng rồi xóa khi xong):
+
+    python -m benchmarks.list_executions --rows 10000,100000,1000000
+    python -m benchmarks.list_executions --backend mock,mongo --mongodb-url mongodb://localhost:27017
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import percentile, print_table, quiet_logging
+
+STATUSES = ["created", "running", "finished", "failed", "canceled", "suspended"]
+JOB_SPECS = 1000
+USERS = 50
+BATCH = 10000
+
+
+def generate(rows: int):
+    """Sinh document execution theo batch (started_at tăng dần, phân bố đều theo job spec / user)"""
+    rng = random.Random(42)
+    base = datetime(2025, 1, 1)
+    batch = []
+    for i in range(rows):
+        batch.append({
+            "job_spec_id": f"spec-{rng.randrange(JOB_SPECS)}",
+            "flink_job_id": f"{i:032x}",
+            "status": rng.choice(STATUSES),
+            "started_by": f"user-{rng.randrange(USERS)}",
+            "started_at": base + timedelta(seconds=i),
+            "finished_at": None,
+            "error_message": None
+        })
+        if len(batch) == BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def seed_mock(rows: int):
+    from app.services.mock_services import mock_mongo_service
+    
+    mock_mongo_service.__init__()
+    doc_id = 0
+    for batch in generate(rows):
+        for doc in batch:
+            doc_id += 1
+            doc["_id"] = str(doc_id)
+            mock_mongo_service.executions.insert(doc)
+
+
+async def seed_mongo(rows: int):
+    from app.core.database import get_database
+    
+    collection = get_database().executions
+    await collection.delete_many({})
+    for batch in generate(rows):
+        await collection.insert_many(batch, ordered=False)
+
+
+async def timed(func, repeat: int) -> list:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def measure(mongo_service, backend: str, rows: int, repeat: int) -> list:
+    from app.utils.helpers import get_sort_value
+    
+    first_page = await mongo_service.list_executions(limit=20)
+    last = first_page[-1]
+    after = (get_sort_value(last, "started_at"), last.id)
+    
+    async def count_status():
+        mongo_service.count_cache.invalidate("executions")
+        return await mongo_service.count_executions(status="failed")
+    
+    queries = {
+        "page 1": lambda: mongo_service.list_executions(limit=20),
+        "page 2 (cursor)": lambda: mongo_service.list_executions(limit=20, after=after),
+        "job_spec_id": lambda: mongo_service.list_executions(limit=20, job_spec_id="spec-7"),
+        "status + started_by": lambda: mongo_service.list_executions(limit=20, status="failed", started_by="user-3"),
+        "count status": count_status,
+    }
+    rows_out = []
+    for name, query in queries.items():
+        await query()
+        latencies = await timed(query, repeat)
+        rows_out.append({
+            "backend": backend,
+            "rows": rows,
+            "query": name,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000
+        })
+    return rows_out
+
+
+async def run(args):
+    from app.config import settings
+    from app.core.database import connect_to_mongo, close_mongo_connection, get_database
+    from app.services.mongo_service import MongoService
+    
+    results = []
+    for backend in args.backend.split(","):
+        settings.database_backend = "mongo" if backend == "mongo" else "mock"
+        if backend == "mongo":
+            settings.mongodb_url = args.mongodb_url
+            settings.mongodb_database = args.mongodb_database
+            await connect_to_mongo()
+        mongo_service = MongoService()
+        try:
+            for rows in (int(r) for r in args.rows.split(",")):
+                started = time.perf_counter()
+                await (seed_mongo(rows) if backend == "mongo" else seed_mock(rows))
+                print(f"{backend}: seed {rows} execution trong {time.perf_counter() - started:.1f}s")
+                results.extend(await measure(mongo_service, backend, rows, args.repeat))
+        finally:
+            if backend == "mongo":
+                await get_database().client.drop_database(args.mongodb_database)
+                await close_mongo_connection()
+    print_table(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,100000,1000000", help="Số execution (phân cách bằng dấu phẩy)")
+    parser.add_argument("--backend", default="mock", help="mock, mongo hoặc mock,mongo")
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+    parser.add_argument("--mongodb-database", default="flink_manager_benchmark")
+    parser.add_argument("--repeat", type=int, default=50, help="Số lần lặp mỗi truy vấn")
+    args = parser.parse_args()
+    
+    quiet_logging()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
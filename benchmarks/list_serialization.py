@@ -0,0 +1,111 @@
+"""
+Microbenchmark: serialize response list artifacts theo đường cũ và đường mới ở page size 20 / 100 / 1000
+
+- old: mỗi dòng tạo ArtifactResponse(... ArtifactMetadataResponse(**metadata.dict())),
+  bọc trong BaseResponse(data=Any), rồi jsonable_encoder + JSONResponse (json.dumps)
+  như FastAPI làm với response_model=BaseResponse
+- new: dump_trusted (pydantic-core dump cả danh sách một lần, không validate lại)
+  + data_response (ORJSONResponse), như route list hiện tại
+
+    python -m benchmarks.list_serialization --sizes 20,100,1000
+"""
+from datetime import datetime, timedelta
+import argparse
+import json
+import timeit
+import warnings
+
+from benchmarks.common import print_table
+
+
+def make_artifacts(count: int) -> list:
+    from app.models.artifact import Artifact, ArtifactMetadata
+    
+    base = datetime(2025, 1, 1)
+    return [
+        Artifact(
+            _id=str(i),
+            artifact_name=f"job-{i % 50}",
+            version=f"1.{i // 50}.0",
+            metadata=ArtifactMetadata(
+                artifact_name=f"job-{i % 50}",
+                version=f"1.{i // 50}.0",
+                hash=f"{i:064x}",
+                entry_classes=["com.example.Main", "com.example.Backfill"],
+                main_class="com.example.Main",
+                uploaded_by="ci",
+                uploaded_at=base + timedelta(minutes=i),
+                file_size=300 * 1024 * 1024,
+                description="Fat JAR cho pipeline streaming"
+            ),
+            minio_path=f"blobs/sha256/{i:064x}.jar",
+            created_at=base + timedelta(minutes=i),
+            updated_at=base + timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+
+def old_path(artifacts: list) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.schemas.artifact import ArtifactMetadataResponse, ArtifactResponse
+    from app.schemas.common import BaseResponse
+    
+    rows = [
+        ArtifactResponse(
+            id=artifact.id,
+            artifact_name=artifact.artifact_name,
+            version=artifact.version,
+            metadata=ArtifactMetadataResponse(**artifact.metadata.dict()),
+            minio_path=artifact.minio_path,
+            created_at=artifact.created_at,
+            updated_at=artifact.updated_at
+        )
+        for artifact in artifacts
+    ]
+    response = BaseResponse(data={
+        "artifacts": rows, "total": len(rows), "page": 1, "size": len(rows), "next_cursor": None
+    })
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+def new_path(artifacts: list) -> bytes:
+    from app.core.responses import data_response, dump_trusted
+    from app.schemas.artifact import ArtifactResponse
+    
+    return data_response({
+        "artifacts": dump_trusted(artifacts, ArtifactResponse),
+        "total": len(artifacts), "page": 1, "size": len(artifacts), "next_cursor": None
+    }).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="20,100,1000", help="Page size (phân cách bằng dấu phẩy)")
+    parser.add_argument("--rows", type=int, default=20000, help="Tổng số dòng được serialize cho mỗi phép đo")
+    args = parser.parse_args()
+    
+    # Đường cũ gọi .dict() (deprecated ở pydantic v2) đúng như code trước đây
+    warnings.simplefilter("ignore", DeprecationWarning)
+    rows = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        artifacts = make_artifacts(size)
+        # Hai đường phải cho ra cùng một JSON
+        assert json.loads(old_path(artifacts)) == json.loads(new_path(artifacts))
+        number = max(3, args.rows // size)
+        old_ms = min(timeit.repeat(lambda: old_path(artifacts), number=number, repeat=3)) / number * 1000
+        new_ms = min(timeit.repeat(lambda: new_path(artifacts), number=number, repeat=3)) / number * 1000
+        rows.append({
+            "page_size": size,
+            "old_ms": old_ms,
+            "new_ms": new_ms,
+            "speedup": old_ms / new_ms,
+            "old_us_per_row": old_ms * 1000 / size,
+            "new_us_per_row": new_ms * 1000 / size
+        })
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
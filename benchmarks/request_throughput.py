@@ -0,0 +1,150 @@
+"""
+Benchmark: requests/s của /api/v1/health/live và của download artifact lớn, trước và sau
+khi đổi lớp log request sang ASGI middleware thuần
+
+Route được gọi trực tiếp qua ASGI trong cùng process (benchmarks.common.asgi_request),
+log được ghi ra /dev/null. Mỗi biến thể dựng lại middleware stack của app:
+
+- before: log_requests đăng ký bằng @app.middleware("http") (BaseHTTPMiddleware), như trước đây
+- after: RequestLoggingMiddleware với cấu hình hiện tại (health probe nằm trong
+  REQUEST_LOG_EXCLUDE_PATHS nên không đi qua lớp log)
+- after, no exclude: RequestLoggingMiddleware log cả health probe
+
+    python -m benchmarks.request_throughput --requests 6000 --download-mb 256
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks.common import asgi_request, print_table, running_app, SyntheticFile
+
+
+def quiet_log_output():
+    """Giữ nguyên chi phí tạo / format log record nhưng ghi ra /dev/null thay vì stderr"""
+    from app.config import settings
+    from app.core.logging_config import setup_logging
+    
+    stderr = sys.stderr
+    sys.stderr = open(os.devnull, "w")
+    try:
+        setup_logging(settings.log_level, settings.log_format, settings.log_rate_limit_per_second)
+    finally:
+        sys.stderr = stderr
+
+
+def legacy_log_requests():
+    """Middleware log request trước đây (function middleware của app.main)"""
+    import logging
+    from starlette.middleware import Middleware
+    from starlette.middleware.base import BaseHTTPMiddleware
+    
+    logger = logging.getLogger("app.main")
+    
+    async def log_requests(request, call_next):
+        start_time = time.time()
+        
+        response = await call_next(request)
+        
+        process_time = time.time() - start_time
+        logger.info(
+            f"{request.method} {request.url.path} - "
+            f"Status: {response.status_code} - "
+            f"Time: {process_time:.3f}s"
+        )
+        
+        return response
+    
+    return Middleware(BaseHTTPMiddleware, dispatch=log_requests)
+
+
+async def requests_per_second(app, path: str, total: int, concurrency: int) -> float:
+    started = time.perf_counter()
+    for _ in range(total // concurrency):
+        results = await asyncio.gather(*(asgi_request(app, "GET", path) for _ in range(concurrency)))
+        assert all(status == 200 for status, _ in results)
+    return total // concurrency * concurrency / (time.perf_counter() - started)
+
+
+async def measure(app, variant: str, args, download_path: str) -> dict:
+    live = "/api/v1/health/live"
+    for _ in range(200):
+        await asgi_request(app, "GET", live)
+    row = {"variant": variant}
+    for concurrency in (1, 50):
+        row[f"live_rps_c{concurrency}"] = await requests_per_second(app, live, args.requests, concurrency)
+    
+    await asgi_request(app, "GET", download_path)
+    started = time.perf_counter()
+    for _ in range(args.download_repeat):
+        status, size = await asgi_request(app, "GET", download_path)
+        assert status == 200 and size == args.download_mb * 1024 * 1024
+    elapsed = time.perf_counter() - started
+    row["download_rps"] = args.download_repeat / elapsed
+    row["download_mb_s"] = args.download_repeat * args.download_mb / elapsed
+    return row
+
+
+async def run(args):
+    from starlette.middleware import Middleware
+    from app.config import settings
+    from app.core.middleware import RequestLoggingMiddleware
+    from app.schemas.artifact import ArtifactCreate, ArtifactMetadataCreate
+    
+    settings.jar_inspection_enabled = False
+    variants = {
+        "before (@app.middleware)": legacy_log_requests(),
+        "after": Middleware(
+            RequestLoggingMiddleware,
+            sample_rate=settings.request_log_sample_rate,
+            exclude_paths=settings.request_log_exclude_paths,
+            slow_seconds=settings.request_log_slow_seconds
+        ),
+        "after, no exclude": Middleware(
+            RequestLoggingMiddleware,
+            sample_rate=settings.request_log_sample_rate,
+            slow_seconds=settings.request_log_slow_seconds
+        ),
+    }
+    
+    rows = []
+    async with running_app() as app:
+        size = args.download_mb * 1024 * 1024
+        artifact_id = await app.state.services.artifact_service.create_artifact(
+            ArtifactCreate(metadata=ArtifactMetadataCreate(
+                artifact_name="throughput-bench", version="1.0.0", entry_classes=["bench.Main"], uploaded_by="bench"
+            )),
+            SyntheticFile(size), size
+        )
+        download_path = f"/api/v1/artifacts/{artifact_id}/download"
+        # Vị trí của lớp log request trong middleware stack; stack được dựng lại ở request kế tiếp
+        original = list(app.user_middleware)
+        index = next(i for i, m in enumerate(original) if m.cls is RequestLoggingMiddleware)
+        try:
+            for variant, middleware in variants.items():
+                app.user_middleware[index] = middleware
+                app.middleware_stack = None
+                rows.append(await measure(app, variant, args, download_path))
+        finally:
+            app.user_middleware[:] = original
+            app.middleware_stack = None
+    
+    print(f"{args.requests} request /health/live mỗi mức concurrency, "
+          f"download {args.download_mb}MB x {args.download_repeat}, storage={settings.storage_backend}")
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=6000, help="Số request /health/live mỗi lần đo")
+    parser.add_argument("--download-mb", type=int, default=256, help="Kích thước artifact được download (MB)")
+    parser.add_argument("--download-repeat", type=int, default=4, help="Số lần download")
+    args = parser.parse_args()
+    
+    quiet_log_output()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
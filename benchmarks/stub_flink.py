@@ -0,0 +1,130 @@
+"""
+Flink REST API giả lập (JobManager) cho benchmark và test với FLINK_BACKEND=rest
+
+- Hỗ trợ các endpoint mà FlinkRestClient dùng: /jars/upload, /jars, /jars/{id}/run,
+  DELETE /jars/{id}, /jobs/{id}/stop, PATCH /jobs/{id}, /jobs/overview,
+  /jobs/{id}/exceptions và /overview
+- Nội dung JAR upload không được lưu lại; job chuyển sang FINISHED / CANCELED khi bị stop
+- --run-latency: thời gian xử lý /jars/{id}/run (mô phỏng JobManager submit job)
+- GET /-/stats trả về số request, số JAR đã upload, số job và số connection TCP đã mở
+
+Chạy riêng: python -m benchmarks.stub_flink --port 8081
+(rồi đặt FLINK_BACKEND=rest FLINK_REST_API_URL=http://127.0.0.1:8081 cho API)
+"""
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+import argparse
+import asyncio
+import time
+import uuid
+
+FINISHED_STATES = ("FINISHED", "CANCELED", "FAILED")
+
+
+class StubFlink:
+    def __init__(self, run_latency: float = 0.0):
+        self.run_latency = run_latency
+        self.jars = {}
+        self.jobs = {}
+        self.stats = {"requests": 0, "uploads": 0, "connections": 0}
+        self._clients = set()
+    
+    async def upload_jar(self, request: Request) -> Response:
+        form = await request.form()
+        jar = form["jarfile"]
+        await jar.close()
+        jar_id = f"{uuid.uuid4()}_{jar.filename}"
+        self.jars[jar_id] = jar.filename
+        self.stats["uploads"] += 1
+        return JSONResponse({"filename": f"/tmp/flink-web-upload/{jar_id}", "status": "success"})
+    
+    async def list_jars(self, request: Request) -> Response:
+        files = [{"id": jar_id, "name": name, "uploaded": 0, "entry": []} for jar_id, name in self.jars.items()]
+        return JSONResponse({"address": "http://stub-flink", "files": files})
+    
+    async def delete_jar(self, request: Request) -> Response:
+        self.jars.pop(request.path_params["jar_id"], None)
+        return JSONResponse({})
+    
+    async def run_jar(self, request: Request) -> Response:
+        if request.path_params["jar_id"] not in self.jars:
+            return JSONResponse({"errors": ["Jar file does not exist"]}, status_code=400)
+        await request.body()
+        if self.run_latency:
+            await asyncio.sleep(self.run_latency)
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = {"state": "RUNNING", "start-time": int(time.time() * 1000), "end-time": -1}
+        return JSONResponse({"jobid": job_id})
+    
+    def _finish(self, job_id: str, state: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        job["state"] = state
+        job["end-time"] = int(time.time() * 1000)
+        return True
+    
+    async def stop_job(self, request: Request) -> Response:
+        if not self._finish(request.path_params["job_id"], "FINISHED"):
+            return JSONResponse({"errors": ["Job not found"]}, status_code=404)
+        return JSONResponse({"request-id": uuid.uuid4().hex})
+    
+    async def cancel_job(self, request: Request) -> Response:
+        if not self._finish(request.path_params["job_id"], "CANCELED"):
+            return JSONResponse({"errors": ["Job not found"]}, status_code=404)
+        return JSONResponse({}, status_code=202)
+    
+    async def jobs_overview(self, request: Request) -> Response:
+        return JSONResponse({"jobs": [{"jid": job_id, **job} for job_id, job in self.jobs.items()]})
+    
+    async def job_exceptions(self, request: Request) -> Response:
+        return JSONResponse({"root-exception": None, "exceptionHistory": {"entries": []}})
+    
+    async def cluster_overview(self, request: Request) -> Response:
+        running = sum(1 for job in self.jobs.values() if job["state"] not in FINISHED_STATES)
+        return JSONResponse({"taskmanagers": 1, "slots-total": 1024, "jobs-running": running})
+    
+    async def get_stats(self, request: Request) -> Response:
+        return JSONResponse({**self.stats, "jars": len(self.jars), "jobs": len(self.jobs)})
+    
+    def asgi(self):
+        app = Starlette(routes=[
+            Route("/-/stats", self.get_stats),
+            Route("/jars/upload", self.upload_jar, methods=["POST"]),
+            Route("/jars", self.list_jars),
+            Route("/jars/{jar_id}", self.delete_jar, methods=["DELETE"]),
+            Route("/jars/{jar_id}/run", self.run_jar, methods=["POST"]),
+            Route("/jobs/overview", self.jobs_overview),
+            Route("/jobs/{job_id}", self.cancel_job, methods=["PATCH"]),
+            Route("/jobs/{job_id}/stop", self.stop_job, methods=["POST"]),
+            Route("/jobs/{job_id}/exceptions", self.job_exceptions),
+            Route("/overview", self.cluster_overview),
+        ])
+        
+        async def counting_app(scope, receive, send):
+            # Request điều khiển (/-/...) không được tính vào thống kê
+            if scope["type"] == "http" and not scope["path"].startswith("/-/"):
+                self.stats["requests"] += 1
+                if scope.get("client") not in self._clients:
+                    self._clients.add(scope.get("client"))
+                    self.stats["connections"] += 1
+            await app(scope, receive, send)
+        
+        return counting_app
+
+
+def main():
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Flink REST API giả lập")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--run-latency", type=float, default=0.05, help="Thời gian xử lý /jars/{id}/run (giây)")
+    args = parser.parse_args()
+    uvicorn.run(StubFlink(args.run_latency).asgi(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Server S3 giả lập tối giản cho benchmark / load test (MinIO SDK nói chuyện với nó như MinIO thật)
+
+- Hỗ trợ các API mà MinIOService dùng: bucket (HEAD / location / tạo), PutObject,
+  multipart upload, copy (compose một nguồn), HEAD / GET (có Range) và DELETE object
+- Nội dung object không được lưu lại (chỉ đếm byte), GET trả về byte 0 đúng kích thước:
+  memory của server không tăng theo dung lượng upload
+- POST /-/block và /-/unblock chặn / mở lại mọi request S3 để mô phỏng MinIO bị treo;
+  GET /-/stats trả về số request, số byte nhận và số connection TCP đã mở
+
+Chạy riêng: python -m benchmarks.stub_s3 --port 9100
+(rồi đặt STORAGE_BACKEND=minio MINIO_ENDPOINT=127.0.0.1:9100 cho API)
+"""
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from email.utils import formatdate
+import argparse
+import asyncio
+import hashlib
+import uuid
+
+CHUNK = 1024 * 1024
+ZEROS = bytes(CHUNK)
+
+
+class StubS3:
+    def __init__(self):
+        self.buckets = set()
+        self.objects = {}
+        self.uploads = {}
+        self.unblocked = asyncio.Event()
+        self.unblocked.set()
+        self.stats = {"requests": 0, "bytes_received": 0, "connections": 0}
+        self._clients = set()
+    
+    @staticmethod
+    def _xml(body: str, status_code: int = 200) -> Response:
+        return Response(f'<?xml version="1.0" encoding="UTF-8"?>{body}', status_code, media_type="application/xml")
+    
+    @classmethod
+    def _error(cls, code: str, status_code: int) -> Response:
+        return cls._xml(f"<Error><Code>{code}</Code><Message>{code}</Message></Error>", status_code)
+    
+    async def _drain(self, request: Request) -> int:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+        self.stats["bytes_received"] += size
+        return size
+    
+    def _put(self, key: tuple, size: int, metadata: dict) -> str:
+        etag = hashlib.md5(f"{key}{size}{uuid.uuid4()}".encode()).hexdigest()
+        self.objects[key] = {"size": size, "etag": etag, "mtime": formatdate(usegmt=True), "metadata": metadata}
+        return etag
+    
+    async def bucket(self, request: Request) -> Response:
+        await self.unblocked.wait()
+        self.stats["requests"] += 1
+        name = request.path_params["bucket"]
+        if "location" in request.query_params:
+            return self._xml("<LocationConstraint></LocationConstraint>")
+        if request.method == "PUT":
+            await self._drain(request)
+            self.buckets.add(name)
+            return Response()
+        if name not in self.buckets:
+            return self._error("NoSuchBucket", 404)
+        return Response()
+    
+    async def object(self, request: Request) -> Response:
+        await self.unblocked.wait()
+        self.stats["requests"] += 1
+        bucket = request.path_params["bucket"]
+        key = (bucket, request.path_params["key"])
+        query = request.query_params
+        if bucket not in self.buckets:
+            return self._error("NoSuchBucket", 404)
+        
+        if request.method == "POST" and "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = {"key": key, "size": 0, "metadata": self._metadata(request)}
+            return self._xml(
+                f"<InitiateMultipartUploadResult><Bucket>{bucket}</Bucket><Key>{key[1]}</Key>"
+                f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+            )
+        if request.method == "POST" and "uploadId" in query:
+            await self._drain(request)
+            upload = self.uploads.pop(query["uploadId"], None)
+            if upload is None:
+                return self._error("NoSuchUpload", 404)
+            etag = self._put(key, upload["size"], upload["metadata"])
+            return self._xml(
+                f"<CompleteMultipartUploadResult><Bucket>{bucket}</Bucket><Key>{key[1]}</Key>"
+                f"<ETag>\"{etag}\"</ETag></CompleteMultipartUploadResult>"
+            )
+        if request.method == "PUT" and "uploadId" in query:
+            size = await self._drain(request)
+            self.uploads[query["uploadId"]]["size"] += size
+            return Response(headers={"ETag": f"\"{uuid.uuid4().hex}\""})
+        if request.method == "PUT" and "x-amz-copy-source" in request.headers:
+            source_bucket, _, source_key = request.headers["x-amz-copy-source"].lstrip("/").partition("/")
+            source = self.objects.get((source_bucket, source_key))
+            if source is None:
+                return self._error("NoSuchKey", 404)
+            etag = self._put(key, source["size"], self._metadata(request) or source["metadata"])
+            return self._xml(
+                f"<CopyObjectResult><ETag>\"{etag}\"</ETag>"
+                f"<LastModified>2026-01-01T00:00:00.000Z</LastModified></CopyObjectResult>"
+            )
+        if request.method == "PUT":
+            size = await self._drain(request)
+            etag = self._put(key, size, self._metadata(request))
+            return Response(headers={"ETag": f"\"{etag}\""})
+        if request.method == "DELETE":
+            self.objects.pop(key, None)
+            return Response(status_code=204)
+        
+        obj = self.objects.get(key)
+        if obj is None:
+            return self._error("NoSuchKey", 404)
+        headers = {
+            "ETag": f"\"{obj['etag']}\"",
+            "Last-Modified": obj["mtime"],
+            "Content-Type": "application/java-archive",
+            "Accept-Ranges": "bytes",
+            **{f"x-amz-meta-{k}": v for k, v in obj["metadata"].items()}
+        }
+        if request.method == "HEAD":
+            return Response(headers={**headers, "Content-Length": str(obj["size"])})
+        
+        start, end = 0, obj["size"] - 1
+        status_code = 200
+        range_header = request.headers.get("range")
+        if range_header:
+            first, _, last = range_header.removeprefix("bytes=").partition("-")
+            start, end = int(first), min(int(last) if last else end, end)
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{obj['size']}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(self._zeros(end - start + 1), status_code, headers=headers)
+    
+    @staticmethod
+    def _metadata(request: Request) -> dict:
+        return {k[len("x-amz-meta-"):]: v for k, v in request.headers.items() if k.startswith("x-amz-meta-")}
+    
+    @staticmethod
+    async def _zeros(size: int):
+        while size > 0:
+            n = min(size, CHUNK)
+            yield ZEROS[:n]
+            size -= n
+    
+    async def block(self, request: Request) -> Response:
+        self.unblocked.clear()
+        return JSONResponse({"blocked": True})
+    
+    async def unblock(self, request: Request) -> Response:
+        self.unblocked.set()
+        return JSONResponse({"blocked": False})
+    
+    async def get_stats(self, request: Request) -> Response:
+        return JSONResponse({**self.stats, "objects": len(self.objects)})
+    
+    def asgi(self):
+        app = Starlette(routes=[
+            Route("/-/block", self.block, methods=["POST"]),
+            Route("/-/unblock", self.unblock, methods=["POST"]),
+            Route("/-/stats", self.get_stats),
+            Route("/{bucket}", self.bucket, methods=["GET", "HEAD", "PUT"]),
+            Route("/{bucket}/", self.bucket, methods=["GET", "HEAD", "PUT"]),
+            Route("/{bucket}/{key:path}", self.object, methods=["GET", "HEAD", "PUT", "POST", "DELETE"]),
+        ])
+        
+        async def counting_app(scope, receive, send):
+            if scope["type"] == "http" and scope.get("client") not in self._clients:
+                self._clients.add(scope.get("client"))
+                self.stats["connections"] += 1
+            await app(scope, receive, send)
+        
+        return counting_app
+
+
+def main():
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Server S3 giả lập cho benchmark")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+    uvicorn.run(StubS3().asgi(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
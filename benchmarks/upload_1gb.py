@@ -0,0 +1,114 @@
+"""
+Benchmark: thời gian upload và độ trễ event loop khi upload một JAR 1GB
+
+So sánh ba cách hash + ghi storage cho cùng một nội dung (benchmarks.common.SyntheticFile):
+
+- hash on loop: hashlib.sha256(file_data.read()) trên event loop rồi mới upload
+  (cách upload_artifact làm trước đây: đọc toàn bộ file vào memory, chặn loop)
+- hash in thread, then upload: calculate_stream_digest theo chunk lớn trên thread pool,
+  sau đó upload (đường của file nhỏ hơn UPLOAD_PIPELINE_MIN_BYTES)
+- pipelined: ArtifactService.create_artifact với file lớn, hash trong lúc upload vào
+  staging (một lần đọc) rồi promote sang đường dẫn blob
+
+    python -m benchmarks.upload_1gb --size-mb 1024 --checksum md5
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import time
+
+from benchmarks.common import (
+    free_port, print_table, quiet_logging, run_server, running_app, use_stub_s3, Sampler, SyntheticFile
+)
+
+
+async def hash_on_loop(services, file_data, size: int, index: int):
+    file_hash = hashlib.sha256(file_data.read()).hexdigest()
+    file_data.seek(0)
+    await services.async_minio_service.upload_blob(file_hash, file_data, size)
+
+
+async def hash_in_thread(services, file_data, size: int, index: int):
+    from fastapi.concurrency import run_in_threadpool
+    from app.config import settings
+    from app.utils.helpers import calculate_stream_digest
+    
+    digest = await run_in_threadpool(
+        calculate_stream_digest, file_data, settings.upload_hash_chunk_size, settings.upload_checksum_algorithm
+    )
+    await services.async_minio_service.upload_blob(digest.hexdigest(), file_data, size, digest.object_metadata())
+
+
+async def pipelined(services, file_data, size: int, index: int):
+    from app.schemas.artifact import ArtifactCreate, ArtifactMetadataCreate
+    
+    create = ArtifactCreate(metadata=ArtifactMetadataCreate(
+        artifact_name="upload-1gb", version=f"1.0.{index}", entry_classes=["bench.Main"], uploaded_by="bench"
+    ))
+    await services.artifact_service.create_artifact(create, file_data, size)
+
+
+MODES = {
+    "hash on loop": hash_on_loop,
+    "hash in thread, then upload": hash_in_thread,
+    "pipelined": pipelined,
+}
+
+
+async def run(args):
+    from app.config import settings
+    
+    settings.jar_inspection_enabled = False
+    settings.upload_checksum_algorithm = args.checksum
+    size = args.size_mb * 1024 * 1024
+    
+    rows = []
+    async with running_app() as app:
+        services = app.state.services
+        for run_index in range(args.runs):
+            for mode_index, (mode, upload) in enumerate(MODES.items()):
+                # Mỗi lần đo một nội dung khác nhau để không trùng blob đã có
+                index = run_index * len(MODES) + mode_index
+                file_data = SyntheticFile(size, seed=index)
+                async with Sampler() as sampler:
+                    started = time.perf_counter()
+                    await upload(services, file_data, size, index)
+                    elapsed = time.perf_counter() - started
+                stats = sampler.summary()
+                rows.append({
+                    "run": run_index + 1,
+                    "mode": mode,
+                    "wall_s": elapsed,
+                    "throughput_mb_s": args.size_mb / elapsed,
+                    "lag_p99_ms": stats["lag_p99_ms"],
+                    "lag_max_ms": stats["lag_max_ms"]
+                })
+    
+    print(f"1 upload x {args.size_mb}MB, backend={args.backend}, checksum={args.checksum or '-'}, "
+          f"hash_chunk={settings.upload_hash_chunk_size // (1024 * 1024)}MB, "
+          f"part_size={settings.minio_part_size // (1024 * 1024)}MB")
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024, help="Kích thước JAR (MB)")
+    parser.add_argument("--runs", type=int, default=1, help="Số lần lặp")
+    parser.add_argument("--checksum", choices=["", "md5", "crc32c"], default="", help="Checksum bổ sung")
+    parser.add_argument("--backend", choices=["stub", "mock"], default="stub",
+                        help="Object storage (mock giữ toàn bộ nội dung trong memory)")
+    args = parser.parse_args()
+    
+    quiet_logging()
+    server = contextlib.nullcontext()
+    if args.backend == "stub":
+        port = free_port()
+        use_stub_s3(port)
+        server = run_server("benchmarks.stub_s3", port)
+    with server:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
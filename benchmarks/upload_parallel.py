@@ -0,0 +1,89 @@
+"""
+Benchmark: RSS và throughput của N upload artifact song song (mặc định 10 x 500MB)
+
+Upload đi qua ArtifactService.create_artifact với file handle giống UploadFile.file của
+route upload (file đã được spool). Nội dung được sinh dần (benchmarks.common.SyntheticFile)
+nên RSS đo được chỉ gồm memory của đường upload.
+
+- --backend stub (mặc định): MinIOService thật (multipart put_object) ghi vào
+  benchmarks.stub_s3 chạy ở process riêng; RSS đỉnh không phụ thuộc kích thước JAR
+- --backend mock: MockMinIOService giữ toàn bộ nội dung trong memory, RSS tăng theo
+  tổng dung lượng upload (chỉ dùng với --size-mb nhỏ)
+
+    python -m benchmarks.upload_parallel --uploads 10 --size-mb 500
+"""
+import argparse
+import asyncio
+import contextlib
+import time
+
+from benchmarks.common import (
+    free_port, print_table, quiet_logging, run_server, running_app, use_stub_s3, Sampler, SyntheticFile
+)
+
+
+async def run(args):
+    from app.config import settings
+    from app.schemas.artifact import ArtifactCreate, ArtifactMetadataCreate
+    
+    settings.jar_inspection_enabled = False
+    size = args.size_mb * 1024 * 1024
+    # Số upload thực sự chạy cùng lúc (phần còn lại đợi semaphore của AsyncMinIOService)
+    inflight = min(args.uploads, settings.minio_max_concurrent_uploads)
+    
+    async with running_app() as app:
+        artifact_service = app.state.services.artifact_service
+        rows = []
+        for run_index in range(args.runs):
+            uploads = []
+            for i in range(args.uploads):
+                create = ArtifactCreate(metadata=ArtifactMetadataCreate(
+                    artifact_name="upload-bench", version=f"{run_index}.0.{i}",
+                    entry_classes=["bench.Main"], uploaded_by="bench"
+                ))
+                seed = run_index * args.uploads + i
+                uploads.append(artifact_service.create_artifact(create, SyntheticFile(size, seed=seed), size))
+            
+            async with Sampler() as sampler:
+                started = time.perf_counter()
+                await asyncio.gather(*uploads)
+                elapsed = time.perf_counter() - started
+            stats = sampler.summary()
+            rows.append({
+                "run": run_index + 1,
+                "wall_s": elapsed,
+                "throughput_mb_s": args.uploads * args.size_mb / elapsed,
+                "rss_baseline_mb": stats["rss_baseline_mb"],
+                "rss_peak_mb": stats["rss_peak_mb"],
+                "rss_delta_mb": stats["rss_peak_mb"] - stats["rss_baseline_mb"],
+                "rss_per_inflight_mb": (stats["rss_peak_mb"] - stats["rss_baseline_mb"]) / inflight,
+                "lag_p99_ms": stats["lag_p99_ms"]
+            })
+    
+    print(f"{args.uploads} upload song song x {args.size_mb}MB, backend={args.backend}, "
+          f"part_size={settings.minio_part_size // (1024 * 1024)}MB, "
+          f"hash_chunk={settings.upload_hash_chunk_size // (1024 * 1024)}MB, "
+          f"upload đồng thời tối đa={settings.minio_max_concurrent_uploads}")
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=10, help="Số upload song song")
+    parser.add_argument("--size-mb", type=int, default=500, help="Kích thước mỗi JAR (MB)")
+    parser.add_argument("--runs", type=int, default=1, help="Số lần lặp (RSS baseline của lần sau gồm memory allocator còn giữ lại)")
+    parser.add_argument("--backend", choices=["stub", "mock"], default="stub", help="Object storage")
+    args = parser.parse_args()
+    
+    quiet_logging()
+    server = contextlib.nullcontext()
+    if args.backend == "stub":
+        port = free_port()
+        use_stub_s3(port)
+        server = run_server("benchmarks.stub_s3", port)
+    with server:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()